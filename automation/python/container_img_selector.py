@@ -15,21 +15,36 @@ Author      : Satish Gupta
 from __future__ import annotations
 
 import base64
+import codecs
+import fnmatch
 import getpass
+import hashlib
+import json
 import logging
 import os
+import queue
 import re
-import ssl
+import shutil
 import sys
+import threading
 import time
 import urllib.error
+import urllib.parse
 import urllib.request
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, wait
+from contextlib import contextmanager, nullcontext
 from dataclasses import dataclass, field
 from html.parser import HTMLParser
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, Iterator, List, Optional, Set, TextIO, Tuple
 from urllib.parse import urljoin, urlparse
 
+from http_transfer import (               # shared with configure_openchai_manager.py
+    CHUNK_SIZE, HttpPool, ProgressTicker, RecvBuffer, TokenBucket,
+    parse_rate, parse_window, preallocate, version_key,
+)
+from local_catalog import LocalCatalog   # shared with configure_openchai_manager.py
+
 # ─────────────────────────────────────────────
 # Dependency bootstrap  (mirrors main script)
 # ─────────────────────────────────────────────
@@ -46,6 +61,7 @@ _ensure_rich()
 
 from rich.console import Console
 from rich import box
+from rich.live import Live
 from rich.panel import Panel
 from rich.progress import (
     BarColumn,
@@ -88,21 +104,32 @@ logging.basicConfig(
 log = logging.getLogger("openchai.container")
 
 
+# Set while --prefetch transfers run behind the menus: download workers
+# then log to LOG_PATH only, so nothing is printed over a prompt
+_PREFETCHING     = threading.Event()
+_WORKER_THREADS  = ("openchai-dl", "openchai-seg")
+
+
+def _echo(markup: str) -> None:
+    if _PREFETCHING.is_set() and threading.current_thread().name.startswith(_WORKER_THREADS):
+        return
+    console.print(markup)
+
 def log_info(msg: str)   -> None:
     log.info(msg)
-    console.print(f"[cyan]ℹ  {msg}[/cyan]")
+    _echo(f"[cyan]ℹ  {msg}[/cyan]")
 
 def log_notice(msg: str) -> None:
     log.info("NOTICE: %s", msg)
-    console.print(f"[bold green]✔  {msg}[/bold green]")
+    _echo(f"[bold green]✔  {msg}[/bold green]")
 
 def log_warn(msg: str)   -> None:
     log.warning(msg)
-    console.print(f"[yellow]⚠  {msg}[/yellow]")
+    _echo(f"[yellow]⚠  {msg}[/yellow]")
 
 def log_error(msg: str)  -> None:
     log.error(msg)
-    console.print(f"[bold red]❌  {msg}[/bold red]")
+    _echo(f"[bold red]❌  {msg}[/bold red]")
 
 def error_exit(msg: str) -> None:
     log_error(msg)
@@ -133,7 +160,19 @@ SSL_VERIFY_CERT  = False      # ← set True once a valid certificate is install
 DOWNLOAD_TIMEOUT_S = 300    # seconds before a stalled download is abandoned
 CONNECT_TIMEOUT_S  = 15     # seconds for initial HTTP connection
 MAX_RETRIES        = 3      # retry attempts per file before giving up
-CHUNK_SIZE         = 1 << 20  # 1 MiB read chunks
+MAX_RATE           = 0      # bytes/s shared by all transfers, 0 = unlimited (--max-rate)
+RATE_WINDOW        = ""     # "HH:MM-HH:MM" when MAX_RATE applies, "" = always (--rate-window)
+DOWNLOAD_JOBS      = 4      # images downloaded in parallel (--jobs)
+MAX_PER_HOST       = 8      # in-flight HTTP transfers allowed per vault host
+HOST_RESERVED      = 2      # of those, slots image transfers never take — kept for listings and probes
+SEGMENTS           = 4      # parallel byte ranges per large image (--segments)
+SEGMENT_MIN_BYTES  = 64 << 20  # never split an image into ranges below 64 MiB
+CRAWL_DEPTH        = 8      # directory levels searched below a version dir, 0 = unlimited (--crawl-depth)
+CRAWL_WORKERS      = 8      # directory listings fetched concurrently (--crawl-workers)
+LISTING_TTL_S      = 3600   # cached listings younger than this skip the vault entirely (--listing-ttl)
+LISTING_CACHE_DIR  = ""     # "" = $XDG_CACHE_HOME/openchai/listings, else <LOCAL_DIR>/.cache/listings
+LISTING_CHUNK      = 64 * 1024  # listing text parsed per step while it downloads
+LISTING_MAX_ENTRIES = 0     # hrefs read from one listing, 0 = unlimited (--max-entries)
 
 
 def _build_vault_url(host: str, port: int, path: str) -> str:
@@ -173,9 +212,20 @@ TOOLS: List[str] = [
 
 # File extensions recognised as container image archives
 VALID_EXTENSIONS: Tuple[str, ...] = (
-    ".tar", ".img", ".gz", ".xz", ".bz2", ".tgz",
+    ".tar", ".img", ".gz", ".xz", ".bz2", ".tgz", ".zst",
 )
 
+# Vault-side checksum manifest (sha256sum format) published in each
+# <os>/<tool>/<version>/ directory, and the local content-addressed
+# store that verified images are kept in (<LOCAL_DIR>/.store/sha256/…).
+MANIFEST_NAME = "SHA256SUMS"
+STORE_DIRNAME = ".store"
+
+# Optional catalog at the registry root (written by
+# `configure_openchai_manager.py catalog`); when present the whole tree is
+# read in one request instead of crawling the HTML listings.
+CATALOG_NAME = "index.json"
+
 
 # ─────────────────────────────────────────────
 # Credentials dataclass
@@ -207,6 +257,8 @@ class _DownloadJob:
     url:        str
     dest:       Path
     size_bytes: Optional[int] = field(default=None)   # None = unknown
+    size_approx: Optional[int] = field(default=None)  # rounded listing size ("3M"), estimates only
+    sha256:     Optional[str] = field(default=None)   # from MANIFEST_NAME, None = unverified
 
 
 @dataclass
@@ -215,21 +267,43 @@ class _DownloadResult:
     success: bool
     skipped: bool = False    # file already complete — not re-downloaded
     error:   str  = ""
+    detail:  str  = ""       # report text for skipped jobs
 
 
 # ─────────────────────────────────────────────
 # HTML href parser  (no regex fragility)
 # ─────────────────────────────────────────────
 class _HrefParser(HTMLParser):
+    """
+    Collects hrefs from an autoindex page, plus the size column of each
+    row in .sizes = {href: (bytes, exact)}.
+
+      nginx  : <pre> rows, one per line — "name  17-Oct-2026 10:00  3178070"
+               (or "3M" with autoindex_exact_size off)
+      Apache : <tr> rows with the size in its own <td> — "3.0M", "12K"
+
+    Plain byte counts are exact; K/M/G/T values are rounded by the server
+    and flagged exact=False.  Directories ("-") get no entry.
+    """
     # hrefs that are never real registry entries
     _SKIP = {"#", "/", "../", "./", "?C=N;O=D", "?C=M;O=A", "?C=S;O=A", "?C=D;O=A"}
+    _SIZE_RE = re.compile(r"(?:^|\s)(\d+(?:\.\d+)?)([KMGT]?)\s*$", re.IGNORECASE)
+    _SCALE   = {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30, "T": 1 << 40}
 
     def __init__(self) -> None:
         super().__init__()
         self.links: List[str] = []
+        self.sizes: Dict[str, Tuple[int, bool]] = {}
+        self._row_href: Optional[str] = None
+        self._row_text: List[str] = []
+        self._in_link = False
 
     def handle_starttag(self, tag: str, attrs: list) -> None:
-        if tag == "a":
+        if tag == "tr":
+            self._end_row()
+        elif tag == "a":
+            self._end_row()
+            self._in_link = True
             for name, val in attrs:
                 if (
                     name == "href"
@@ -238,25 +312,40 @@ class _HrefParser(HTMLParser):
                     and not val.startswith("?")
                 ):
                     self.links.append(val)
+                    self._row_href = val
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "a":
+            self._in_link = False
+        elif tag in ("tr", "pre", "table"):
+            self._end_row()
+
+    def handle_data(self, data: str) -> None:
+        if self._row_href is None or self._in_link:
+            return
+        # nginx rows end at the newline; Apache rows at </tr>
+        text, newline, _ = data.partition("\n")
+        self._row_text.append(text)
+        if newline:
+            self._end_row()
+
+    def close(self) -> None:
+        super().close()
+        self._end_row()
+
+    def _end_row(self) -> None:
+        if self._row_href is not None:
+            m = self._SIZE_RE.search(" ".join(self._row_text))
+            if m and not self._row_href.endswith("/"):
+                size = int(float(m.group(1)) * self._SCALE[m.group(2).upper()])
+                self.sizes[self._row_href] = (size, not m.group(2) and "." not in m.group(1))
+        self._row_href = None
+        self._row_text = []
 
 
 # ─────────────────────────────────────────────
 # Low-level HTTP helpers  (stdlib only)
 # ─────────────────────────────────────────────
-def _make_ssl_ctx(no_cert: bool) -> ssl.SSLContext:
-    """
-    Build an SSLContext.
-    When no_cert=True (SSL_VERIFY_CERT=False) certificate verification and
-    hostname checking are both disabled — equivalent to curl -k.
-    A one-time advisory is printed so the operator is always aware.
-    """
-    ctx = ssl.create_default_context()
-    if no_cert:
-        ctx.check_hostname = False
-        ctx.verify_mode    = ssl.CERT_NONE
-    return ctx
-
-
 def _build_request(
     url: str,
     creds: Optional[VaultCredentials],
@@ -270,6 +359,9 @@ def _build_request(
     return urllib.request.Request(url, headers=headers)
 
 
+_POOL = HttpPool(max_idle_per_host=MAX_PER_HOST)
+
+
 def _http_hint(code: int, url: str) -> str:
     """Human-readable hint for common HTTP error codes."""
     _HINTS: Dict[int, str] = {
@@ -283,6 +375,211 @@ def _http_hint(code: int, url: str) -> str:
     return _HINTS.get(code, f"HTTP {code}. Verify {url} in a browser.")
 
 
+# ─────────────────────────────────────────────
+# Listing cache
+# Directory listings (and the catalog) persist across runs; entries
+# younger than the TTL are used as-is, older ones are revalidated with
+# If-None-Match / If-Modified-Since, and a vault that cannot be reached
+# falls back to the last copy seen.
+# ─────────────────────────────────────────────
+class _ListingCache:
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl      = ttl
+        self.refresh  = False          # --refresh: always revalidate
+        self._dir:    Optional[Path] = None
+        self._probed  = False
+        self._lock    = threading.Lock()
+        self.fresh_hits = self.revalidated = self.fetched = 0
+
+    def configure(self, ttl: float, refresh: bool) -> None:
+        self.ttl, self.refresh = ttl, refresh
+
+    def _directory(self) -> Optional[Path]:
+        with self._lock:
+            if not self._probed:
+                self._probed = True
+                xdg = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+                candidates = [Path(LISTING_CACHE_DIR)] if LISTING_CACHE_DIR else [
+                    Path(xdg) / "openchai" / "listings",
+                    Path(LOCAL_DIR) / ".cache" / "listings",
+                ]
+                for cand in candidates:
+                    try:
+                        cand.mkdir(parents=True, exist_ok=True)
+                    except OSError:
+                        continue
+                    if os.access(cand, os.W_OK):
+                        self._dir = cand
+                        break
+            return self._dir      # None: no writable cache directory, caching off
+
+    def _path(self, url: str, creds: Optional[VaultCredentials]) -> Optional[Path]:
+        directory = self._directory()
+        if directory is None:
+            return None
+        user = creds.username if creds else ""
+        return directory / (hashlib.sha256(f"{user}\0{url}".encode()).hexdigest() + ".json")
+
+    def load(self, url: str, creds: Optional[VaultCredentials]) -> Optional[dict]:
+        path = self._path(url, creds)
+        try:
+            entry = json.loads(path.read_text()) if path else None
+        except (OSError, ValueError):
+            return None
+        if not (isinstance(entry, dict) and entry.get("url") == url):
+            return None
+        # the body lives beside the metadata; an entry without one is a miss
+        return entry if path.with_suffix(".body").exists() else None
+
+    def is_fresh(self, entry: dict) -> bool:
+        return not self.refresh and time.time() - entry.get("checked", 0) < self.ttl
+
+    def read_body(self, url: str, creds: Optional[VaultCredentials]) -> Iterator[str]:
+        """Yield a cached body LISTING_CHUNK characters at a time."""
+        path = self._path(url, creds)
+        if path is None:
+            return
+        with open(path.with_suffix(".body"), encoding="utf-8", errors="replace") as fh:
+            while True:
+                text = fh.read(LISTING_CHUNK)
+                if not text:
+                    return
+                yield text
+
+    @contextmanager
+    def spool(
+        self, url: str, creds: Optional[VaultCredentials], entry: dict,
+    ) -> Iterator[Optional[TextIO]]:
+        """
+        Yield a file to stream a freshly fetched body into; it is stored
+        with *entry* only when the block completes, so an abandoned or
+        failed read leaves the previous copy in place.  Yields None when
+        caching is off.
+        """
+        path = self._path(url, creds)
+        tmp  = path.with_name(f"{path.stem}.{threading.get_ident()}.body.tmp") if path else None
+        try:
+            fh = open(tmp, "w", encoding="utf-8") if tmp else None
+        except OSError as exc:
+            log.debug("Listing cache write failed for %s: %s", url, exc)
+            fh = tmp = None
+        if fh is None:
+            yield None
+            return
+        try:
+            with fh:
+                yield fh
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        self.store(url, creds, entry, body=tmp)
+
+    def store(
+        self,
+        url: str,
+        creds: Optional[VaultCredentials],
+        entry: dict,
+        body: Optional[Path] = None,
+    ) -> None:
+        path = self._path(url, creds)
+        if path is None:
+            return
+        entry = dict(entry, url=url, checked=time.time())
+        tmp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        try:
+            if body is not None:
+                os.replace(body, path.with_suffix(".body"))
+            tmp.write_text(json.dumps(entry))
+            os.replace(tmp, path)
+        except OSError as exc:
+            log.debug("Listing cache write failed for %s: %s", url, exc)
+
+    def count(self, counter: str) -> None:
+        """Bump "fresh_hits", "revalidated" or "fetched" — crawl threads share them."""
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def stats(self) -> str:
+        return (
+            f"{self.fresh_hits} listing(s) from cache, {self.revalidated} revalidated (304), "
+            f"{self.fetched} fetched"
+        )
+
+
+_LISTINGS = _ListingCache(LISTING_TTL_S)
+
+
+def _stream_listing(
+    url: str,
+    no_cert: bool,
+    creds: Optional[VaultCredentials],
+    timeout: int = CONNECT_TIMEOUT_S,
+) -> Iterator[str]:
+    """
+    GET *url* through the listing cache and yield the body as text,
+    LISTING_CHUNK at a time, so callers can parse while it downloads.
+    Raises urllib.error.HTTPError / URLError like _POOL.urlopen(), except
+    that a vault that cannot be reached with a cached copy replays the
+    cached copy.  A fresh body is spooled into the cache as it streams.
+    """
+    cached = _LISTINGS.load(url, creds)
+    if cached is not None and _LISTINGS.is_fresh(cached):
+        _LISTINGS.count("fresh_hits")
+        yield from _LISTINGS.read_body(url, creds)
+        return
+
+    headers: Dict[str, str] = {}
+    if cached is not None:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    try:
+        resp = _POOL.urlopen(_build_request(url, creds, headers), no_cert, timeout=timeout)
+    except (urllib.error.URLError, OSError) as exc:
+        if cached is None or isinstance(exc, urllib.error.HTTPError):
+            raise
+        log_warn(f"Vault unreachable ({getattr(exc, 'reason', exc)}); using cached listing of {url}")
+        yield from _LISTINGS.read_body(url, creds)
+        return
+
+    if resp.status == 304 and cached is not None:
+        resp.close()
+        _LISTINGS.count("revalidated")
+        _LISTINGS.store(url, creds, cached)
+        yield from _LISTINGS.read_body(url, creds)
+        return
+
+    meta = {
+        "etag":          resp.headers.get("ETag") or "",
+        "last_modified": resp.headers.get("Last-Modified") or "",
+    }
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    with resp, _LISTINGS.spool(url, creds, meta) as sink:
+        while True:
+            data = resp.read(LISTING_CHUNK)
+            text = decoder.decode(data, final=not data)
+            if text:
+                if sink is not None:
+                    sink.write(text)
+                yield text
+            if not data:
+                break
+    _LISTINGS.count("fetched")
+
+
+def _get_listing(
+    url: str,
+    no_cert: bool,
+    creds: Optional[VaultCredentials],
+    timeout: int = CONNECT_TIMEOUT_S,
+) -> str:
+    """_stream_listing() collected into one string (the catalog, small pages)."""
+    return "".join(_stream_listing(url, no_cert, creds, timeout))
+
+
 def _fetch_html(
     url: str,
     no_cert: bool,
@@ -290,15 +587,11 @@ def _fetch_html(
     timeout: int = CONNECT_TIMEOUT_S,
 ) -> Optional[str]:
     """
-    GET *url* and return the response body as a UTF-8 string.
+    GET *url* (through the listing cache) and return the body as a UTF-8 string.
     Returns None on any network or HTTP error; caller decides how to handle.
     """
     try:
-        req = _build_request(url, creds)
-        with urllib.request.urlopen(
-            req, context=_make_ssl_ctx(no_cert), timeout=timeout
-        ) as resp:
-            return resp.read().decode("utf-8", errors="replace")
+        return _get_listing(url, no_cert, creds, timeout)
     except urllib.error.HTTPError as exc:
         log_error(f"HTTP {exc.code} fetching {url} — {_http_hint(exc.code, url)}")
     except urllib.error.URLError as exc:
@@ -310,18 +603,122 @@ def _fetch_html(
     return None
 
 
+# {file URL: (bytes, exact)} harvested from listing rows by _list_hrefs()
+_LISTED_SIZES: Dict[str, Tuple[int, bool]] = {}
+
+
+def _iter_hrefs(
+    url: str,
+    no_cert: bool,
+    creds: Optional[VaultCredentials],
+    max_entries: Optional[int] = None,
+) -> Iterator[str]:
+    """
+    Yield the non-trivial hrefs of an Apache / Nginx directory listing as
+    the body arrives.  The page is parsed chunk by chunk and never held
+    whole, so memory stays flat however many entries the directory has.
+
+    Stops after *max_entries* hrefs (default LISTING_MAX_ENTRIES, 0 = no
+    cap).  Errors are logged like _fetch_html() and end the listing.
+    """
+    cap    = LISTING_MAX_ENTRIES if max_entries is None else max_entries
+    parser = _HrefParser()
+    count  = 0
+
+    def _drain() -> List[str]:
+        links, parser.links = parser.links, []
+        for href, size in parser.sizes.items():
+            _LISTED_SIZES[_safe_join_url(url, href)] = size
+        parser.sizes.clear()
+        return links
+
+    try:
+        for text in _stream_listing(url, no_cert, creds):
+            parser.feed(text)
+            for href in _drain():
+                yield href
+                count += 1
+                if cap and count >= cap:
+                    log_warn(
+                        f"Listing of {url} truncated after {cap} entries "
+                        f"(raise --max-entries to see more)."
+                    )
+                    return
+        parser.close()
+        yield from _drain()[:cap - count] if cap else _drain()
+    except urllib.error.HTTPError as exc:
+        log_error(f"HTTP {exc.code} fetching {url} — {_http_hint(exc.code, url)}")
+    except urllib.error.URLError as exc:
+        log_warn(f"Network error fetching {url}: {exc.reason}")
+    except OSError as exc:
+        log_warn(f"Connection timed out fetching {url}: {exc}")
+    except Exception as exc:
+        log_warn(f"Unexpected error fetching {url}: {exc}")
+
+
 def _list_hrefs(
     url: str,
     no_cert: bool,
     creds: Optional[VaultCredentials],
 ) -> List[str]:
     """Return all non-trivial hrefs from an Apache / Nginx directory listing."""
-    html = _fetch_html(url, no_cert, creds)
-    if html is None:
-        return []
-    parser = _HrefParser()
-    parser.feed(html)
-    return parser.links
+    return list(_iter_hrefs(url, no_cert, creds))
+
+
+# ─────────────────────────────────────────────
+# Vault catalog (index.json)
+# ─────────────────────────────────────────────
+_CATALOG_LOCK  = threading.Lock()
+_CATALOG_STATE: Dict[str, object] = {"loaded": False, "files": None}
+
+
+def _catalog(
+    no_cert: bool,
+    creds: Optional[VaultCredentials],
+) -> Optional[Dict[str, dict]]:
+    """
+    Return {path relative to the registry root: {"size", "mtime", "sha256"}}
+    from CATALOG_NAME, fetched once per run.  None when the vault has no
+    catalog (or it is unreadable) — callers then crawl the HTML listings.
+    """
+    with _CATALOG_LOCK:
+        if not _CATALOG_STATE["loaded"]:
+            _CATALOG_STATE["loaded"] = True
+            url = f"{CONTAINER_REG_BASE_URL}/{CATALOG_NAME}"
+            try:
+                files = json.loads(_get_listing(url, no_cert, creds))["files"]
+                if not isinstance(files, dict):
+                    raise ValueError("'files' is not an object")
+                _CATALOG_STATE["files"] = files
+                log_info(f"Loaded vault catalog: {len(files)} file(s) from {CATALOG_NAME}")
+            except urllib.error.HTTPError as exc:
+                if exc.code != 404:
+                    log_warn(f"Vault catalog unavailable (HTTP {exc.code}); crawling listings.")
+            except Exception as exc:
+                log_warn(f"Vault catalog unreadable ({exc}); crawling listings.")
+        return _CATALOG_STATE["files"]  # type: ignore[return-value]
+
+
+def _catalog_subdirs(files: Dict[str, dict], prefix: str) -> List[str]:
+    """Immediate sub-directory names below *prefix* ("" = registry root)."""
+    return sorted({
+        rel[len(prefix):].split("/", 1)[0]
+        for rel in files
+        if rel.startswith(prefix) and "/" in rel[len(prefix):]
+    })
+
+
+def _catalog_entry(
+    url: str,
+    no_cert: bool,
+    creds: Optional[VaultCredentials],
+) -> Optional[dict]:
+    """Catalog record for a file URL under the registry, or None."""
+    files = _catalog(no_cert, creds)
+    root  = CONTAINER_REG_BASE_URL + "/"
+    if files is None or not url.startswith(root):
+        return None
+    return files.get(url[len(root):])
 
 
 def _probe_head(
@@ -336,8 +733,8 @@ def _probe_head(
     try:
         req = _build_request(url, creds)
         req.get_method = lambda: "HEAD"   # type: ignore[method-assign]
-        with urllib.request.urlopen(
-            req, context=_make_ssl_ctx(no_cert), timeout=CONNECT_TIMEOUT_S
+        with _POOL.urlopen(
+            req, no_cert, timeout=CONNECT_TIMEOUT_S
         ) as resp:
             cl = resp.headers.get("Content-Length")
             return int(cl) if cl and cl.isdigit() else None
@@ -373,8 +770,8 @@ def _test_connection(
     try:
         req = _build_request(url, creds)
         req.get_method = lambda: "HEAD"   # type: ignore[method-assign]
-        with urllib.request.urlopen(
-            req, context=_make_ssl_ctx(no_cert), timeout=CONNECT_TIMEOUT_S
+        with _POOL.urlopen(
+            req, no_cert, timeout=CONNECT_TIMEOUT_S
         ) as resp:
             if resp.status < 400:
                 log_notice(f"Registry reachable (HTTP {resp.status}).")
@@ -502,7 +899,11 @@ def select_os_version(
     console.print(Rule("[bold]OS Version Selection[/bold]"))
     log_info(f"Fetching OS version list from: {CONTAINER_REG_BASE_URL}/")
 
-    hrefs = _list_hrefs(CONTAINER_REG_BASE_URL + "/", no_cert, creds)
+    files = _catalog(no_cert, creds)
+    hrefs = (
+        [f"{d}/" for d in _catalog_subdirs(files, "")] if files is not None
+        else _list_hrefs(CONTAINER_REG_BASE_URL + "/", no_cert, creds)
+    )
 
     os_versions = sorted({
         h.rstrip("/") for h in hrefs
@@ -572,8 +973,11 @@ def _list_versions(
     <registry>/<os_version>/<tool_name>/.
     Accepts any alphanumeric folder name (v1.2.3, rocky9.6, beta_01 …).
     """
-    url   = f"{CONTAINER_REG_BASE_URL}/{os_version}/{tool_name}/"
-    hrefs = _list_hrefs(url, no_cert, creds)
+    files = _catalog(no_cert, creds)
+    if files is not None:
+        hrefs = [f"{d}/" for d in _catalog_subdirs(files, f"{os_version}/{tool_name}/")]
+    else:
+        hrefs = _list_hrefs(f"{CONTAINER_REG_BASE_URL}/{os_version}/{tool_name}/", no_cert, creds)
     return sorted({
         h.rstrip("/") for h in hrefs
         if h.endswith("/")
@@ -620,92 +1024,131 @@ def _safe_join_url(base: str, href: str) -> str:
     return urljoin(base, href)
 
 
+def _crawl_images(
+    root_url: str,
+    no_cert: bool,
+    creds: Optional[VaultCredentials],
+    depth: int = CRAWL_DEPTH,
+    workers: int = CRAWL_WORKERS,
+) -> Iterator[str]:
+    """
+    Breadth-first crawl of the directory listing at *root_url*, yielding
+    image paths relative to it as soon as their listing rows arrive.
+
+      • up to *workers* listings in flight (and never more than
+        MAX_PER_HOST against one vault host), each streamed through
+        _iter_hrefs() so a huge directory shows results while it loads
+      • descends at most *depth* directory levels below root_url
+        (0 = unlimited)
+      • every href is normalised with _safe_join_url(); URLs outside
+        root_url or already visited are dropped, so "../" links, absolute
+        links and server-side symlink loops cannot escape or repeat
+    """
+    root   = urlparse(root_url)._replace(query="", fragment="").geturl()
+    seen   = {root}
+    levels: Dict[str, int] = {root: 0}
+    # (dir_url, href) as rows arrive; href None marks a finished listing.
+    # Bounded, so a slow consumer pauses the workers instead of buffering.
+    rows: "queue.Queue[Tuple[str, Optional[str]]]" = queue.Queue(maxsize=4096)
+    stop = threading.Event()
+
+    def _put(item: Tuple[str, Optional[str]]) -> bool:
+        while not stop.is_set():
+            try:
+                rows.put(item, timeout=0.2)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _fetch(dir_url: str) -> None:
+        try:
+            with _host_slot(dir_url):
+                for href in _iter_hrefs(dir_url, no_cert, creds):
+                    if not _put((dir_url, href)):
+                        return
+        finally:
+            _put((dir_url, None))
+
+    pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="openchai-crawl")
+    try:
+        pool.submit(_fetch, root)
+        active = 1
+        while active:
+            dir_url, href = rows.get()
+            if href is None:
+                active -= 1
+                continue
+            href = href.strip()
+            if href in ("../", "./", "/") or href.startswith("?"):
+                continue
+            url = urlparse(_safe_join_url(dir_url, href))._replace(
+                query="", fragment=""
+            ).geturl()
+            if url in seen or not url.startswith(root):
+                continue
+            seen.add(url)
+            if url.endswith("/"):
+                level = levels[dir_url] + 1
+                if depth and level > depth:
+                    continue
+                levels[url] = level
+                pool.submit(_fetch, url)
+                active += 1
+            elif _is_image(href):
+                yield url[len(root):]
+    finally:
+        stop.set()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
 def _list_images(
     tool_name: str,
     os_version: str,
     version: str,
     no_cert: bool,
     creds: Optional[VaultCredentials],
+    on_found: Optional[Callable[[str], None]] = None,
+    depth: int = CRAWL_DEPTH,
+    workers: int = CRAWL_WORKERS,
 ) -> List[str]:
     """
-    Recursively collect container image filenames under
-    <registry>/<os_version>/<tool_name>/<version>/.
+    Collect container image paths under
+    <registry>/<os_version>/<tool_name>/<version>/ from the vault catalog,
+    or with _crawl_images() when the vault has none.
 
-    Handles:
-      • relative hrefs
-      • absolute hrefs
-      • full URLs
-      • nested directories
-      • duplicate slash issues
+    *on_found* is called with each path as it is discovered, so the UI can
+    show results while deeper listings are still loading.
 
-    Returns image paths relative to the version directory.
+    Returns image paths relative to the version directory, sorted.
     """
-
     base_url = (
         f"{CONTAINER_REG_BASE_URL}/"
         f"{os_version}/{tool_name}/{version}/"
     )
 
-    hrefs = _list_hrefs(base_url, no_cert, creds)
-
     images: List[str] = []
-    seen: set = set()
-
-    for item in hrefs:
-
-        if item in ("../", "./", "/") or item.startswith("?"):
-            continue
-
-        item = item.strip()
-
-        # ─────────────────────────────────────────────
-        # DIRECTORY HANDLING
-        # ─────────────────────────────────────────────
-        if item.endswith("/"):
-
-            dir_url = _safe_join_url(base_url, item)
-
-            sub_hrefs = _list_hrefs(dir_url, no_cert, creds)
-
-            for sub in sub_hrefs:
-
-                if sub in ("../", "./", "/") or sub.startswith("?"):
-                    continue
 
-                sub = sub.strip()
-
-                if _is_image(sub):
-
-                    # Convert to clean relative path
-                    sub_name = Path(
-                        urlparse(sub).path
-                    ).name
-
-                    dir_name = Path(
-                        urlparse(item).path
-                    ).name
-
-                    relative_path = f"{dir_name}/{sub_name}"
-
-                    if relative_path not in seen:
-                        images.append(relative_path)
-                        seen.add(relative_path)
-
-        # ─────────────────────────────────────────────
-        # DIRECT IMAGE FILE
-        # ─────────────────────────────────────────────
-        elif _is_image(item):
-
-            clean_name = Path(
-                urlparse(item).path
-            ).name
+    files = _catalog(no_cert, creds)
+    if files is not None:
+        prefix = f"{os_version}/{tool_name}/{version}/"
+        found  = (
+            rel[len(prefix):] for rel in sorted(files)
+            if rel.startswith(prefix)
+            and (not depth or rel[len(prefix):].count("/") <= depth)
+            and _is_image(rel.rsplit("/", 1)[-1])
+        )
+    else:
+        found = _crawl_images(base_url, no_cert, creds, depth, workers)
 
-            if clean_name not in seen:
-                images.append(clean_name)
-                seen.add(clean_name)
+    for rel_path in found:
+        images.append(rel_path)
+        if on_found is not None:
+            on_found(rel_path)
 
     return sorted(images)
 
+
 # ─────────────────────────────────────────────
 # Per-tool interactive selection
 # ─────────────────────────────────────────────
@@ -714,12 +1157,15 @@ def _select_tool_version(
     os_version: str,
     no_cert: bool,
     creds: Optional[VaultCredentials],
+    versions: Optional[List[str]] = None,
 ) -> Optional[str]:
     """
     Show available versions for *tool* and let the user pick one.
+    *versions* may be passed in when already listed (see run()).
     Returns the chosen version string, or None to skip this tool.
     """
-    versions = _list_versions(tool, os_version, no_cert, creds)
+    if versions is None:
+        versions = _list_versions(tool, os_version, no_cert, creds)
 
     if not versions:
         log_warn(f"No versions found for '{tool}' — skipping.")
@@ -751,33 +1197,54 @@ def _select_tool_version(
     return None
 
 
+def _image_table(images: List[str], caption: Optional[str] = None) -> Table:
+    table = Table(
+        box=box.SIMPLE_HEAVY, show_header=True,
+        header_style="bold magenta", padding=(0, 2),
+        caption=caption, caption_style="dim",
+    )
+    table.add_column("#",          style="bold cyan", no_wrap=True, justify="right")
+    table.add_column("Image file", style="white")
+    for i, img in enumerate(images, 1):
+        table.add_row(str(i), img)
+    return table
+
+
 def _select_images(
     tool: str,
     os_version: str,
     version: str,
     no_cert: bool,
     creds: Optional[VaultCredentials],
+    crawl_depth: int = CRAWL_DEPTH,
+    crawl_workers: int = CRAWL_WORKERS,
 ) -> List[str]:
     """
     Show all image files available for *tool/version* and let the user
-    select one, several (comma-separated), or all.
+    select one, several (comma-separated), or all.  The table fills in
+    live while the version directory is being crawled.
     Returns a de-duplicated list of relative image paths.
     """
-    images = _list_images(tool, os_version, version, no_cert, creds)
+    found: List[str] = []
+    with Live(
+        _image_table(found, "Scanning …"),
+        console=console, refresh_per_second=8, transient=True,
+    ) as live:
+
+        def _on_found(rel_path: str) -> None:
+            found.append(rel_path)
+            live.update(_image_table(sorted(found), f"Scanning … {len(found)} found"))
+
+        images = _list_images(
+            tool, os_version, version, no_cert, creds,
+            on_found=_on_found, depth=crawl_depth, workers=crawl_workers,
+        )
 
     if not images:
         log_warn(f"No image files found under {tool}/{version}.")
         return []
 
-    table = Table(
-        box=box.SIMPLE_HEAVY, show_header=True,
-        header_style="bold magenta", padding=(0, 2),
-    )
-    table.add_column("#",          style="bold cyan", no_wrap=True, justify="right")
-    table.add_column("Image file", style="white")
-    for i, img in enumerate(images, 1):
-        table.add_row(str(i), img)
-    console.print(table)
+    console.print(_image_table(images))
 
     console.print(
         "  [dim]Enter number(s) separated by commas · "
@@ -824,24 +1291,532 @@ def _probe_queue_sizes(
     queue: List[_DownloadJob],
     no_cert: bool,
     creds: Optional[VaultCredentials],
+    workers: int = MAX_PER_HOST,
 ) -> None:
     """
-    HEAD-request every job in *queue* to populate size_bytes.
-    Runs sequentially with a spinner; skipped gracefully on any error.
+    Populate size_bytes for every job in *queue*.
+
+    Sizes known exactly from the vault catalog or from the listing rows
+    (plain byte counts) need no request.  The rest are HEAD-requested, up
+    to *workers* at a time and never more than MAX_PER_HOST per host;
+    rounded listing sizes ("3M") are kept in size_approx meanwhile, so the
+    disk-space estimate still has a figure if the HEAD fails.
     """
+    for job in queue:
+        entry = _catalog_entry(job.url, no_cert, creds)
+        if entry is not None and isinstance(entry.get("size"), int):
+            job.size_bytes = entry["size"]
+            continue
+        listed = _LISTED_SIZES.get(job.url)
+        if listed is not None:
+            size, exact = listed
+            if exact:
+                job.size_bytes = size
+            else:
+                job.size_approx = size
+    queue = [job for job in queue if job.size_bytes is None]
+    if not queue:
+        return
+
+    def _probe(job: _DownloadJob) -> Optional[int]:
+        with _host_slot(job.url):
+            return _probe_head(job.url, no_cert, creds)
+
     with Progress(
         SpinnerColumn(),
         TextColumn("[dim]Probing file sizes … {task.description}[/dim]"),
         console=console,
         transient=True,
-    ) as p:
+    ) as p, ThreadPoolExecutor(
+        max_workers=max(1, min(workers, len(queue))),
+        thread_name_prefix="openchai-probe",
+    ) as pool:
         t = p.add_task("", total=len(queue))
-        for job in queue:
+        futures = {pool.submit(_probe, job): job for job in queue}
+        for fut in as_completed(futures):
+            job = futures[fut]
+            job.size_bytes = fut.result()
             p.update(t, description=Path(job.img_path).name)
-            job.size_bytes = _probe_head(job.url, no_cert, creds)
             p.advance(t)
 
 
+def _split_collisions(
+    jobs: List[_DownloadJob],
+) -> Tuple[List[_DownloadJob], Dict[Path, List[str]]]:
+    """
+    Images land flat in <LOCAL_DIR>/<tool>/, so nested paths that share a
+    basename (a/x.sif, b/x.sif) would overwrite each other.  Returns the
+    jobs whose destination is unique, and {dest: [img_path, …]} for the
+    ones that collide — none of which may be downloaded.
+    """
+    by_dest: Dict[Path, List[_DownloadJob]] = {}
+    for job in jobs:
+        by_dest.setdefault(job.dest, []).append(job)
+    clashes = {
+        dest: [j.img_path for j in group]
+        for dest, group in by_dest.items() if len(group) > 1
+    }
+    return [j for j in jobs if j.dest not in clashes], clashes
+
+
+def _space_needed(
+    queue: List[_DownloadJob],
+    catalog: Optional[LocalCatalog] = None,
+) -> Tuple[int, int]:
+    """
+    Estimate the bytes *queue* will still write under LOCAL_DIR.
+    Complete destinations are looked up in *catalog* when one is given.
+
+    Returns (bytes, unknown) where *unknown* counts jobs with no size at
+    all.  Complete destinations, blobs already in the store and duplicate
+    digests cost nothing; a .part file only needs its missing bytes
+    (allocated blocks, so preallocated and sparse segmented .parts count
+    correctly).
+    """
+    needed  = 0
+    unknown = 0
+    digests = set()
+    for job in queue:
+        size = job.size_bytes if job.size_bytes is not None else job.size_approx
+        if size is None:
+            unknown += 1
+            continue
+        if job.sha256:
+            if job.sha256 in digests or _store_path(job.sha256).exists():
+                continue
+            digests.add(job.sha256)
+        try:
+            have = catalog.size(job.dest) if catalog is not None else job.dest.stat().st_size
+            if have == size:
+                continue
+        except OSError:
+            pass
+        try:
+            st   = job.dest.with_suffix(job.dest.suffix + ".part").stat()
+            size = max(0, size - st.st_blocks * 512)
+        except OSError:
+            pass
+        needed += size
+    return needed, unknown
+
+
+# ─────────────────────────────────────────────
+# Bandwidth governor (TokenBucket in http_transfer.py)
+# ─────────────────────────────────────────────
+_THROTTLE = TokenBucket(MAX_RATE, parse_window(RATE_WINDOW))
+
+
+# ─────────────────────────────────────────────
+# Worker-pool coordination
+# Shared by every download worker thread.
+# ─────────────────────────────────────────────
+_HOST_SLOTS: Dict[str, threading.BoundedSemaphore] = {}
+_BULK_SLOTS: Dict[str, threading.BoundedSemaphore] = {}
+_HOST_SLOTS_LOCK = threading.Lock()
+
+# Set on Ctrl-C so workers stop between chunks and keep their .part files
+_CANCEL = threading.Event()
+
+# Latest credentials seen by any worker, guarded by _AUTH_COND.  Only the
+# main thread prompts: a worker that gets a 401 sets "wanted" and waits
+# until _answer_auth_request() has collected an answer, which the other
+# workers then reuse.
+_AUTH_COND  = threading.Condition()
+_AUTH_STATE: Dict[str, object] = {"creds": None, "aborted": False, "wanted": False}
+
+
+@contextmanager
+def _host_slot(url: str, bulk: bool = False) -> Iterator[None]:
+    """
+    Hold one of the MAX_PER_HOST in-flight request slots for *url*'s host.
+    *bulk* transfers (image bodies) may only fill MAX_PER_HOST -
+    HOST_RESERVED of them, so listings and size probes never queue
+    behind long downloads.
+    """
+    host = urlparse(url).netloc
+    with _HOST_SLOTS_LOCK:
+        sem = _HOST_SLOTS.get(host)
+        if sem is None:
+            sem = _HOST_SLOTS[host] = threading.BoundedSemaphore(max(1, MAX_PER_HOST))
+        cap = _BULK_SLOTS.get(host)
+        if cap is None:
+            cap = _BULK_SLOTS[host] = threading.BoundedSemaphore(max(1, MAX_PER_HOST - HOST_RESERVED))
+    with (cap if bulk else nullcontext()), sem:
+        yield
+
+
+def _refresh_credentials(
+    stale: Optional[VaultCredentials],
+) -> Tuple[bool, Optional[VaultCredentials]]:
+    """
+    Serialise the 401 re-prompt across workers.
+    Returns (ok, creds); ok=False means the user declined (or the run was
+    cancelled) and every worker should give up on authentication.
+    """
+    with _AUTH_COND:
+        if _AUTH_STATE["aborted"]:
+            return False, None
+        current = _AUTH_STATE["creds"]
+        if current is not stale:
+            # Another worker already collected new credentials
+            return True, current  # type: ignore[return-value]
+        _AUTH_STATE["wanted"] = True
+        _AUTH_COND.notify_all()
+        while _AUTH_STATE["creds"] is stale and not _AUTH_STATE["aborted"]:
+            if _CANCEL.is_set():
+                return False, None
+            _AUTH_COND.wait(timeout=0.5)
+        if _AUTH_STATE["aborted"]:
+            return False, None
+        return True, _AUTH_STATE["creds"]  # type: ignore[return-value]
+
+
+def _answer_auth_request() -> None:
+    """Main thread: run the 401 re-prompt a download worker is waiting on."""
+    with _AUTH_COND:
+        if not _AUTH_STATE["wanted"]:
+            return
+    new_creds = _re_prompt_credentials(
+        "HTTP 401 — credentials rejected by server"
+    )
+    with _AUTH_COND:
+        _AUTH_STATE["wanted"] = False
+        if new_creds is None:
+            _AUTH_STATE["aborted"] = True
+        else:
+            _AUTH_STATE["creds"] = new_creds
+        _AUTH_COND.notify_all()
+
+
+# ─────────────────────────────────────────────
+# Segmented (multi-range) transfer
+# ─────────────────────────────────────────────
+class _RangesUnsupported(Exception):
+    """Server answered a Range request with a full body — use one stream."""
+
+
+def _segment_state_path(tmp: Path) -> Path:
+    return tmp.with_suffix(tmp.suffix + ".segments")
+
+
+def _load_segment_state(
+    state_path: Path,
+    size: int,
+) -> Optional[Tuple[List[Tuple[int, int]], List[int]]]:
+    """
+    Read (bounds, done) from a .segments sidecar written by an earlier run.
+    Returns None when missing, unreadable, or recorded for a different size.
+    """
+    try:
+        state = json.loads(state_path.read_text())
+        if state.get("size") != size:
+            return None
+        bounds = [(int(a), int(b)) for a, b in state["bounds"]]
+        done   = [int(d) for d in state["done"]]
+        if len(bounds) != len(done):
+            return None
+        return bounds, done
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _save_segment_state(
+    state_path: Path,
+    size: int,
+    bounds: List[Tuple[int, int]],
+    done: List[int],
+) -> None:
+    tmp_state = state_path.with_suffix(".tmp")
+    tmp_state.write_text(json.dumps({"size": size, "bounds": bounds, "done": done}))
+    os.replace(tmp_state, state_path)
+
+
+def _split_ranges(size: int, count: int) -> List[Tuple[int, int]]:
+    """Split [0, size) into *count* inclusive byte ranges of near-equal length."""
+    step = -(-size // count)
+    return [(a, min(a + step, size) - 1) for a in range(0, size, step)]
+
+
+def _download_segmented(
+    job: _DownloadJob,
+    tmp: Path,
+    segments: int,
+    no_cert: bool,
+    creds: Optional[VaultCredentials],
+    progress: Progress,
+    file_task: TaskID,
+) -> Optional[str]:
+    """
+    Fetch job.url as *segments* parallel byte ranges written in place into a
+    preallocated *tmp* file.  Per-segment progress is kept in a .segments
+    sidecar so an interrupted run resumes every range where it stopped.
+
+    Returns None on success or an error string on failure.
+    Raises _RangesUnsupported if the server ignores Range headers and
+    KeyboardInterrupt if the download was cancelled.
+    """
+    size       = job.size_bytes or 0
+    state_path = _segment_state_path(tmp)
+    filename   = Path(job.img_path).name
+
+    state = _load_segment_state(state_path, size) if tmp.exists() else None
+    if state is None:
+        bounds = _split_ranges(size, segments)
+        done   = [0] * len(bounds)
+    else:
+        bounds, done = state
+        log_info(
+            f"Resuming {filename} in {len(bounds)} segment(s) "
+            f"from {sum(done):,} byte(s)"
+        )
+
+    fd = os.open(tmp, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if os.fstat(fd).st_size != size:
+            if hasattr(os, "posix_fallocate"):
+                try:
+                    os.posix_fallocate(fd, 0, size)
+                except OSError:
+                    os.ftruncate(fd, size)   # filesystem without fallocate
+            else:
+                os.ftruncate(fd, size)
+        _save_segment_state(state_path, size, bounds, done)
+        progress.update(file_task, total=size, completed=sum(done))
+
+        state_lock = threading.Lock()
+        stop       = threading.Event()
+        last_save  = [time.monotonic()]
+        ticker     = ProgressTicker(progress, file_task)
+
+        def _checkpoint(force: bool = False) -> None:
+            with state_lock:
+                if force or time.monotonic() - last_save[0] >= 2.0:
+                    _save_segment_state(state_path, size, bounds, list(done))
+                    last_save[0] = time.monotonic()
+
+        def _fetch(idx: int) -> Optional[str]:
+            start, end = bounds[idx]
+            seg_creds  = creds
+            buf        = RecvBuffer()
+            for attempt in range(1, MAX_RETRIES + 1):
+                pos = start + done[idx]
+                if pos > end:
+                    return None
+                req = _build_request(job.url, seg_creds,
+                                     {"Range": f"bytes={pos}-{end}"})
+                try:
+                    with _host_slot(job.url, bulk=True), _POOL.urlopen(
+                        req, no_cert, timeout=DOWNLOAD_TIMEOUT_S
+                    ) as resp:
+                        if resp.status != 206:
+                            stop.set()
+                            raise _RangesUnsupported()
+                        while pos <= end:
+                            if _CANCEL.is_set():
+                                raise KeyboardInterrupt
+                            if stop.is_set():
+                                return "stopped"
+                            chunk = buf.fill(resp, end - pos + 1)
+                            if not chunk:
+                                break
+                            os.pwrite(fd, chunk, pos)
+                            pos += len(chunk)
+                            with state_lock:
+                                done[idx] += len(chunk)
+                            ticker.advance(len(chunk))
+                            _checkpoint()
+                            _THROTTLE.consume(len(chunk))
+                    if pos > end:
+                        return None
+                    raise OSError(f"segment {idx} closed early at byte {pos:,}")
+
+                except urllib.error.HTTPError as exc:
+                    if exc.code == 401:
+                        ok, seg_creds = _refresh_credentials(seg_creds)
+                        if not ok:
+                            stop.set()
+                            return "Aborted after authentication failure"
+                        continue
+                    stop.set()
+                    if exc.code == 416:
+                        return "Range not satisfiable — remote file changed size"
+                    return _http_hint(exc.code, job.url)
+
+                except (urllib.error.URLError, OSError) as exc:
+                    log_warn(
+                        f"Transient error on {filename} segment {idx + 1}/"
+                        f"{len(bounds)} (attempt {attempt}/{MAX_RETRIES}): {exc}"
+                    )
+                    if attempt < MAX_RETRIES:
+                        time.sleep(2 ** attempt)
+
+            stop.set()
+            return f"Segment {idx + 1} failed after {MAX_RETRIES} attempt(s)"
+
+        with ThreadPoolExecutor(
+            max_workers=len(bounds), thread_name_prefix="openchai-seg"
+        ) as seg_pool:
+            futures = [seg_pool.submit(_fetch, i) for i in range(len(bounds))]
+            errors: List[str] = []
+            interrupted: Optional[BaseException] = None
+            for fut in futures:
+                try:
+                    err = fut.result()
+                except (_RangesUnsupported, KeyboardInterrupt) as exc:
+                    interrupted = interrupted or exc
+                    continue
+                if err and err != "stopped":
+                    errors.append(err)
+            ticker.flush()
+    finally:
+        os.close(fd)
+
+    if isinstance(interrupted, _RangesUnsupported):
+        tmp.unlink(missing_ok=True)
+        state_path.unlink(missing_ok=True)
+        raise interrupted
+    _save_segment_state(state_path, size, bounds, done)
+    if interrupted is not None:
+        raise interrupted
+    if errors:
+        return errors[0]
+
+    state_path.unlink(missing_ok=True)
+    return None
+
+
+# ─────────────────────────────────────────────
+# Checksum manifest & content-addressed store
+# ─────────────────────────────────────────────
+_SHA256_RE = re.compile(r"^([0-9a-fA-F]{64})\s+\*?(.+?)\s*$")
+
+_DIGEST_LOCKS: Dict[str, threading.Lock] = {}
+_DIGEST_LOCKS_LOCK = threading.Lock()
+
+# Blobs re-hashed this run (under their _digest_lock).  A blob shares its
+# inode with every image linked to it, so damage to any of them is damage
+# to the blob: it is checked before it is trusted, once per run.
+_VERIFIED_BLOBS: Set[str] = set()
+
+
+def _parse_manifest(text: str) -> Dict[str, str]:
+    """Parse sha256sum output into {relative path: lowercase hex digest}."""
+    digests: Dict[str, str] = {}
+    for line in text.splitlines():
+        m = _SHA256_RE.match(line)
+        if not m:
+            continue
+        name = m.group(2).removeprefix("./")
+        if name.startswith("/") or ".." in name.split("/"):
+            log.warning("Ignoring %s entry outside its directory: %s", MANIFEST_NAME, name)
+            continue
+        digests[name] = m.group(1).lower()
+    return digests
+
+
+def _fetch_manifest(
+    dir_url: str,
+    no_cert: bool,
+    creds: Optional[VaultCredentials],
+) -> Dict[str, str]:
+    """Fetch <dir_url>/MANIFEST_NAME; an absent manifest yields {}."""
+    try:
+        req = _build_request(_safe_join_url(dir_url, MANIFEST_NAME), creds)
+        with _POOL.urlopen(req, no_cert, timeout=CONNECT_TIMEOUT_S) as resp:
+            return _parse_manifest(resp.read().decode("utf-8", errors="replace"))
+    except urllib.error.HTTPError as exc:
+        if exc.code != 404:
+            log_warn(f"Could not read {MANIFEST_NAME} under {dir_url}: HTTP {exc.code}")
+    except Exception as exc:
+        log_warn(f"Could not read {MANIFEST_NAME} under {dir_url}: {exc}")
+    return {}
+
+
+def _attach_digests(
+    queue: List[_DownloadJob],
+    os_version: str,
+    no_cert: bool,
+    creds: Optional[VaultCredentials],
+) -> None:
+    """Fill job.sha256 from the vault catalog, else each version directory's manifest."""
+    manifests: Dict[str, Dict[str, str]] = {}
+    for job in queue:
+        entry = _catalog_entry(job.url, no_cert, creds)
+        if entry is not None and entry.get("sha256"):
+            job.sha256 = str(entry["sha256"]).lower()
+            continue
+        dir_url = f"{CONTAINER_REG_BASE_URL}/{os_version}/{job.tool}/{job.version}/"
+        if dir_url not in manifests:
+            manifests[dir_url] = _fetch_manifest(dir_url, no_cert, creds)
+        digests = manifests[dir_url]
+        job.sha256 = digests.get(job.img_path) or digests.get(Path(job.img_path).name)
+
+
+def _store_path(digest: str) -> Path:
+    return Path(LOCAL_DIR) / STORE_DIRNAME / "sha256" / digest[:2] / digest
+
+
+@contextmanager
+def _digest_lock(digest: str) -> Iterator[None]:
+    """Serialise work on one digest so duplicate images download once."""
+    with _DIGEST_LOCKS_LOCK:
+        lock = _DIGEST_LOCKS.setdefault(digest, threading.Lock())
+    with lock:
+        yield
+
+
+def _sha256_file(path: Path, limit: Optional[int] = None) -> "hashlib._Hash":
+    """Hash the first *limit* bytes of *path* (whole file if None)."""
+    hasher = hashlib.sha256()
+    remaining = limit
+    with open(path, "rb") as fh:
+        while remaining is None or remaining > 0:
+            block = fh.read(CHUNK_SIZE if remaining is None else min(CHUNK_SIZE, remaining))
+            if not block:
+                break
+            hasher.update(block)
+            if remaining is not None:
+                remaining -= len(block)
+    return hasher
+
+
+def _link_into_place(blob: Path, dest: Path) -> None:
+    """Atomically hard-link *blob* at *dest* (copy if links are unsupported)."""
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    staging = dest.with_name(f".{dest.name}.link")
+    staging.unlink(missing_ok=True)
+    try:
+        os.link(blob, staging)
+    except OSError:
+        shutil.copy2(blob, staging)
+    os.replace(staging, dest)
+
+
+def _commit_download(job: _DownloadJob, tmp: Path, actual: Optional[str]) -> Optional[str]:
+    """
+    Move a finished .part into place.  With a vault digest the bytes are
+    checked (*actual* is the digest computed while streaming, or None to
+    hash *tmp* now), stored under .store/sha256 and hard-linked to
+    job.dest.  Returns an error string, or None on success.
+    """
+    if not job.sha256:
+        tmp.rename(job.dest)
+        return None
+    if actual is None:
+        actual = _sha256_file(tmp).hexdigest()
+    if actual != job.sha256:
+        tmp.unlink(missing_ok=True)
+        return f"SHA-256 mismatch (expected {job.sha256[:12]}…, got {actual[:12]}…)"
+    blob = _store_path(actual)
+    blob.parent.mkdir(parents=True, exist_ok=True)
+    if blob.exists():
+        tmp.unlink()
+    else:
+        os.replace(tmp, blob)
+    _link_into_place(blob, job.dest)
+    return None
+
+
 # ─────────────────────────────────────────────
 # Download engine
 # ─────────────────────────────────────────────
@@ -851,6 +1826,77 @@ def _download_file(
     creds: Optional[VaultCredentials],
     progress: Progress,
     overall_task: TaskID,
+    segments: int = SEGMENTS,
+) -> _DownloadResult:
+    """
+    Download one job, going through the content-addressed store when the
+    vault publishes a digest for it:
+      • digest already in the store   → re-hash the blob once per run,
+                                        then hard-link, no transfer
+      • dest present but not in store → hash once, adopt into the store
+      • otherwise                     → _transfer_file() with verification
+    Jobs without a digest go straight to _transfer_file().
+    """
+    if not job.sha256:
+        return _transfer_file(job, no_cert, creds, progress, overall_task, segments)
+
+    filename = Path(job.img_path).name
+    with _digest_lock(job.sha256):
+        blob = _store_path(job.sha256)
+
+        if not blob.exists() and job.dest.exists() and (
+            job.size_bytes is None or job.dest.stat().st_size == job.size_bytes
+        ):
+            if _sha256_file(job.dest).hexdigest() == job.sha256:
+                try:
+                    blob.parent.mkdir(parents=True, exist_ok=True)
+                    os.link(job.dest, blob)
+                    log.info("Adopted %s into store as %s", job.dest, job.sha256)
+                except OSError as exc:
+                    # EXDEV / EPERM / EMLINK: the image is intact, it just stays out of the store
+                    log.info("Not adopting %s into store: %s", job.dest, exc)
+                    log_notice(f"Already complete, skipping: {filename}")
+                    progress.update(overall_task, advance=1)
+                    return _DownloadResult(
+                        job=job, success=True, skipped=True, detail="Already downloaded (verified)",
+                    )
+            else:
+                log_warn(f"{filename} does not match its vault digest — re-downloading.")
+                job.dest.unlink()
+
+        if blob.exists() and job.sha256 not in _VERIFIED_BLOBS:
+            if (
+                (job.size_bytes is None or blob.stat().st_size == job.size_bytes)
+                and _sha256_file(blob).hexdigest() == job.sha256
+            ):
+                _VERIFIED_BLOBS.add(job.sha256)
+            else:
+                log_warn(f"Stored copy of {filename} is damaged — dropping it and re-downloading.")
+                if job.dest.exists() and os.path.samefile(blob, job.dest):
+                    job.dest.unlink()
+                blob.unlink()
+
+        if blob.exists():
+            if job.dest.exists() and os.path.samefile(blob, job.dest):
+                detail = "Already downloaded (verified)"
+                log_notice(f"Already complete, skipping: {filename}")
+            else:
+                _link_into_place(blob, job.dest)
+                detail = "Linked from local store"
+                log_notice(f"Identical image already stored, linked: {filename}")
+            progress.update(overall_task, advance=1)
+            return _DownloadResult(job=job, success=True, skipped=True, detail=detail)
+
+        return _transfer_file(job, no_cert, creds, progress, overall_task, segments)
+
+
+def _transfer_file(
+    job: _DownloadJob,
+    no_cert: bool,
+    creds: Optional[VaultCredentials],
+    progress: Progress,
+    overall_task: TaskID,
+    segments: int = SEGMENTS,
 ) -> _DownloadResult:
     """
     Stream-download job.url → job.dest with:
@@ -859,12 +1905,20 @@ def _download_file(
       • Up to MAX_RETRIES attempts with exponential back-off
       • Per-file progress bar inside the shared *progress* context
       • Credential re-prompt on HTTP 401
+      • Segmented transfer — images of known size ≥ 2 × SEGMENT_MIN_BYTES
+        are fetched as up to *segments* parallel byte ranges written at
+        their offsets in the .part file (falls back to a single stream
+        if the server ignores Range)
+      • SHA-256 verification when job.sha256 is set — hashed as the bytes
+        stream in on the single-stream path; segments arrive out of order
+        so segmented files are hashed once after the last range lands
 
     Returns a _DownloadResult.
     """
     job.dest.parent.mkdir(parents=True, exist_ok=True)
-    tmp      = job.dest.with_suffix(job.dest.suffix + ".part")
-    filename = Path(job.img_path).name
+    tmp        = job.dest.with_suffix(job.dest.suffix + ".part")
+    state_path = _segment_state_path(tmp)
+    filename   = Path(job.img_path).name
 
     # ── Already fully downloaded? ─────────────────────────────────────────
     if job.dest.exists() and job.dest.stat().st_size > 0:
@@ -878,8 +1932,38 @@ def _download_file(
     file_task = progress.add_task(
         f"[cyan]{job.tool}[/cyan] [dim]/[/dim] [white]{filename}[/white]",
         total=job.size_bytes,
+        job=job,
     )
 
+    # ── Segmented transfer for large images of known size ────────────────
+    seg_count = min(segments, (job.size_bytes or 0) // SEGMENT_MIN_BYTES)
+    if seg_count > 1:
+        try:
+            err = _download_segmented(
+                job, tmp, seg_count, no_cert, creds, progress, file_task
+            )
+        except _RangesUnsupported:
+            log_warn(f"Server ignored Range for {filename} — using one stream.")
+            progress.update(file_task, completed=0)
+        except KeyboardInterrupt:
+            progress.remove_task(file_task)
+            return _DownloadResult(job=job, success=False, error="Cancelled")
+        else:
+            if err is None:
+                err = _commit_download(job, tmp, None)
+            if err is not None:
+                log_error(f"Segmented download of {filename} failed: {err}")
+                progress.remove_task(file_task)
+                return _DownloadResult(job=job, success=False, error=err)
+            progress.update(file_task, completed=job.size_bytes)
+            progress.update(overall_task, advance=1)
+            log.info("Downloaded %s → %s (%d segments)", job.url, job.dest, seg_count)
+            return _DownloadResult(job=job, success=True)
+    elif state_path.exists():
+        # A sparse .part left by a segmented run cannot be resumed linearly
+        tmp.unlink(missing_ok=True)
+        state_path.unlink(missing_ok=True)
+
     for attempt in range(1, MAX_RETRIES + 1):
         resumed_at      = tmp.stat().st_size if tmp.exists() else 0
         extra_headers: Dict[str, str] = {}
@@ -894,31 +1978,51 @@ def _download_file(
         elif attempt > 1:
             log_info(f"Retrying {filename} (attempt {attempt}/{MAX_RETRIES})")
 
-        ctx = _make_ssl_ctx(no_cert)
         req = _build_request(job.url, creds, extra_headers)
 
         try:
-            with urllib.request.urlopen(
-                req, context=ctx, timeout=DOWNLOAD_TIMEOUT_S
+            with _host_slot(job.url, bulk=True), _POOL.urlopen(
+                req, no_cert, timeout=DOWNLOAD_TIMEOUT_S
             ) as resp:
                 # Update progress bar total from server response
                 cl = resp.headers.get("Content-Length")
-                if cl and cl.isdigit():
-                    server_len = int(cl)
+                server_len = int(cl) if cl and cl.isdigit() else 0
+                if server_len:
                     # 206 Partial Content → total is resumed_at + remaining
                     new_total = (resumed_at + server_len) if resp.status == 206 else server_len
                     progress.update(file_task, total=new_total)
 
                 mode = "ab" if (resumed_at > 0 and resp.status == 206) else "wb"
+                hasher = None
+                if job.sha256:
+                    # Only the resumed prefix is read back; new bytes hash in flight
+                    hasher = (
+                        _sha256_file(tmp, resumed_at) if mode == "ab" else hashlib.sha256()
+                    )
+                buf    = RecvBuffer()
+                ticker = ProgressTicker(progress, file_task)
                 with open(tmp, mode) as fh:
-                    while True:
-                        chunk = resp.read(CHUNK_SIZE)
-                        if not chunk:
-                            break
-                        fh.write(chunk)
-                        progress.update(file_task, advance=len(chunk))
-
-            tmp.rename(job.dest)
+                    preallocate(fh.fileno(), resumed_at if mode == "ab" else 0, server_len)
+                    try:
+                        while True:
+                            if _CANCEL.is_set():
+                                raise KeyboardInterrupt
+                            chunk = buf.fill(resp)
+                            if not chunk:
+                                break
+                            fh.write(chunk)
+                            if hasher is not None:
+                                hasher.update(chunk)
+                            ticker.advance(len(chunk))
+                            _THROTTLE.consume(len(chunk))
+                    finally:
+                        ticker.flush()
+
+            err = _commit_download(job, tmp, hasher.hexdigest() if hasher else None)
+            if err is not None:
+                log_error(f"Verification of {filename} failed: {err}")
+                progress.remove_task(file_task)
+                return _DownloadResult(job=job, success=False, error=err)
             progress.update(
                 file_task,
                 completed=progress.tasks[file_task].total or 0,
@@ -929,11 +2033,9 @@ def _download_file(
 
         except urllib.error.HTTPError as exc:
             if exc.code == 401:
-                # Offer credential re-entry once per file
-                new_creds = _re_prompt_credentials(
-                    "HTTP 401 — credentials rejected by server"
-                )
-                if new_creds is None:
+                # Offer credential re-entry (once across all workers)
+                ok, new_creds = _refresh_credentials(creds)
+                if not ok:
                     progress.remove_task(file_task)
                     if tmp.exists():
                         tmp.unlink()
@@ -969,6 +2071,11 @@ def _download_file(
                 log_info(f"Waiting {wait} s before retry …")
                 time.sleep(wait)
 
+        except KeyboardInterrupt:
+            # Cancelled — keep the .part file so the next run resumes it
+            progress.remove_task(file_task)
+            return _DownloadResult(job=job, success=False, error="Cancelled")
+
         except Exception as exc:
             log_error(f"Unexpected error downloading {filename}: {exc}")
             break
@@ -981,6 +2088,112 @@ def _download_file(
     return _DownloadResult(job=job, success=False, error=err_msg)
 
 
+# ─────────────────────────────────────────────
+# Download runner
+# One worker pool and one Progress for the whole run.  Jobs may be
+# submitted while the operator is still choosing (--prefetch); the
+# Progress only renders once the download phase starts, so until then
+# transfers run silently behind the menus (worker messages go to the
+# log file only, and a 401 waits for the main thread to re-prompt).
+# ─────────────────────────────────────────────
+class _DownloadRunner:
+
+    def __init__(
+        self,
+        jobs: int,
+        no_cert: bool,
+        creds: Optional[VaultCredentials],
+        segments: int,
+    ) -> None:
+        self.no_cert, self.segments = no_cert, segments
+        self.progress = Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            BarColumn(bar_width=30),
+            DownloadColumn(),
+            TransferSpeedColumn(),
+            TimeRemainingColumn(),
+            console=console,
+        )
+        self.overall  = self.progress.add_task("[bold]Overall  (0 / 0)[/bold]", total=0)
+        self.futures: Dict[int, "Future[_DownloadResult]"] = {}
+        self.finished = 0
+        self._lock    = threading.Lock()
+        self._pool    = ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="openchai-dl")
+        _CANCEL.clear()
+        _PREFETCHING.set()
+        _AUTH_STATE.update(creds=creds, aborted=False, wanted=False)
+
+    def _label(self) -> str:
+        return f"[bold]Overall  ({self.finished} / {len(self.futures)})[/bold]"
+
+    def _worker(self, job: _DownloadJob) -> _DownloadResult:
+        try:
+            # Pick up credentials refreshed by another worker's 401
+            job_creds = _AUTH_STATE["creds"]  # type: ignore[assignment]
+            result = _download_file(
+                job, self.no_cert, job_creds, self.progress, self.overall, self.segments
+            )
+        except Exception as exc:   # never let one job kill the pool
+            log_error(f"Worker crashed on {Path(job.img_path).name}: {exc}")
+            result = _DownloadResult(job=job, success=False, error=str(exc))
+        with self._lock:
+            self.finished += 1
+            self.progress.update(self.overall, description=self._label())
+        return result
+
+    def submit(self, queue: List[_DownloadJob]) -> None:
+        """Start every job in *queue* not already submitted."""
+        with self._lock:
+            for job in queue:
+                if id(job) not in self.futures:
+                    self.futures[id(job)] = self._pool.submit(self._worker, job)
+            self.progress.update(
+                self.overall, total=len(self.futures), description=self._label()
+            )
+
+    def status(self, job: _DownloadJob) -> str:
+        """Summary-table label for a job submitted early, "" if it was not."""
+        fut = self.futures.get(id(job))
+        if fut is None:
+            return ""
+        if fut.done():
+            r = fut.result()
+            return (
+                "[green]\\[done][/green]" if r.success
+                else f"[red]\\[failed: {r.error}][/red]"
+            )
+        for task in self.progress.tasks:
+            if task.fields.get("job") is job and task.total:
+                return f"[cyan]\\[{task.completed * 100 // task.total:.0f}% fetched][/cyan]"
+        return "[cyan]\\[queued][/cyan]"
+
+    def results(self, queue: List[_DownloadJob]) -> List[_DownloadResult]:
+        """Submit what is left, show progress and wait; results in queue order."""
+        self.submit(queue)
+        _PREFETCHING.clear()
+        pending = [self.futures[id(job)] for job in queue]
+        try:
+            with self.progress:
+                while wait(pending, timeout=0.25).not_done:
+                    if _AUTH_STATE["wanted"]:
+                        self.progress.stop()
+                        _answer_auth_request()
+                        self.progress.start()
+                return [fut.result() for fut in pending]
+        except KeyboardInterrupt:
+            self.cancel()
+            raise
+        finally:
+            self._pool.shutdown(wait=True)
+
+    def cancel(self) -> None:
+        """Stop every transfer between chunks; .part files stay for a resume."""
+        _CANCEL.set()
+        _PREFETCHING.clear()
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+
 # ─────────────────────────────────────────────
 # Main workflow
 # ─────────────────────────────────────────────
@@ -988,6 +2201,11 @@ def run(
     no_cert: bool = _NO_CERT,
     creds: Optional[VaultCredentials] = None,
     os_version: Optional[str] = None,
+    jobs: int = DOWNLOAD_JOBS,
+    segments: int = SEGMENTS,
+    crawl_depth: int = CRAWL_DEPTH,
+    crawl_workers: int = CRAWL_WORKERS,
+    prefetch: bool = False,
 ) -> None:
     """
     Primary entry-point — called by configure_openchai_manager.py with
@@ -999,6 +2217,15 @@ def run(
                  Defaults to (not SSL_VERIFY_CERT) from the constants block.
     creds      : VaultCredentials from the parent script, or None to prompt.
     os_version : Pre-selected OS label (e.g. "alma9.3"), or None to prompt.
+    jobs       : Number of images downloaded in parallel (default DOWNLOAD_JOBS).
+    segments   : Parallel byte ranges per large image (default SEGMENTS;
+                 1 disables segmented transfer).
+    crawl_depth   : Directory levels searched below each version directory
+                    (default CRAWL_DEPTH; 0 = unlimited).
+    crawl_workers : Directory listings fetched concurrently (default CRAWL_WORKERS).
+    prefetch   : Start each tool's downloads as soon as its images are
+                 chosen, while the next tool's menus are shown.  The queue
+                 summary then reports what already arrived.
     """
     # ── Banner ────────────────────────────────────────────────────────────
     console.print()
@@ -1069,133 +2296,186 @@ def run(
     )
 
     download_queue: List[_DownloadJob] = []
+    runner = _DownloadRunner(max(1, jobs), no_cert, creds, segments) if prefetch else None
 
-    for tool in TOOLS:
-        console.print(f"[bold yellow]╔══ {tool} ══[/bold yellow]")
+    # Every tool's version listing is fetched up front, concurrently, so the
+    # prompts below never wait on a serial round-trip per tool
+    try:
+        with ThreadPoolExecutor(
+            max_workers=max(1, crawl_workers), thread_name_prefix="openchai-crawl"
+        ) as listing_pool:
+            version_lists = {
+                tool: listing_pool.submit(_list_versions, tool, os_version, no_cert, creds)
+                for tool in TOOLS
+            }
+
+            for tool in TOOLS:
+                _answer_auth_request()     # a prefetch worker may be waiting on a 401
+                console.print(f"[bold yellow]╔══ {tool} ══[/bold yellow]")
+
+                version = _select_tool_version(
+                    tool, os_version, no_cert, creds, versions=version_lists[tool].result(),
+                )
+                if version is None:
+                    console.print()
+                    continue
 
-        version = _select_tool_version(tool, os_version, no_cert, creds)
-        if version is None:
-            console.print()
-            continue
+                selected_imgs = _select_images(
+                    tool, os_version, version, no_cert, creds,
+                    crawl_depth=crawl_depth, crawl_workers=crawl_workers,
+                )
+                if not selected_imgs:
+                    console.print()
+                    continue
 
-        selected_imgs = _select_images(tool, os_version, version, no_cert, creds)
-        if not selected_imgs:
-            console.print()
-            continue
+                tool_jobs = [
+                    _DownloadJob(
+                        tool     = tool,
+                        version  = version,
+                        img_path = img_path,
+                        url      = f"{CONTAINER_REG_BASE_URL}/{os_version}/{tool}/{version}/{img_path}",
+                        dest     = Path(LOCAL_DIR) / tool / Path(img_path).name,
+                    )
+                    for img_path in selected_imgs
+                ]
+                tool_jobs, clashes = _split_collisions(tool_jobs)
+                for dest, paths in clashes.items():
+                    log_error(
+                        f"{tool}: {', '.join(paths)} would all be saved as {dest.name} — "
+                        f"not downloading them."
+                    )
+                if not tool_jobs:
+                    console.print()
+                    continue
+                download_queue.extend(tool_jobs)
+                if runner is not None:
+                    _probe_queue_sizes(tool_jobs, no_cert, creds)
+                    _attach_digests(tool_jobs, os_version, no_cert, creds)
+                    # Prefetch only what fits: bytes written now cannot be
+                    # taken back by the disk-space check at the summary
+                    needed, _ = _space_needed(download_queue)
+                    free = shutil.disk_usage(LOCAL_DIR).free
+                    if needed > free:
+                        log_warn(
+                            f"Not prefetching {tool}: the queue needs about {_fmt_bytes(needed)}, "
+                            f"{_fmt_bytes(free)} free — space is checked again before downloading."
+                        )
+                    else:
+                        runner.submit(tool_jobs)
+                        log_info(f"Prefetching {len(tool_jobs)} {tool} image(s) in the background.")
+                console.print()
+
+        # ── Nothing selected ─────────────────────────────────────────────────
+        if not download_queue:
+            log_warn("No images selected. Nothing to download.")
+            return
+
+        # ── Probe file sizes & vault digests ──────────────────────────────────
+        if runner is None:
+            _probe_queue_sizes(download_queue, no_cert, creds)
+            _attach_digests(download_queue, os_version, no_cert, creds)
+
+        # ── Download queue summary ────────────────────────────────────────────
+        catalog = LocalCatalog(Path(LOCAL_DIR)).refresh()
 
-        for img_path in selected_imgs:
-            img_url = (
-                f"{CONTAINER_REG_BASE_URL}/{os_version}"
-                f"/{tool}/{version}/{img_path}"
-            )
-            dest = Path(LOCAL_DIR) / tool / Path(img_path).name
-            download_queue.append(_DownloadJob(
-                tool     = tool,
-                version  = version,
-                img_path = img_path,
-                url      = img_url,
-                dest     = dest,
-            ))
         console.print()
+        console.print(Rule("[bold]Download Queue[/bold]"))
 
-    # ── Nothing selected ─────────────────────────────────────────────────
-    if not download_queue:
-        log_warn("No images selected. Nothing to download.")
-        return
-
-    # ── Probe file sizes ──────────────────────────────────────────────────
-    _probe_queue_sizes(download_queue, no_cert, creds)
-
-    # ── Download queue summary ────────────────────────────────────────────
-    console.print()
-    console.print(Rule("[bold]Download Queue[/bold]"))
-
-    total_known   = sum(j.size_bytes for j in download_queue if j.size_bytes)
-    unknown_count = sum(1 for j in download_queue if j.size_bytes is None)
-
-    summary = Table(
-        box=box.ROUNDED, show_header=True,
-        header_style="bold magenta", padding=(0, 2),
-    )
-    summary.add_column("#",           style="bold cyan",  no_wrap=True, justify="right")
-    summary.add_column("Tool",        style="cyan",       no_wrap=True)
-    summary.add_column("Version",     style="white",      no_wrap=True)
-    summary.add_column("Image",       style="white")
-    summary.add_column("Size",        style="green",      no_wrap=True, justify="right")
-    summary.add_column("Destination", style="dim")
-
-    for i, job in enumerate(download_queue, 1):
-        already    = job.dest.exists() and job.dest.stat().st_size > 0
-        dest_label = str(job.dest)
-        if already:
-            dest_label += " [green][exists][/green]"
-        summary.add_row(
-            str(i),
-            job.tool,
-            job.version,
-            Path(job.img_path).name,
-            _fmt_bytes(job.size_bytes),
-            dest_label,
+        total_known   = sum(j.size_bytes or j.size_approx or 0 for j in download_queue)
+        unknown_count = sum(
+            1 for j in download_queue if j.size_bytes is None and j.size_approx is None
         )
 
-    console.print(summary)
-    console.print()
-
-    size_line = f"[bold]{_fmt_bytes(total_known)}[/bold] known"
-    if unknown_count:
-        size_line += f"  +  {unknown_count} file(s) with unknown size"
-    console.print(
-        f"  [cyan]{len(download_queue)}[/cyan] image(s) queued  |  "
-        f"Estimated total: {size_line}"
-    )
-    console.print()
-
-    if not Confirm.ask(
-        f"Proceed to download [bold cyan]{len(download_queue)}[/bold cyan] image(s)?",
-        default=True,
-    ):
-        log_warn("Download cancelled by user.")
-        return
+        summary = Table(
+            box=box.ROUNDED, show_header=True,
+            header_style="bold magenta", padding=(0, 2),
+        )
+        summary.add_column("#",           style="bold cyan",  no_wrap=True, justify="right")
+        summary.add_column("Tool",        style="cyan",       no_wrap=True)
+        summary.add_column("Version",     style="white",      no_wrap=True)
+        summary.add_column("Image",       style="white")
+        summary.add_column("Size",        style="green",      no_wrap=True, justify="right")
+        summary.add_column("Destination", style="dim")
+
+        for i, job in enumerate(download_queue, 1):
+            prefetched = runner.status(job) if runner is not None else ""
+            already    = bool(catalog.size(job.dest))
+            dest_label = str(job.dest)
+            if prefetched:
+                dest_label += f" {prefetched}"
+            elif already:
+                dest_label += " [green]\\[exists][/green]"
+            summary.add_row(
+                str(i),
+                job.tool,
+                job.version,
+                Path(job.img_path).name,
+                _fmt_bytes(job.size_bytes) if job.size_bytes is not None
+                else f"~{_fmt_bytes(job.size_approx)}" if job.size_approx is not None
+                else "?",
+                dest_label,
+            )
 
-    # ── Execute downloads ─────────────────────────────────────────────────
-    console.print()
-    console.print(Rule("[bold]Downloading[/bold]"))
-    console.print()
+        console.print(summary)
+        console.print()
 
-    results: List[_DownloadResult] = []
+        size_line = f"[bold]{_fmt_bytes(total_known)}[/bold] known"
+        if unknown_count:
+            size_line += f"  +  {unknown_count} file(s) with unknown size"
+        console.print(
+            f"  [cyan]{len(download_queue)}[/cyan] image(s) queued  |  "
+            f"Estimated total: {size_line}"
+        )
 
-    with Progress(
-        SpinnerColumn(),
-        TextColumn("[progress.description]{task.description}"),
-        BarColumn(bar_width=30),
-        DownloadColumn(),
-        TransferSpeedColumn(),
-        TimeRemainingColumn(),
-        console=console,
-    ) as progress:
-        overall = progress.add_task(
-            f"[bold]Overall  (0 / {len(download_queue)})[/bold]",
-            total=len(download_queue),
+        needed, _ = _space_needed(download_queue, catalog)
+        free = shutil.disk_usage(LOCAL_DIR).free
+        console.print(
+            f"  Still to write: [bold]{_fmt_bytes(needed)}[/bold]  |  "
+            f"Free in {LOCAL_DIR}: [bold]{_fmt_bytes(free)}[/bold]"
         )
-        for idx, job in enumerate(download_queue, 1):
-            progress.update(
-                overall,
-                description=(
-                    f"[bold]Overall  "
-                    f"({idx - 1} / {len(download_queue)})[/bold]"
-                ),
+        console.print()
+        if needed > free:
+            log_error(
+                f"Not enough disk space: the queue needs about {_fmt_bytes(needed)} "
+                f"but only {_fmt_bytes(free)} is free in {LOCAL_DIR}."
             )
-            result = _download_file(job, no_cert, creds, progress, overall)
-            results.append(result)
-
-        progress.update(
-            overall,
-            description=(
-                f"[bold]Overall  "
-                f"({len(download_queue)} / {len(download_queue)})[/bold]"
-            ),
+            if not Confirm.ask("Download anyway?", default=False):
+                if runner is not None:
+                    runner.cancel()
+                log_warn("Download cancelled — free some space or deselect images.")
+                return
+
+        if not Confirm.ask(
+            f"Proceed to download [bold cyan]{len(download_queue)}[/bold cyan] image(s)?",
+            default=True,
+        ):
+            if runner is not None:
+                runner.cancel()
+                log_warn("Download cancelled by user — partial files are kept for a later resume.")
+            else:
+                log_warn("Download cancelled by user.")
+            return
+
+        # ── Execute downloads ─────────────────────────────────────────────────
+        console.print()
+        console.print(Rule("[bold]Downloading[/bold]"))
+        console.print()
+
+        if runner is None:
+            jobs   = max(1, min(jobs, len(download_queue)))
+            runner = _DownloadRunner(jobs, no_cert, creds, segments)
+        log_info(
+            f"Downloading with {jobs} parallel worker(s) "
+            f"(max {MAX_PER_HOST} in flight per host, "
+            f"bandwidth {_THROTTLE.describe()})."
         )
 
+        results = runner.results(download_queue)
+    except KeyboardInterrupt:
+        if runner is not None:
+            runner.cancel()    # Ctrl-C in the menus or at the prompts stops background transfers too
+        raise
+
     # ── Final report ──────────────────────────────────────────────────────
     succeeded = [r for r in results if r.success and not r.skipped]
     skipped   = [r for r in results if r.skipped]
@@ -1225,7 +2505,7 @@ def run(
             "[bold blue]⏭  SKIP[/bold blue]",
             r.job.tool,
             Path(r.job.img_path).name,
-            "Already downloaded",
+            r.detail or "Already downloaded",
         )
     for r in failed:
         report.add_row(
@@ -1260,6 +2540,227 @@ def run(
         "Container image selector finished: %d downloaded, %d skipped, %d failed.",
         len(succeeded), len(skipped), len(failed),
     )
+    console.print(f"[dim]HTTP pool: {_POOL.stats()}[/dim]")
+    log.info("HTTP pool: %s", _POOL.stats())
+    log.info("Listing cache: %s", _LISTINGS.stats())
+    _POOL.close_all()
+
+
+# ─────────────────────────────────────────────
+# Headless plan  (--plan plan.yaml)
+# Declarative selection for cron / pipelines: every tool in the plan is
+# resolved against the vault concurrently, the queue runs with no prompts,
+# and a JSON result is written for the caller.
+#
+#   os_version: alma9
+#   local_dir: /opt/openchai/hpcsuite_registry/container_img_reg   # optional
+#   jobs: 4                                                        # optional
+#   tools:
+#     xCAT_reg:   {version: "v1*", images: ["*.tar"]}
+#     "*_reg":    {}        # tool globs; version "*" and images "*" by default
+#
+# Of the versions matching the glob(s), the highest is staged.  Image
+# globs match the path below the version directory or its file name.
+# ─────────────────────────────────────────────
+PLAN_PASSWORD_ENV = "OPENCHAI_VAULT_PASSWORD"   # vault password for --plan --username
+
+
+def _as_globs(value: object, field_name: str) -> List[str]:
+    if value is None:
+        return ["*"]
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, list) and all(isinstance(v, str) for v in value):
+        return value
+    raise ValueError(f"'{field_name}' must be a glob or a list of globs")
+
+
+def _load_plan(path: Path) -> dict:
+    """
+    Read and validate a plan file.  YAML needs PyYAML; a plan written as
+    JSON (which is also valid YAML) loads without it.
+    Returns {"os_version", "local_dir", "jobs", "tools": {glob: {"versions", "images"}}}.
+    Raises ValueError on a malformed plan.
+    """
+    text = path.read_text()
+    try:
+        import yaml
+        doc = yaml.safe_load(text)
+    except ImportError:
+        try:
+            doc = json.loads(text)
+        except ValueError:
+            raise ValueError("PyYAML is not installed — pip install pyyaml, or write the plan as JSON")
+    except yaml.YAMLError as exc:
+        raise ValueError(f"invalid YAML: {exc}")
+
+    if not isinstance(doc, dict) or not doc.get("os_version"):
+        raise ValueError("the plan needs at least 'os_version' and 'tools'")
+    raw_tools = doc.get("tools")
+    if isinstance(raw_tools, list):
+        raw_tools = {name: {} for name in raw_tools}
+    if not isinstance(raw_tools, dict) or not raw_tools:
+        raise ValueError("'tools' must be a non-empty mapping (or list) of tool names")
+
+    tools: Dict[str, dict] = {}
+    for name, spec in raw_tools.items():
+        spec = spec or {}
+        if not isinstance(spec, dict):
+            raise ValueError(f"tools.{name} must be a mapping")
+        tools[str(name)] = {
+            "versions": _as_globs(spec.get("version", spec.get("versions")), f"tools.{name}.version"),
+            "images":   _as_globs(spec.get("images"), f"tools.{name}.images"),
+        }
+    jobs = doc.get("jobs", DOWNLOAD_JOBS)
+    if not isinstance(jobs, int) or jobs < 1:
+        raise ValueError("'jobs' must be a positive integer")
+    return {
+        "os_version": str(doc["os_version"]),
+        "local_dir":  doc.get("local_dir"),
+        "jobs":       jobs,
+        "tools":      tools,
+    }
+
+
+def _resolve_tool(
+    tool: str,
+    spec: dict,
+    os_version: str,
+    no_cert: bool,
+    creds: Optional[VaultCredentials],
+    crawl_depth: int,
+    crawl_workers: int,
+) -> Tuple[Optional[str], List[str], str]:
+    """(version, image paths, "" or the reason nothing was resolved) for one plan entry."""
+    versions = [
+        v for v in _list_versions(tool, os_version, no_cert, creds)
+        if any(fnmatch.fnmatchcase(v, g) for g in spec["versions"])
+    ]
+    if not versions:
+        return None, [], f"no version matches {spec['versions']}"
+    version = max(versions, key=version_key)
+    images  = [
+        p for p in _list_images(
+            tool, os_version, version, no_cert, creds,
+            depth=crawl_depth, workers=crawl_workers,
+        )
+        if any(fnmatch.fnmatchcase(p, g) or fnmatch.fnmatchcase(Path(p).name, g) for g in spec["images"])
+    ]
+    if not images:
+        return version, [], f"no image in {version} matches {spec['images']}"
+    return version, images, ""
+
+
+def run_plan(
+    plan: dict,
+    no_cert: bool = _NO_CERT,
+    creds: Optional[VaultCredentials] = None,
+    segments: int = SEGMENTS,
+    crawl_depth: int = CRAWL_DEPTH,
+    crawl_workers: int = CRAWL_WORKERS,
+) -> dict:
+    """
+    Resolve and execute a plan from _load_plan() without prompting.
+    Returns the JSON-serialisable result; result["ok"] is False when any
+    plan entry resolved to nothing or any download failed.
+    """
+    started    = time.time()
+    os_version = plan["os_version"]
+    result: dict = {
+        "os_version": os_version,
+        "local_dir":  LOCAL_DIR,
+        "unresolved": [],
+        "images":     [],
+    }
+
+    if not _test_connection(no_cert, creds):
+        result.update(ok=False, error="vault unreachable or credentials rejected")
+        return result
+    create_local_directories()
+
+    # Tool globs expand against the known tools
+    tools: Dict[str, dict] = {}
+    for pattern, spec in plan["tools"].items():
+        matched = [t for t in TOOLS if fnmatch.fnmatchcase(t, pattern)]
+        if not matched:
+            result["unresolved"].append({"tool": pattern, "reason": "matches no known tool"})
+        for tool in matched:
+            tools.setdefault(tool, spec)
+
+    queue: List[_DownloadJob] = []
+    with ThreadPoolExecutor(
+        max_workers=max(1, crawl_workers), thread_name_prefix="openchai-plan"
+    ) as pool:
+        resolved = {
+            tool: pool.submit(
+                _resolve_tool, tool, spec, os_version, no_cert, creds,
+                crawl_depth, crawl_workers,
+            )
+            for tool, spec in tools.items()
+        }
+        for tool, fut in resolved.items():
+            version, images, reason = fut.result()
+            if reason:
+                result["unresolved"].append({"tool": tool, "reason": reason})
+                log_warn(f"{tool}: {reason}")
+                continue
+            log_info(f"{tool}: version {version}, {len(images)} image(s)")
+            tool_jobs, clashes = _split_collisions([
+                _DownloadJob(
+                    tool     = tool,
+                    version  = version,
+                    img_path = img_path,
+                    url      = f"{CONTAINER_REG_BASE_URL}/{os_version}/{tool}/{version}/{img_path}",
+                    dest     = Path(LOCAL_DIR) / tool / Path(img_path).name,
+                )
+                for img_path in images
+            ])
+            for dest, paths in clashes.items():
+                reason = f"{', '.join(paths)} would all be saved as {dest.name}"
+                result["unresolved"].append({"tool": tool, "reason": reason})
+                log_error(f"{tool}: {reason} — not downloading them.")
+            queue += tool_jobs
+
+    results: List[_DownloadResult] = []
+    if queue:
+        _probe_queue_sizes(queue, no_cert, creds)
+        _attach_digests(queue, os_version, no_cert, creds)
+        needed, _ = _space_needed(queue, LocalCatalog(Path(LOCAL_DIR)).refresh())
+        free = shutil.disk_usage(LOCAL_DIR).free
+        if needed > free:
+            log_error(f"Not enough disk space: need {_fmt_bytes(needed)}, {_fmt_bytes(free)} free.")
+            result.update(ok=False, error="insufficient disk space", bytes_needed=needed, bytes_free=free)
+            return result
+
+        runner = _DownloadRunner(max(1, min(plan["jobs"], len(queue))), no_cert, creds, segments)
+        _AUTH_STATE["aborted"] = True    # no one to re-prompt: a 401 fails the job
+        results = runner.results(queue)
+
+    for r in results:
+        result["images"].append({
+            "tool":    r.job.tool,
+            "version": r.job.version,
+            "image":   r.job.img_path,
+            "url":     r.job.url,
+            "dest":    str(r.job.dest),
+            "size":    r.job.size_bytes,
+            "sha256":  r.job.sha256,
+            "status":  "skipped" if r.skipped else "downloaded" if r.success else "failed",
+            "detail":  r.error or r.detail,
+        })
+    counts = {
+        status: sum(1 for i in result["images"] if i["status"] == status)
+        for status in ("downloaded", "skipped", "failed")
+    }
+    result.update(
+        summary=counts,
+        ok=not counts["failed"] and not result["unresolved"],
+        seconds=round(time.time() - started, 1),
+    )
+    log.info("Plan finished: %s", counts)
+    log.info("HTTP pool: %s", _POOL.stats())
+    _POOL.close_all()
+    return result
 
 
 # ─────────────────────────────────────────────
@@ -1267,7 +2768,7 @@ def run(
 # ─────────────────────────────────────────────
 def main() -> None:
     """Run the selector as a standalone script."""
-    global LOCAL_DIR   # declared here so the f-string default and the override both work
+    global LOCAL_DIR, LISTING_MAX_ENTRIES   # declared here so the f-string default and the override both work
     import argparse
 
     parser = argparse.ArgumentParser(
@@ -1302,11 +2803,138 @@ def main() -> None:
         "--username", default=None, metavar="USER",
         help="Vault username — password is prompted securely at startup.",
     )
+    parser.add_argument(
+        "--jobs", "-j", type=int, default=DOWNLOAD_JOBS, metavar="N",
+        help=(
+            "Number of images to download in parallel. "
+            f"At most MAX_PER_HOST ({MAX_PER_HOST}) requests are in flight "
+            "per vault host regardless of N."
+        ),
+    )
+    parser.add_argument(
+        "--segments", type=int, default=SEGMENTS, metavar="K",
+        help=(
+            "Split each image larger than "
+            f"{2 * SEGMENT_MIN_BYTES >> 20} MiB into up to K byte ranges "
+            "fetched in parallel. 1 disables segmented transfer."
+        ),
+    )
+    parser.add_argument(
+        "--max-rate", default=str(MAX_RATE), metavar="RATE",
+        help=(
+            "Global bandwidth cap shared by all parallel transfers, "
+            "e.g. 200M or 1.5G (bytes/s, binary units). 0 = unlimited."
+        ),
+    )
+    parser.add_argument(
+        "--rate-window", default=RATE_WINDOW, metavar="HH:MM-HH:MM",
+        help=(
+            "Apply --max-rate only inside this local-time window "
+            "(e.g. 08:00-20:00); full speed outside it. Empty = always."
+        ),
+    )
+    parser.add_argument(
+        "--crawl-depth", type=int, default=CRAWL_DEPTH, metavar="N",
+        help=(
+            "Directory levels searched for images below each version "
+            "directory. 0 = unlimited."
+        ),
+    )
+    parser.add_argument(
+        "--refresh", action="store_true",
+        help="Revalidate every cached directory listing with the vault, ignoring --listing-ttl.",
+    )
+    parser.add_argument(
+        "--listing-ttl", type=float, default=LISTING_TTL_S, metavar="SECONDS",
+        help="Use cached directory listings younger than this without contacting the vault.",
+    )
+    parser.add_argument(
+        "--crawl-workers", type=int, default=CRAWL_WORKERS, metavar="N",
+        help="Directory listings fetched concurrently while browsing the vault.",
+    )
+    parser.add_argument(
+        "--plan", default=None, metavar="PLAN.yaml",
+        help=(
+            "Run unattended from a declarative plan (OS version, tools, version "
+            "and image globs) — no prompts. Vault password for --username is "
+            f"read from ${PLAN_PASSWORD_ENV}."
+        ),
+    )
+    parser.add_argument(
+        "--result", default="-", metavar="PATH",
+        help="Where --plan writes its JSON result ('-' = stdout; progress goes to stderr).",
+    )
+    parser.add_argument(
+        "--prefetch", action="store_true",
+        help=(
+            "Start downloading each tool's images as soon as they are chosen, "
+            "while the remaining tools are still being selected."
+        ),
+    )
+    parser.add_argument(
+        "--max-entries", type=int, default=LISTING_MAX_ENTRIES, metavar="N",
+        help="Stop reading a directory listing after N entries. 0 = no limit.",
+    )
     args = parser.parse_args()
 
+    try:
+        _THROTTLE.configure(parse_rate(args.max_rate), parse_window(args.rate_window))
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.segments < 1:
+        parser.error("--segments must be at least 1")
+    if args.crawl_depth < 0:
+        parser.error("--crawl-depth must be 0 (unlimited) or more")
+    if args.crawl_workers < 1:
+        parser.error("--crawl-workers must be at least 1")
+    if args.listing_ttl < 0:
+        parser.error("--listing-ttl cannot be negative")
+    if args.max_entries < 0:
+        parser.error("--max-entries must be 0 (unlimited) or more")
+    LISTING_MAX_ENTRIES = args.max_entries
+    _LISTINGS.configure(args.listing_ttl, args.refresh)
+
+    plan: Optional[dict] = None
+    if args.plan:
+        try:
+            plan = _load_plan(Path(args.plan))
+        except (OSError, ValueError) as exc:
+            parser.error(f"--plan {args.plan}: {exc}")
+        if args.username and not os.environ.get(PLAN_PASSWORD_ENV):
+            parser.error(f"--plan with --username needs the password in ${PLAN_PASSWORD_ENV}")
+
     # Apply local-dir override before anything else reads LOCAL_DIR
     if args.local_dir:
         LOCAL_DIR = args.local_dir
+    elif plan and plan["local_dir"]:
+        LOCAL_DIR = str(plan["local_dir"])
+
+    # --verify-cert overrides --no-cert and the constant
+    no_cert_final = False if args.verify_cert else args.no_cert
+
+    if plan is not None:
+        console.stderr = True     # stdout carries only the JSON result
+        creds_env = (
+            VaultCredentials(username=args.username, password=os.environ[PLAN_PASSWORD_ENV])
+            if args.username else None
+        )
+        result = run_plan(
+            plan,
+            no_cert=no_cert_final,
+            creds=creds_env,
+            segments=args.segments,
+            crawl_depth=args.crawl_depth,
+            crawl_workers=args.crawl_workers,
+        )
+        text = json.dumps(result, indent=2) + "\n"
+        if args.result == "-":
+            sys.stdout.write(text)
+        else:
+            Path(args.result).write_text(text)
+        sys.exit(0 if result["ok"] else 1)
 
     # Build credentials from CLI username if supplied
     creds: Optional[VaultCredentials] = None
@@ -1322,11 +2950,17 @@ def main() -> None:
         else:
             console.print("[red]No password supplied — will prompt interactively.[/red]")
 
-    # --verify-cert overrides --no-cert and the constant
-    no_cert_final = False if args.verify_cert else args.no_cert
-
     try:
-        run(no_cert=no_cert_final, creds=creds, os_version=args.os_version)
+        run(
+            no_cert=no_cert_final,
+            creds=creds,
+            os_version=args.os_version,
+            jobs=args.jobs,
+            segments=args.segments,
+            crawl_depth=args.crawl_depth,
+            crawl_workers=args.crawl_workers,
+            prefetch=args.prefetch,
+        )
     except KeyboardInterrupt:
         console.print("\n[yellow]Aborted by user.[/yellow]")
         sys.exit(130)
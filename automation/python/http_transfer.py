@@ -0,0 +1,471 @@
+#!/usr/bin/env python3
+"""
+Script Name : http_transfer.py
+Purpose     : Transfer plumbing shared by configure_openchai_manager.py
+              and container_img_selector.py: the keep-alive HTTP(S)
+              connection pool, the bandwidth governor behind
+              --max-rate / --rate-window, and the receive path (reused
+              buffers, adaptive read size, extent reservation, throttled
+              progress), plus the version ordering both use to pick the
+              newest release of a tool.
+
+Author      : Satish Gupta
+"""
+
+from __future__ import annotations
+
+import base64
+import ctypes
+import http.client
+import io
+import re
+import ssl
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from typing import Dict, List, Optional, Tuple
+
+CHUNK_SIZE         = 1 << 20    # initial read size; adapts between CHUNK_MIN and CHUNK_MAX
+CHUNK_MIN          = 256 << 10  # 256 KiB
+CHUNK_MAX          = 16 << 20   # 16 MiB — largest single read into a receive buffer
+RECV_TARGET_S      = 0.05       # aim for one read per ~50 ms of network time
+PROGRESS_REFRESH_S = 0.2        # minimum interval between progress-bar updates per transfer
+
+
+# ─────────────────────────────────────────────
+# Keep-alive HTTP(S) connection pool
+# ─────────────────────────────────────────────
+def make_ssl_ctx(no_cert: bool) -> ssl.SSLContext:
+    """
+    Build an SSLContext (built once per mode and cached by HttpPool).
+    no_cert=True disables certificate verification and hostname checking
+    — equivalent to curl -k.
+    """
+    ctx = ssl.create_default_context()
+    if no_cert:
+        ctx.check_hostname = False
+        ctx.verify_mode    = ssl.CERT_NONE
+    return ctx
+
+
+class PooledHTTPSConnection(http.client.HTTPSConnection):
+    """HTTPSConnection that offers a cached TLS session for resumption."""
+
+    def __init__(self, *args, tls_session: Optional[ssl.SSLSession] = None, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._tls_session = tls_session
+
+    def connect(self) -> None:
+        # Same as HTTPSConnection.connect() plus session= for resumption
+        http.client.HTTPConnection.connect(self)
+        server_hostname = self._tunnel_host or self.host
+        self.sock = self._context.wrap_socket(
+            self.sock, server_hostname=server_hostname, session=self._tls_session,
+        )
+
+
+class PooledResponse:
+    """
+    File-like wrapper around an http.client response.
+    Closing it hands the connection back to the pool when the body was
+    fully consumed, otherwise the connection is discarded.
+    """
+
+    def __init__(self, pool: "HttpPool", key: tuple, conn, resp, url: str) -> None:
+        self._pool, self._key, self._conn, self._resp = pool, key, conn, resp
+        self.url     = url
+        self.status  = resp.status
+        self.reason  = resp.reason
+        self.headers = resp.headers
+
+    def read(self, amt: Optional[int] = None) -> bytes:
+        return self._resp.read(amt)
+
+    def readinto(self, buf) -> int:
+        return self._resp.readinto(buf)
+
+    def close(self) -> None:
+        if self._conn is None:
+            return
+        resp, conn, self._conn = self._resp, self._conn, None
+        # Drain a short or empty remainder (HEAD, 3xx, 304) so the socket
+        # stays usable; anything larger is cheaper to reconnect than to read.
+        if not resp.isclosed() and not resp.chunked and (resp.length or 0) <= 65536:
+            try:
+                resp.read()
+            except (OSError, http.client.HTTPException):
+                pass
+        if resp.isclosed() and not resp.will_close:
+            self._pool._release(self._key, conn)
+        else:
+            conn.close()
+
+    def __enter__(self) -> "PooledResponse":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class HttpPool:
+    """
+    Keep-alive HTTP(S) connection pool shared by listings, HEAD probes and
+    downloads.  One cached SSLContext per verification mode, TLS sessions
+    are offered back to the server for abbreviated handshakes, and idle
+    connections are reused per (scheme, host, port).
+
+    urlopen() mirrors urllib.request.urlopen(): redirects are followed,
+    HTTP status >= 400 raises urllib.error.HTTPError and connection
+    failures raise urllib.error.URLError.  Honours http(s)_proxy.
+    """
+
+    IDLE_TIMEOUT_S = 30      # discard keep-alive sockets idle longer than this
+    MAX_REDIRECTS  = 5
+
+    def __init__(self, max_idle_per_host: int) -> None:
+        self._lock      = threading.Lock()
+        self._max_idle  = max_idle_per_host
+        self._idle:     Dict[tuple, List[Tuple[object, float]]] = {}
+        self._ctx:      Dict[bool, ssl.SSLContext] = {}
+        self._sessions: Dict[tuple, ssl.SSLSession] = {}
+        self.opened      = 0   # new TCP connections
+        self.reused      = 0   # requests served on an idle keep-alive connection
+        self.tls_resumed = 0   # TLS handshakes that resumed a cached session
+
+    def ssl_context(self, no_cert: bool) -> ssl.SSLContext:
+        with self._lock:
+            ctx = self._ctx.get(no_cert)
+            if ctx is None:
+                ctx = self._ctx[no_cert] = make_ssl_ctx(no_cert)
+            return ctx
+
+    def stats(self) -> str:
+        return (
+            f"{self.opened} connection(s) opened, {self.reused} reused, "
+            f"{self.tls_resumed} TLS session(s) resumed"
+        )
+
+    # ── connection management ────────────────────────────────────────────
+    def _acquire(self, key: tuple, timeout: float):
+        scheme, host, port, no_cert = key
+        now = time.monotonic()
+        with self._lock:
+            idle = self._idle.get(key, [])
+            while idle:
+                conn, since = idle.pop()
+                if now - since <= self.IDLE_TIMEOUT_S:
+                    self.reused += 1
+                    conn.timeout = timeout
+                    if conn.sock is not None:
+                        conn.sock.settimeout(timeout)
+                    return conn, True
+                conn.close()
+
+        proxy = self._proxy_for(scheme, host)
+        if scheme == "https":
+            conn = PooledHTTPSConnection(
+                *(proxy or (host, port)),
+                timeout=timeout,
+                context=self.ssl_context(no_cert),
+                tls_session=self._sessions.get(key),
+            )
+        else:
+            conn = http.client.HTTPConnection(*(proxy or (host, port)), timeout=timeout)
+        if proxy and scheme == "https":
+            conn.set_tunnel(host, port, headers=self._proxy_headers(scheme))
+        with self._lock:
+            self.opened += 1
+        return conn, False
+
+    def _release(self, key: tuple, conn) -> None:
+        sock = conn.sock
+        with self._lock:
+            if isinstance(sock, ssl.SSLSocket) and sock.session is not None:
+                self._sessions[key] = sock.session
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self._max_idle:
+                idle.append((conn, time.monotonic()))
+                return
+        conn.close()
+
+    def close_all(self) -> None:
+        with self._lock:
+            for idle in self._idle.values():
+                for conn, _ in idle:
+                    conn.close()
+            self._idle.clear()
+
+    @staticmethod
+    def _proxy_for(scheme: str, host: str) -> Optional[Tuple[str, int]]:
+        proxy = urllib.request.getproxies().get(scheme)
+        if not proxy or urllib.request.proxy_bypass(host):
+            return None
+        p = urllib.parse.urlparse(proxy if "://" in proxy else f"http://{proxy}")
+        return p.hostname or "", p.port or 80
+
+    @staticmethod
+    def _proxy_headers(scheme: str) -> Dict[str, str]:
+        proxy = urllib.request.getproxies().get(scheme) or ""
+        p = urllib.parse.urlparse(proxy if "://" in proxy else f"http://{proxy}")
+        if not p.username:
+            return {}
+        token = base64.b64encode(
+            f"{urllib.parse.unquote(p.username)}:"
+            f"{urllib.parse.unquote(p.password or '')}".encode("utf-8")
+        ).decode("ascii")
+        return {"Proxy-Authorization": f"Basic {token}"}
+
+    # ── request ──────────────────────────────────────────────────────────
+    def urlopen(
+        self,
+        req: urllib.request.Request,
+        no_cert: bool,
+        timeout: float = 30,
+    ) -> PooledResponse:
+        url     = req.full_url
+        method  = req.get_method()
+        headers = dict(req.header_items())
+
+        for _ in range(self.MAX_REDIRECTS + 1):
+            parts  = urllib.parse.urlparse(url)
+            scheme = parts.scheme.lower()
+            port   = parts.port or (443 if scheme == "https" else 80)
+            key    = (scheme, parts.hostname or "", port, no_cert)
+            proxy  = self._proxy_for(scheme, key[1])
+            target = parts.path or "/"
+            if parts.query:
+                target += "?" + parts.query
+            send_headers = dict(headers)
+            if proxy and scheme == "http":
+                target = url          # absolute-form for a forward proxy
+                send_headers.update(self._proxy_headers(scheme))
+
+            # A reused socket may have been closed by the server while idle;
+            # retry once on a fresh connection before reporting an error.
+            for fresh_attempt in (False, True):
+                conn, reused = self._acquire(key, timeout)
+                try:
+                    conn.request(method, target, headers=send_headers)
+                    resp = conn.getresponse()
+                    if not reused and isinstance(conn.sock, ssl.SSLSocket) \
+                            and conn.sock.session_reused:
+                        with self._lock:
+                            self.tls_resumed += 1
+                    break
+                except (http.client.RemoteDisconnected, BrokenPipeError,
+                        ConnectionResetError, http.client.BadStatusLine) as exc:
+                    conn.close()
+                    if reused and not fresh_attempt:
+                        continue
+                    raise urllib.error.URLError(exc) from exc
+                except OSError as exc:
+                    conn.close()
+                    raise urllib.error.URLError(exc) from exc
+
+            pooled = PooledResponse(self, key, conn, resp, url)
+
+            if resp.status in (301, 302, 303, 307, 308) and resp.getheader("Location"):
+                new_url = urllib.parse.urljoin(url, resp.getheader("Location"))
+                pooled.close()
+                if urllib.parse.urlparse(new_url).hostname != parts.hostname:
+                    headers.pop("Authorization", None)
+                if resp.status == 303:
+                    method = "GET"
+                url = new_url
+                continue
+
+            if resp.status >= 400:
+                body = b""
+                try:
+                    body = resp.read(65536) if (resp.length or 0) <= 65536 else b""
+                finally:
+                    pooled.close()
+                raise urllib.error.HTTPError(
+                    url, resp.status, resp.reason, resp.headers, io.BytesIO(body)
+                )
+            return pooled
+
+        raise urllib.error.URLError(f"too many redirects fetching {req.full_url}")
+
+
+# ─────────────────────────────────────────────
+# Bandwidth governor
+# ─────────────────────────────────────────────
+def parse_rate(text: str) -> int:
+    """
+    Parse a transfer rate such as '200M', '1.5G', '800K/s' or '52428800'
+    into bytes per second (binary multiples).  '0' means unlimited.
+    """
+    m = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMGT]?)(?:i?B)?(?:/s)?\s*", text, re.IGNORECASE)
+    if not m:
+        raise ValueError(f"invalid rate '{text}' (examples: 200M, 1.5G, 800K)")
+    scale = {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30, "T": 1 << 40}
+    return int(float(m.group(1)) * scale[m.group(2).upper()])
+
+
+def parse_window(text: str) -> Optional[Tuple[int, int]]:
+    """Parse 'HH:MM-HH:MM' into (start, end) minutes after midnight; '' → None."""
+    if not text:
+        return None
+    m = re.fullmatch(r"\s*(\d{1,2}):(\d{2})\s*-\s*(\d{1,2}):(\d{2})\s*", text)
+    if not m or any(int(m.group(i)) > limit for i, limit in ((1, 23), (2, 59), (3, 23), (4, 59))):
+        raise ValueError(f"invalid time window '{text}' (expected HH:MM-HH:MM)")
+    h1, m1, h2, m2 = (int(g) for g in m.groups())
+    if (h1, m1) == (h2, m2):
+        raise ValueError(f"empty time window '{text}' (start and end are the same)")
+    return h1 * 60 + m1, h2 * 60 + m2
+
+
+class TokenBucket:
+    """
+    Process-wide token bucket shared by every transfer thread.
+
+    rate   : bytes per second; 0 disables throttling.
+    window : optional (start, end) minutes after midnight, local time.
+             The limit only applies inside the window (which may wrap
+             past midnight); outside it transfers run at full speed.
+
+    Bursts are capped at one second's worth of tokens.  Callers take
+    tokens after each chunk and sleep off any deficit outside the lock.
+    """
+
+    def __init__(self, rate: int = 0, window: Optional[Tuple[int, int]] = None) -> None:
+        self._lock = threading.Lock()
+        self.configure(rate, window)
+
+    def configure(self, rate: int, window: Optional[Tuple[int, int]] = None) -> None:
+        with self._lock:
+            self.rate    = max(0, rate)
+            self.window  = window
+            self._tokens = float(self.rate)
+            self._stamp  = time.monotonic()
+
+    def active(self) -> bool:
+        if self.rate <= 0:
+            return False
+        if self.window is None:
+            return True
+        now   = time.localtime()
+        mins  = now.tm_hour * 60 + now.tm_min
+        start, end = self.window
+        return start <= mins < end if start <= end else (mins >= start or mins < end)
+
+    def consume(self, nbytes: int) -> None:
+        if not self.active():
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                float(self.rate), self._tokens + (now - self._stamp) * self.rate
+            )
+            self._stamp   = now
+            self._tokens -= nbytes
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+
+    def describe(self) -> str:
+        if self.rate <= 0:
+            return "unlimited"
+        text = f"{self.rate / (1 << 20):.1f} MiB/s"
+        if self.window:
+            (h1, m1), (h2, m2) = divmod(self.window[0], 60), divmod(self.window[1], 60)
+            text += f" between {h1:02d}:{m1:02d} and {h2:02d}:{m2:02d}, unlimited otherwise"
+        return text
+
+
+# ─────────────────────────────────────────────
+# Receive path
+# Reused buffers, adaptive read size, extent reservation and throttled
+# progress so the per-chunk Python overhead stays flat at 10+ Gb/s.
+# ─────────────────────────────────────────────
+_FALLOC_FL_KEEP_SIZE = 0x01
+
+
+def _load_fallocate():
+    """Return libc fallocate(2), or None where it is unavailable."""
+    try:
+        fn = ctypes.CDLL(None, use_errno=True).fallocate
+    except (OSError, AttributeError):
+        return None
+    fn.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_int64, ctypes.c_int64]
+    fn.restype  = ctypes.c_int
+    return fn
+
+
+_FALLOCATE = _load_fallocate()
+
+
+def preallocate(fd: int, offset: int, length: Optional[int]) -> None:
+    """
+    Reserve contiguous extents for [offset, offset+length) without changing
+    the file size — a .part file's size is its resume offset, so
+    posix_fallocate() (which extends the file) cannot be used here.
+    Best effort: filesystems without support simply skip it.
+    """
+    if _FALLOCATE is not None and length and length > 0:
+        _FALLOCATE(fd, _FALLOC_FL_KEEP_SIZE, offset, length)
+
+
+class RecvBuffer:
+    """
+    One reusable buffer per transfer.  fill() reads straight into it with
+    readinto() and returns a memoryview of the bytes received, so no bytes
+    object is created per chunk.  The read size doubles while reads
+    complete well under RECV_TARGET_S and halves when they run long; the
+    buffer starts at the initial read size and is only enlarged (up to
+    CHUNK_MAX) once the read size outgrows it.
+    """
+
+    def __init__(self, initial: int = CHUNK_SIZE) -> None:
+        self.size  = max(CHUNK_MIN, min(initial, CHUNK_MAX))
+        self._view = memoryview(bytearray(self.size))
+
+    def fill(self, resp, limit: Optional[int] = None) -> memoryview:
+        if len(self._view) < self.size:
+            self._view = memoryview(bytearray(self.size))
+        want    = self.size if limit is None else min(self.size, limit)
+        started = time.monotonic()
+        n       = resp.readinto(self._view[:want])
+        elapsed = time.monotonic() - started
+        if n == self.size:
+            if elapsed < RECV_TARGET_S / 4 and self.size < CHUNK_MAX:
+                self.size *= 2
+            elif elapsed > RECV_TARGET_S * 2 and self.size > CHUNK_MIN:
+                self.size //= 2
+        return self._view[:n]
+
+
+class ProgressTicker:
+    """Accumulate byte counts and push them to a Rich task at most every PROGRESS_REFRESH_S."""
+
+    def __init__(self, progress, task) -> None:
+        self._progress, self._task = progress, task
+        self._pending = 0
+        self._last    = time.monotonic()
+        self._lock    = threading.Lock()
+
+    def advance(self, n: int) -> None:
+        with self._lock:
+            self._pending += n
+            now = time.monotonic()
+            if now - self._last < PROGRESS_REFRESH_S:
+                return
+            pending, self._pending, self._last = self._pending, 0, now
+        self._progress.update(self._task, advance=pending)
+
+    def flush(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, 0
+        if pending:
+            self._progress.update(self._task, advance=pending)
+
+
+# ─────────────────────────────────────────────
+# Release ordering
+# ─────────────────────────────────────────────
+def version_key(version: str) -> list:
+    """Natural sort key, so v10 sorts after v9."""
+    return [(0, int(t), "") if t.isdigit() else (1, 0, t) for t in re.split(r"(\d+)", version)]
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Script Name : local_catalog.py
+Purpose     : Incremental listing of a local container registry tree,
+              shared by configure_openchai_manager.py and
+              container_img_selector.py so both read and refresh the
+              same <root>/.cache/local-catalog.json.
+
+Author      : Satish Gupta
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+LOCAL_CATALOG_NAME     = "local-catalog.json"  # <root>/.cache/… incremental listing of the registry
+LOCAL_CATALOG_SETTLE_S = 2      # directories changed this recently are re-read on the next run
+
+log = logging.getLogger("openchai.catalog")
+
+
+class LocalCatalog:
+    """
+    Persistent listing of a local registry tree, kept in
+    <root>/.cache/local-catalog.json.
+
+    refresh() stats every directory but only re-reads (os.scandir) those
+    whose mtime changed since the last run, so an unchanged tree costs
+    one stat per directory rather than one per file.  A directory's
+    mtime moves when entries are added, removed or renamed — which is
+    how both scripts publish files (.part + rename, link + replace) —
+    but not when a file is rewritten in place.  Directories modified in
+    the last LOCAL_CATALOG_SETTLE_S are re-read next time as well, in
+    case they change again within the same timestamp.  Dot-entries
+    (.store, .cache, staging links) are not listed.  Symlinked
+    directories are followed (each directory is listed once, so a link
+    back up the tree cannot loop).
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.path = root / ".cache" / LOCAL_CATALOG_NAME
+        self.dirs: Dict[str, dict] = {}
+        try:
+            data = json.loads(self.path.read_text())
+            if data.get("version") == 1:
+                self.dirs = data["dirs"]
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass
+
+    def refresh(self) -> "LocalCatalog":
+        old, self.dirs = self.dirs, {}
+        settled  = time.time_ns() - LOCAL_CATALOG_SETTLE_S * 10**9
+        rescans  = 0
+        seen: Set[Tuple[int, int]] = set()
+        stack    = [""]
+        while stack:
+            rel  = stack.pop()
+            path = self.root / rel if rel else self.root
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            if (st.st_dev, st.st_ino) in seen:
+                continue
+            seen.add((st.st_dev, st.st_ino))
+            mtime = st.st_mtime_ns
+            entry = old.get(rel)
+            if entry is None or entry["mtime_ns"] != mtime:
+                entry    = self._scan(path, mtime if mtime < settled else -1)
+                rescans += 1
+            self.dirs[rel] = entry
+            stack.extend(f"{rel}/{d}" if rel else d for d in entry["dirs"])
+        if rescans or old.keys() != self.dirs.keys():
+            self._save()
+        log.info("Local catalog %s: %d dir(s), %d re-read", self.root, len(self.dirs), rescans)
+        return self
+
+    @staticmethod
+    def _scan(path: Path, mtime_ns: int) -> dict:
+        files: Dict[str, list] = {}
+        dirs:  List[str] = []
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.name.startswith("."):
+                    continue
+                try:
+                    if entry.is_dir():
+                        dirs.append(entry.name)
+                    elif entry.is_file():
+                        st = entry.stat()
+                        files[entry.name] = [st.st_size, int(st.st_mtime)]
+                except OSError:
+                    continue
+        return {"mtime_ns": mtime_ns, "files": files, "dirs": sorted(dirs)}
+
+    def _save(self):
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(json.dumps({"version": 1, "dirs": self.dirs}, separators=(",", ":")))
+            os.replace(tmp, self.path)
+        except OSError as exc:
+            log.info("Local catalog not saved: %s", exc)
+
+    def subdirs(self, rel: str = "") -> List[str]:
+        entry = self.dirs.get(rel)
+        return list(entry["dirs"]) if entry else []
+
+    def files(self, rel: str = "") -> Dict[str, Tuple[int, int]]:
+        """{name: (size, mtime)} for the files directly inside *rel*."""
+        entry = self.dirs.get(rel)
+        return {name: (size, mtime) for name, (size, mtime) in entry["files"].items()} if entry else {}
+
+    def walk(self, rel: str = "") -> Iterator[Tuple[str, int, int]]:
+        """Yield (relative path, size, mtime) for every file under *rel*."""
+        stack = [rel]
+        while stack:
+            top   = stack.pop()
+            entry = self.dirs.get(top)
+            if entry is None:
+                continue
+            for name, (size, mtime) in sorted(entry["files"].items()):
+                yield (f"{top}/{name}" if top else name), size, mtime
+            stack.extend(reversed([f"{top}/{d}" if top else d for d in entry["dirs"]]))
+
+    def size(self, path: Path) -> Optional[int]:
+        """Size of the file at *path*, None if absent (stat'ed directly outside the root)."""
+        try:
+            rel = path.relative_to(self.root).as_posix()
+        except ValueError:
+            return path.stat().st_size if path.is_file() else None
+        top, _, name = rel.rpartition("/")
+        entry = self.dirs.get(top)
+        meta  = entry["files"].get(name) if entry else None
+        return meta[0] if meta else None
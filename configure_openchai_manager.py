@@ -8,24 +8,44 @@ Python Port : Optimized CLI version with rich UX
 
 from __future__ import annotations
 
+import argparse
 import os
 import sys
 import shutil
+import signal
+import stat
 import subprocess
 import re
+import random
 import logging
 import platform
+import posixpath
+import threading
+import time
+import http.client
 import urllib.request
 import urllib.error
 import urllib.parse
 import base64
+import bisect
+import codecs
+import contextlib
 import getpass
-import ssl
+import hashlib
+import json
+import lzma
 import tarfile
+import tempfile
+import zlib
+import email.utils
+import html
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
 from dataclasses import dataclass
 from pathlib import Path
 from html.parser import HTMLParser
-from typing import Dict, List, Optional, Set, Tuple
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Optional, Set, Tuple
 
 # ─────────────────────────────────────────────
 # Dependency bootstrap (rich for UX)
@@ -56,6 +76,14 @@ console = Console()
 SCRIPT_DIR = Path(__file__).resolve().parent
 DEFAULT_LOG = Path("/var/log/openchai_config.log")
 
+# The local registry catalogue and the HTTP pool are shared with the image selector
+sys.path.insert(0, str(SCRIPT_DIR / "automation" / "python"))
+from local_catalog import LocalCatalog  # noqa: E402
+from http_transfer import (  # noqa: E402
+    CHUNK_MAX, CHUNK_SIZE, HttpPool, ProgressTicker, RecvBuffer, TokenBucket,
+    parse_rate, parse_window, preallocate, version_key,
+)
+
 def _get_log_path() -> Path:
     if DEFAULT_LOG.parent.exists() and os.access(DEFAULT_LOG.parent, os.W_OK):
         return DEFAULT_LOG
@@ -121,6 +149,24 @@ def _build_vault_url(host: str, port: int, path: str) -> str:
 
 OPENCHAI_VAULT_URL: str = _build_vault_url(VAULT_HOST, VAULT_PORT, VAULT_PATH)
 
+# Download tuning (read sizes CHUNK_SIZE / CHUNK_MAX live in http_transfer.py)
+DOWNLOAD_TIMEOUT_S = 300        # seconds before a stalled download is abandoned
+MAX_RETRIES        = 5          # attempts per archive before giving up
+RETRY_BACKOFF_MAX  = 60         # cap on the exponential back-off between attempts
+LISTING_CHUNK      = 64 << 10   # listing bytes parsed per step while the page downloads
+LISTING_MAX_ENTRIES = 0         # archive links read from one listing, 0 = unlimited
+MAX_RATE           = 0          # bytes/s shared by all transfers, 0 = unlimited (--max-rate)
+RATE_WINDOW        = ""         # "HH:MM-HH:MM" when MAX_RATE applies, "" = always (--rate-window)
+
+# Registry tarball handling
+STREAM_EXTRACT     = True       # extract while downloading (no full archive on disk)
+STREAM_KEEP_COPY   = False      # also tee the archive to <version_dir>/<tarball>
+EXTRACT_WORKERS    = 16         # threads writing extracted files (NFS/Lustre), 1 = serial
+EXTRACT_BUFFER     = 256 << 20  # member data read ahead of the writer threads
+EXTRACT_VERIFY_SAMPLE = 0       # members stat'ed by the "already extracted" check, 0 = all
+EXTRACT_DEDUP      = False      # share identical files between releases (--dedup)
+EXTRACT_DEDUP_MIN  = 64 << 10   # smaller members are always written as plain files
+
 
 # ─────────────────────────────────────────────
 # Vault credentials dataclass
@@ -151,47 +197,174 @@ class DownloadTask:
 # ─────────────────────────────────────────────
 # HTML href parser (replaces grep/sed pipeline)
 # ─────────────────────────────────────────────
+# Container image / registry archive extensions, for vault listings and
+# local scans alike
+IMG_EXTS = (".tar.gz", ".tgz", ".tar.xz", ".tar.zst", ".tar", ".img")
+
+
 class _HrefParser(HTMLParser):
-    ARCHIVE_EXT = (".tar.gz", ".tgz", ".tar.xz", ".tar", ".img")
+    ARCHIVE_EXT = IMG_EXTS
+
+    SUBDIR_RE   = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]*/$")
 
     def __init__(self):
         super().__init__()
         self.links: List[str] = []
+        self.dirs: List[str] = []
 
     def handle_starttag(self, tag, attrs):
         if tag == "a":
             for name, val in attrs:
                 if name == "href" and val and any(val.endswith(e) for e in self.ARCHIVE_EXT):
                     self.links.append(val)
+                elif name == "href" and val and self.SUBDIR_RE.match(val):
+                    self.dirs.append(val)
 
 
-def _fetch_url(
+# ─────────────────────────────────────────────
+# HTTP requests (connection pool in http_transfer.py)
+# ─────────────────────────────────────────────
+def _build_request(
     url: str,
-    no_cert: bool = False,
     creds: Optional[VaultCredentials] = None,
-) -> bytes:
-    ctx = ssl.create_default_context()
-    if no_cert:
-        ctx.check_hostname = False
-        ctx.verify_mode = ssl.CERT_NONE
+    extra_headers: Optional[Dict[str, str]] = None,
+) -> urllib.request.Request:
     headers = {"User-Agent": "openchai-setup/1.0"}
     if creds:
         headers["Authorization"] = creds.auth_header()
-    req = urllib.request.Request(url, headers=headers)
-    with urllib.request.urlopen(req, context=ctx, timeout=30) as resp:
+    if extra_headers:
+        headers.update(extra_headers)
+    return urllib.request.Request(url, headers=headers)
+
+
+# One pool per process — every HTTP path in this script goes through it
+_POOL = HttpPool(max_idle_per_host=8)
+
+
+# ─────────────────────────────────────────────
+# Bandwidth governor (TokenBucket in http_transfer.py)
+# ─────────────────────────────────────────────
+_THROTTLE = TokenBucket(MAX_RATE, parse_window(RATE_WINDOW))
+
+
+def _fetch_url(
+    url: str,
+    no_cert: bool = False,
+    creds: Optional[VaultCredentials] = None,
+) -> bytes:
+    with _POOL.urlopen(_build_request(url, creds), no_cert, timeout=30) as resp:
         return resp.read()
 
 
+# Optional machine-readable catalog at the registry root; see run_catalog()
+CATALOG_NAME    = "index.json"
+CATALOG_FORMAT  = 1
+
+_CATALOG_STATE: Dict[str, object] = {"loaded": False, "files": None, "dirs": None}
+_CATALOG_LOCK  = threading.Lock()
+
+
+def _vault_catalog(
+    no_cert: bool,
+    creds: Optional[VaultCredentials] = None,
+) -> Optional[Dict[str, dict]]:
+    """
+    Return {path relative to OPENCHAI_VAULT_URL: {"size", "mtime", "sha256"}}
+    from the vault's CATALOG_NAME, or None when the vault has no catalog —
+    callers then fall back to scraping listings.  Fetched once per run;
+    a fetch that fails in transit (other than a 404) is retried by the
+    next caller rather than remembered as "no catalog".
+    """
+    with _CATALOG_LOCK:
+        if not _CATALOG_STATE["loaded"]:
+            try:
+                files = json.loads(_fetch_url(OPENCHAI_VAULT_URL + CATALOG_NAME, no_cert, creds))["files"]
+                if not isinstance(files, dict):
+                    raise ValueError("'files' is not an object")
+                # Index by parent directory once, for _catalog_dir()
+                dirs: Dict[str, Dict[str, dict]] = {}
+                for path, meta in files.items():
+                    parent, _, name = path.rpartition("/")
+                    dirs.setdefault(parent + "/" if parent else "", {})[name] = meta
+                _CATALOG_STATE.update(loaded=True, files=files, dirs=dirs)
+                log_info(f"Loaded vault catalog: {len(files)} file(s)")
+            except urllib.error.HTTPError as exc:
+                if exc.code == 404:
+                    _CATALOG_STATE["loaded"] = True
+                else:
+                    log_warn(f"Vault catalog unavailable (HTTP {exc.code}); using directory listings.")
+            except (urllib.error.URLError, OSError, http.client.HTTPException) as exc:
+                log_warn(f"Vault catalog unavailable ({exc}); using directory listings.")
+            except Exception as exc:
+                _CATALOG_STATE["loaded"] = True     # fetched, but refetching won't fix its contents
+                log_warn(f"Vault catalog unreadable ({exc}); using directory listings.")
+        return _CATALOG_STATE["files"]  # type: ignore[return-value]
+
+
+def _catalog_dir(
+    url: str,
+    no_cert: bool,
+    creds: Optional[VaultCredentials] = None,
+) -> Optional[Dict[str, dict]]:
+    """Catalog records of the files directly inside directory *url*, keyed by name."""
+    files = _vault_catalog(no_cert, creds)
+    if files is None or not url.startswith(OPENCHAI_VAULT_URL):
+        return None
+    dirs: Dict[str, Dict[str, dict]] = _CATALOG_STATE["dirs"]  # type: ignore[assignment]
+    return dict(dirs.get(url[len(OPENCHAI_VAULT_URL):], {}))
+
+
+def _iter_listing(
+    url: str,
+    no_cert: bool,
+    creds: Optional[VaultCredentials] = None,
+    max_entries: int = LISTING_MAX_ENTRIES,
+    dirs: Optional[List[str]] = None,
+) -> Iterator[str]:
+    """
+    Yield archive links from the directory listing at *url* as the body
+    streams in, parsing LISTING_CHUNK at a time so a directory with tens of
+    thousands of entries never sits in memory whole.  Stops after
+    *max_entries* links (0 = no cap).  Subdirectory links are appended to
+    *dirs* when it is given.
+    (mirrors container_img_selector._iter_hrefs)
+    """
+    parser  = _HrefParser()
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    count   = 0
+    with _POOL.urlopen(_build_request(url, creds), no_cert, timeout=30) as resp:
+        while True:
+            data = resp.read(LISTING_CHUNK)
+            parser.feed(decoder.decode(data, final=not data))
+            if not data:
+                parser.close()
+            links, parser.links = parser.links, []
+            if dirs is not None:
+                dirs += parser.dirs
+            parser.dirs = []
+            for href in links:
+                yield href
+                count += 1
+                if max_entries and count >= max_entries:
+                    log_warn(f"Listing of {url} truncated after {max_entries} entries.")
+                    return
+            if not data:
+                return
+
+
 def _list_remote_archives(
     url: str,
     no_cert: bool,
     creds: Optional[VaultCredentials] = None,
 ) -> List[str]:
+    listed = _catalog_dir(url, no_cert, creds)
+    if listed is not None:
+        return sorted(
+            name for name in listed
+            if any(name.endswith(e) for e in _HrefParser.ARCHIVE_EXT)
+        )
     try:
-        html = _fetch_url(url, no_cert, creds).decode("utf-8", errors="replace")
-        parser = _HrefParser()
-        parser.feed(html)
-        return parser.links
+        return list(_iter_listing(url, no_cert, creds))
     except Exception as exc:
         log_warn(f"Could not fetch archive list from {url}: {exc}")
         return []
@@ -201,7 +374,7 @@ def _list_remote_archives(
 # Utility helpers
 # ─────────────────────────────────────────────
 def strip_tar_ext(filename: str) -> str:
-    for ext in (".tar.gz", ".tgz", ".tar.xz", ".tar"):
+    for ext in TAR_EXTS:
         if filename.endswith(ext):
             return filename[: -len(ext)]
     return filename
@@ -501,7 +674,23 @@ def collect_vault_credentials() -> Optional[VaultCredentials]:
 # Registry Tar Handling
 # ─────────────────────────────────────────────
 
-TAR_EXTS = (".tar.gz", ".tgz", ".tar.xz", ".tar")
+TAR_EXTS = (".tar.gz", ".tgz", ".tar.xz", ".tar.zst", ".tar")
+
+# Parallel decompressors tried in order per format (detected from magic
+# bytes, not the file name); tarfile's built-in codecs are the fallback.
+_DECOMPRESSORS: Dict[str, Tuple[List[str], ...]] = {
+    "gz":  (["pigz", "-dc"], ["gzip", "-dc"]),
+    "xz":  (["xz", "-T0", "-dc"],),
+    "zst": (["zstd", "-T0", "-dc"],),
+    "bz2": (["lbzip2", "-dc"], ["pbzip2", "-dc"]),
+}
+
+_COMPRESSION_MAGIC = (
+    (b"\x1f\x8b",                 "gz"),
+    (b"\xfd7zXZ\x00",             "xz"),
+    (b"\x28\xb5\x2f\xfd",         "zst"),
+    (b"BZh",                      "bz2"),
+)
 
 
 def _find_local_tars(directory: Path) -> List[Path]:
@@ -516,622 +705,1796 @@ def _find_local_tars(directory: Path) -> List[Path]:
     ]
 
 
-def _safe_extract_tar(tf: tarfile.TarFile, path: Path):
+def _sniff_compression(head: bytes) -> str:
+    for magic, fmt in _COMPRESSION_MAGIC:
+        if head.startswith(magic):
+            return fmt
+    return ""
+
+
+def _decompressor_for(fmt: str) -> Optional[List[str]]:
+    for cmd in _DECOMPRESSORS.get(fmt, ()):
+        if shutil.which(cmd[0]):
+            return cmd
+    return None
+
+
+class _ArchiveError(Exception):
+    """The archive itself is unusable: undecodable, or unsafe to extract."""
+
+
+def _is_archive_error(exc: BaseException) -> bool:
     """
-    Secure tar extraction preventing path traversal attacks.
+    True when *exc* says the archive is corrupt, truncated or unsafe, so
+    reading it again cannot help.  A full disk, a permission problem or
+    a failed chown is the destination's fault, not the archive's.
     """
+    if isinstance(exc, tarfile.ExtractError) and isinstance(exc.__cause__, OSError):
+        return False
+    if isinstance(exc, (_ArchiveError, tarfile.TarError, EOFError, zlib.error, lzma.LZMAError)):
+        return True
+    if type(exc).__name__ == "ZstdError":
+        return True
+    # gzip.BadGzipFile and bz2 report bad data as an OSError without an errno
+    return isinstance(exc, OSError) and exc.errno is None
 
-    abs_path = path.resolve()
-
-    for member in tf.getmembers():
 
-        member_path = (path / member.name).resolve()
+class _PrefixedReader:
+    """File-like object that replays *head* before continuing with *src*."""
 
-        if not str(member_path).startswith(str(abs_path)):
-            raise Exception(
-                f"Blocked suspicious tar path: {member.name}"
-            )
+    def __init__(self, head: bytes, src):
+        self._head = head
+        self._src  = src
 
-    tf.extractall(path)
+    def read(self, size: int = -1) -> bytes:
+        if not self._head:
+            return self._src.read(size)
+        if size is None or size < 0:
+            data, self._head = self._head + self._src.read(), b""
+        else:
+            data, self._head = self._head[:size], self._head[size:]
+        return data
 
-def _extract_tar(
-    src,
-    dest_dir: Path,
-    is_stream: bool = False
-) -> bool:
-    """Extract tar from file path or file-like stream into dest_dir."""
 
-    dest_dir.mkdir(parents=True, exist_ok=True)
+class _DecompressPipe:
+    """
+    Run an external decompressor between *src* and tarfile.  A path is
+    handed to the child as stdin directly; a file-like source is copied
+    in by a feeder thread, so network reads, decompression and tar
+    writes all run concurrently.  Entering yields the decompressed pipe.
+    The child's stderr goes to a temporary file, not a pipe: nothing
+    reads it until the child exits, and a chatty decompressor filling a
+    pipe would block while tarfile waits on its stdout.
+    """
 
-    try:
+    STDERR_TAIL = 4096    # bytes of the child's stderr quoted in an error
 
-        with Progress(
-            SpinnerColumn(),
-            TextColumn(
-                "[progress.description]{task.description}"
-            ),
-            console=console,
-        ) as progress:
+    def __init__(self, cmd: List[str], src):
+        self._cmd        = cmd
+        self._feeder:    Optional[threading.Thread] = None
+        self._feed_error: Optional[BaseException] = None
+        self._stderr     = tempfile.TemporaryFile()
 
-            task = progress.add_task(
-                "Extracting archive…",
-                total=None
+        if isinstance(src, (str, Path)):
+            with open(src, "rb") as fh:
+                self._proc = subprocess.Popen(
+                    cmd, stdin=fh, stdout=subprocess.PIPE, stderr=self._stderr,
+                )
+        else:
+            self._proc = subprocess.Popen(
+                cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=self._stderr,
             )
+            self._feeder = threading.Thread(
+                target=self._feed, args=(src,), name="openchai-decompress-feed", daemon=True,
+            )
+            self._feeder.start()
 
-            if is_stream:
+    def _feed(self, src):
+        try:
+            while True:
+                block = src.read(CHUNK_SIZE)
+                if not block:
+                    break
+                self._proc.stdin.write(block)
+        except BaseException as exc:          # surfaced to the caller in __exit__
+            self._feed_error = exc
+        finally:
+            try:
+                self._proc.stdin.close()
+            except OSError:
+                pass
+
+    def __enter__(self):
+        return self._proc.stdout
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            # tarfile stops at the end-of-archive marker; drain the padding
+            # so the decompressor is not killed by SIGPIPE
+            while self._proc.stdout.read(CHUNK_SIZE):
+                pass
+        else:
+            self._proc.kill()
+        self._proc.stdout.close()
+        rc = self._proc.wait()
+        with self._stderr:
+            self._stderr.seek(max(0, self._stderr.seek(0, os.SEEK_END) - self.STDERR_TAIL))
+            stderr = self._stderr.read().decode("utf-8", errors="replace").strip()
+        if self._feeder is not None:
+            self._feeder.join()
+        if exc_type is not None:
+            return False
+        if self._feed_error is not None:
+            raise self._feed_error
+        if rc != 0:
+            raise _ArchiveError(f"{self._cmd[0]} exited with status {rc}: {stderr or 'no output'}")
+        return False
 
-                with tarfile.open(
-                    fileobj=src,
-                    mode="r|*"
-                ) as tf:
 
-                    _safe_extract_tar(tf, dest_dir)
+def _within(root: str, target: str) -> bool:
+    return os.path.commonpath([root, target]) == root
 
-            else:
 
-                with tarfile.open(
-                    src,
-                    mode="r:*"
-                ) as tf:
+def _check_member(member: tarfile.TarInfo, root: str):
+    """
+    Raise if writing *member* under *root* could land, or point, outside it.
+    Paths are resolved against what is already on disk, so a symlink
+    planted by an earlier member cannot be used as a stepping stone.
+    """
 
-                    _safe_extract_tar(tf, dest_dir)
+    name   = member.name
+    target = os.path.realpath(os.path.join(root, name))
 
-            progress.update(task, completed=True)
+    if os.path.isabs(name) or not _within(root, target):
+        raise _ArchiveError(
+            f"Blocked suspicious tar path: {name}"
+        )
 
-        return True
+    if member.issym():
 
-    except Exception as exc:
+        link = os.path.realpath(
+            os.path.join(root, os.path.dirname(name), member.linkname)
+        )
 
-        log_warn(f"Extraction failed: {exc}")
+        if os.path.isabs(member.linkname) or not _within(root, link):
+            raise _ArchiveError(
+                f"Blocked symlink escaping the destination: {name} -> {member.linkname}"
+            )
 
-        return False
+    elif member.islnk():
 
-def _show_download_queue(tasks: List[DownloadTask]):
+        link = os.path.realpath(os.path.join(root, member.linkname))
 
-    console.print(
-        Rule("[bold]Download Queue[/bold]")
-    )
+        if os.path.isabs(member.linkname) or not _within(root, link):
+            raise _ArchiveError(
+                f"Blocked hardlink escaping the destination: {name} -> {member.linkname}"
+            )
 
-    table = Table(
-        box=box.ROUNDED,
-        header_style="bold cyan"
-    )
 
-    table.add_column("#", justify="center")
-    table.add_column("Tool")
-    table.add_column("Version")
-    table.add_column("Image")
-    table.add_column("Size", justify="right")
-    table.add_column("Destination")
+# tarfile's own extraction filter (Python 3.12+, backported to 3.8.17 /
+# 3.9.17 / 3.10.12 / 3.11.4) as a second line of defence; it also clears
+# setuid/setgid bits.  None on interpreters without filter support.
+_TAR_FILTER = "tar" if hasattr(tarfile, "tar_filter") else None
 
-    for idx, task in enumerate(tasks, 1):
 
-        table.add_row(
-            str(idx),
-            task.tool,
-            task.version,
-            task.filename,
-            task.size,
-            str(task.destination)
-        )
+# ─────────────────────────────────────────────
+# Extraction manifest
+#
+# A successful extraction of <version_dir>/<version> leaves
+# <version_dir>/.<version>.manifest: a JSON header line followed by one
+# [name, kind, size, mtime, link] line per member.  While an extraction
+# runs, .<version>.manifest.partial marks the tree as incomplete.
+# ─────────────────────────────────────────────
+def _manifest_path(version_dir: Path, version: str) -> Path:
+    return version_dir / f".{version}.manifest"
 
-    console.print(table)
 
-    console.print(
-        f"\n[bold]{len(tasks)}[/bold] image(s) queued"
-    )
+def _manifest_entry(member: tarfile.TarInfo) -> list:
 
-def _show_download_report(tasks: List[DownloadTask]):
+    if member.isdir():
+        kind = "d"
+    elif member.isreg():
+        kind = "f"
+    elif member.issym():
+        kind = "l"
+    elif member.islnk():
+        kind = "h"
+    else:
+        kind = "o"
 
-    console.print(
-        Rule("[bold]Download Report[/bold]")
-    )
+    return [
+        member.name,
+        kind,
+        member.size if kind == "f" else 0,
+        int(member.mtime),
+        member.linkname,
+    ]
 
-    table = Table(
-        box=box.SIMPLE_HEAVY
-    )
 
-    table.add_column("Status")
-    table.add_column("Tool")
-    table.add_column("Image")
-    table.add_column("Detail")
+def _entry_intact(entry: list, root: str) -> bool:
+    """One lstat: does the file on disk still match its manifest entry?"""
 
-    for task in tasks:
+    name, kind, size, mtime, link = entry
+    target = os.path.join(root, name)
 
-        status_icon = {
-            "DONE": "✔",
-            "SKIP": "⏭",
-            "FAILED": "❌"
-        }.get(task.status, "?")
+    try:
+        st = os.lstat(target)
+    except OSError:
+        return False
 
-        table.add_row(
-            status_icon,
-            task.tool,
-            task.filename,
-            task.detail
+    if kind == "f":
+        return (
+            stat.S_ISREG(st.st_mode)
+            and st.st_size == size
+            and int(st.st_mtime) == mtime
         )
 
-    console.print(table)
+    if kind == "d":
+        return stat.S_ISDIR(st.st_mode)
 
-def _download_and_extract(
-    task: DownloadTask,
-    no_cert: bool,
-    creds: Optional[VaultCredentials] = None,
-) -> bool:
+    if kind == "l":
+        return stat.S_ISLNK(st.st_mode) and os.readlink(target) == link
 
-    ctx = ssl.create_default_context()
+    if kind == "h":
+        try:
+            return os.path.samestat(st, os.stat(os.path.join(root, link)))
+        except OSError:
+            return False
 
-    if no_cert:
-        ctx.check_hostname = False
-        ctx.verify_mode = ssl.CERT_NONE
+    return True
 
-    headers = {
-        "User-Agent": "openchai-setup/1.0"
-    }
 
-    if creds:
-        headers["Authorization"] = creds.auth_header()
+def _write_manifest(path: Path, entries: List[list], total: int):
 
-    tmp_tar = (
-        task.destination.parent /
-        f"{task.filename}.download"
-    )
+    tmp = path.with_name(path.name + ".tmp")
 
-    try:
+    with open(tmp, "w", encoding="utf-8") as fh:
+        fh.write(json.dumps({"members": len(entries), "bytes": total}) + "\n")
+        for entry in entries:
+            fh.write(json.dumps(entry, separators=(",", ":")) + "\n")
 
-        req = urllib.request.Request(
-            task.url,
-            headers=headers
-        )
+    os.replace(tmp, path)
 
-        with urllib.request.urlopen(
-            req,
-            context=ctx,
-            timeout=300
-        ) as resp:
 
-            total = int(
-                resp.headers.get(
-                    "Content-Length",
-                    0
-                )
-            )
+def _read_manifest(path: Path) -> Optional[List[list]]:
+    """Entries of a manifest, or None if it is missing, unreadable or truncated."""
 
-            with Progress(
-                SpinnerColumn(),
-                TextColumn(
-                    "[progress.description]{task.description}"
-                ),
-                BarColumn(),
-                DownloadColumn(),
-                TransferSpeedColumn(),
-                TimeRemainingColumn(),
-                console=console,
-            ) as progress:
+    try:
+        with open(path, encoding="utf-8") as fh:
+            header  = json.loads(fh.readline())
+            entries = [json.loads(line) for line in fh]
+    except (OSError, ValueError):
+        return None
 
-                dl_task = progress.add_task(
-                    f"Downloading {task.filename}",
-                    total=total
-                )
+    if not isinstance(header, dict) or header.get("members") != len(entries):
+        return None
 
-                with open(tmp_tar, "wb") as out:
+    return entries
 
-                    while True:
 
-                        chunk = resp.read(1024 * 1024)
+def _extraction_state(
+    version_dir: Path,
+    version: str,
+    sample: int = EXTRACT_VERIFY_SAMPLE,
+) -> Tuple[str, List[str]]:
+    """
+    What an earlier extraction left in <version_dir>/<version>:
 
-                        if not chunk:
-                            break
+      "complete"    manifest present and every checked member matches
+      "damaged"     manifest present; the returned members are missing
+                    or altered
+      "partial"     an extraction started and never finished
+      "unverified"  files but no manifest (older release, or copied in)
+      "missing"     nothing there
 
-                        out.write(chunk)
+    Verification is one lstat per member, spread over EXTRACT_WORKERS
+    threads; *sample* > 0 checks only that many members picked at random.
+    """
 
-                        progress.update(
-                            dl_task,
-                            advance=len(chunk)
-                        )
+    manifest = _manifest_path(version_dir, version)
 
-        log_notice(
-            f"Download completed: "
-            f"{task.filename}"
-        )
+    if manifest.with_name(manifest.name + ".partial").exists():
+        return "partial", []
 
-        if not _extract_tar(
-            str(tmp_tar),
-            task.destination.parent
-        ):
+    entries = _read_manifest(manifest)
 
-            task.status = "FAILED"
-            task.detail = "Extraction failed"
+    if entries is None:
+        tree = version_dir / version
+        if tree.is_dir() and any(tree.iterdir()):
+            return "unverified", []
+        return "missing", []
 
-            return False
+    if 0 < sample < len(entries):
+        entries = random.sample(entries, sample)
 
-        task.status = "DONE"
-        task.detail = "Downloaded & extracted"
+    root = os.path.realpath(version_dir)
 
-        return True
+    with ThreadPoolExecutor(max_workers=max(1, EXTRACT_WORKERS)) as pool:
+        intact = list(pool.map(lambda e: _entry_intact(e, root), entries))
 
-    except Exception as exc:
+    damaged = [entry[0] for entry, ok in zip(entries, intact) if not ok]
+
+    return ("damaged" if damaged else "complete"), damaged
 
-        task.status = "FAILED"
-        task.detail = str(exc)
 
+def _report_extraction_state(state: str, damaged: List[str], version: str):
+
+    if state == "damaged":
         log_warn(
-            f"Download failed: {exc}"
+            f"{len(damaged)} file(s) of {version} missing or altered "
+            f"(e.g. {damaged[0]}) — repairing."
         )
+    elif state == "partial":
+        log_warn(f"An earlier extraction of {version} did not finish — repairing.")
+    elif state == "unverified":
+        log_warn(f"{version} has no extraction manifest — checking it against the archive.")
 
-        return False
 
-    finally:
+class _ByteBudget:
+    """Caps the member data buffered between the tar reader and the writers."""
 
-        try:
+    def __init__(self, limit: int):
+        self._free = limit
+        self._cond = threading.Condition()
 
-            if tmp_tar.exists():
-                tmp_tar.unlink()
+    def acquire(self, n: int):
+        with self._cond:
+            self._cond.wait_for(lambda: self._free >= n)
+            self._free -= n
 
-        except Exception:
-            pass
+    def release(self, n: int):
+        with self._cond:
+            self._free += n
+            self._cond.notify_all()
 
-# ─────────────────────────────────────────────
-# Main Registry Handler
-# ─────────────────────────────────────────────
-def handle_registry_tar(
-    base_dir: Path,
-    arch: str,
-    os_version: str,
-    no_cert: bool,
-    creds: Optional[VaultCredentials] = None,
-) -> str:
 
-    console.print(
-        Rule("[bold]Host Machine Registry (Tar)[/bold]")
-    )
+_FICLONE = 0x40049409   # linux/fs.h: make a file share another file's extents
 
-    registry_dir = (
-        base_dir /
-        "hpcsuite_registry" /
-        "hostmachine_reg" /
-        arch
-    )
 
-    version_dir = registry_dir / os_version
+class _DedupStore:
+    """
+    Content-addressed blobs shared by every release extracted into one
+    <version_dir>, kept in <version_dir>/.store/sha256/… like the
+    container image store.
+
+    The first file extracted with a given content becomes the blob (a
+    hardlink).  A later identical member whose mode and owner match the
+    blob gets a reflink of it where the filesystem supports one — its
+    own inode, so its own attributes — and a hardlink otherwise.
+    Hardlinked members keep the blob's mtime: they are left out of the
+    final attribute sweep and their manifest entries record that mtime.
+
+    A blob is hard-linked to files in earlier releases, so damage to one
+    of those files damages the blob too.  Each blob is re-hashed before
+    its first use in a run; a blob that no longer matches its digest is
+    dropped from the store and the member is written out in full.
+    """
 
-    version_dir.mkdir(
-        parents=True,
-        exist_ok=True
-    )
+    def __init__(self, version_dir: Path):
+        self.root    = version_dir
+        self.linked: Set[str] = set()
+        self.files   = 0
+        self.saved   = 0
+        self.methods: Set[str] = set()
+        self._clone  = True
+        self._lock   = threading.Lock()
+        self._verified: Set[str] = set()
+        self._as_root = hasattr(os, "geteuid") and os.geteuid() == 0
+
+    def _reflink(self, blob: Path, target: str) -> bool:
+        try:
+            import fcntl
+            with open(blob, "rb") as src, open(target, "xb") as dst:
+                fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+            return True
+        except (ImportError, OSError):
+            # EOPNOTSUPP / EXDEV / EINVAL: this filesystem cannot clone
+            self._clone = False
+            with contextlib.suppress(OSError):
+                os.unlink(target)
+            return False
 
-    network_url = (
-        f"{OPENCHAI_VAULT_URL}"
-        f"hostmachine_reg/"
-        f"{arch}/"
-        f"{os_version}/"
-    )
+    def place(self, digest: str, member: tarfile.TarInfo, target: str, entry: list) -> bool:
+        """Put the stored copy of *digest* at *target*; False if there is none to use."""
 
-    local_tars = _find_local_tars(version_dir)
+        blob = _store_path(self.root, digest)
 
-    # ─────────────────────────────────────────
-    # LOCAL TAR FILES
-    # ─────────────────────────────────────────
-    if local_tars:
+        try:
+            st = os.stat(blob)
+        except OSError:
+            return False
 
-        log_info(
-            f"Found {len(local_tars)} local tar file(s)"
-        )
+        if st.st_size != member.size:
+            self._drop(blob, digest)
+            return False
 
-        table = Table(
-            box=box.ROUNDED,
-            header_style="bold cyan"
-        )
+        if stat.S_IMODE(st.st_mode) != member.mode or (
+            self._as_root and (st.st_uid, st.st_gid) != (member.uid, member.gid)
+        ):
+            return False
 
-        table.add_column("#", justify="center")
-        table.add_column("Tarball")
-        table.add_column("Location")
+        if digest not in self._verified:
+            try:
+                intact = _sha256_path(blob) == digest
+            except OSError:
+                intact = False
+            if not intact:
+                self._drop(blob, digest)
+                return False
+            with self._lock:
+                self._verified.add(digest)
+
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(target)
+
+        if self._clone and self._reflink(blob, target):
+            method = "reflink"
+        else:
+            try:
+                os.link(blob, target)
+            except OSError:
+                return False             # e.g. EMLINK: the blob has too many links
+            self.linked.add(target)
+            entry[3] = int(st.st_mtime)
+            method = "hardlink"
+
+        with self._lock:
+            self.files += 1
+            self.saved += st.st_size
+            self.methods.add(method)
 
-        for idx, tar in enumerate(local_tars, 1):
+        return True
 
-            table.add_row(
-                str(idx),
-                tar.name,
-                str(tar.parent)
-            )
+    def _drop(self, blob: Path, digest: str):
+        log_warn(f"Stored copy {blob.name[:12]}… no longer matches its digest — dropping it from the store.")
+        with contextlib.suppress(OSError):
+            blob.unlink()
+        with self._lock:
+            self._verified.discard(digest)
 
-        console.print(table)
+    def add(self, target: str, digest: str):
+        blob = _store_path(self.root, digest)
+        try:
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            os.link(target, blob)
+            with self._lock:
+                self._verified.add(digest)
+        except FileExistsError:
+            pass
+        except OSError as exc:
+            log.info("Not adding %s to the store: %s", target, exc)
+
+    def prune(self) -> int:
+        """Remove blobs no release links to any more; returns the bytes freed."""
+        freed = 0
+        for blob in (self.root / STORE_DIRNAME / "sha256").glob("*/*"):
+            try:
+                st = blob.stat()
+                if st.st_nlink == 1:
+                    blob.unlink()
+                    freed += st.st_size
+            except OSError:
+                continue
+        return freed
+
+
+def _stream_member(
+    tf: tarfile.TarFile,
+    member: tarfile.TarInfo,
+    target: str,
+    store: _DedupStore,
+    entry: list,
+):
+    """Copy a member too large to buffer, hashing it on the way to disk."""
 
-        raw = Prompt.ask(
-            "Select local tarball",
-            default="1"
-        )
+    tmp    = os.path.join(os.path.dirname(target), f".{os.path.basename(target)}.part")
+    hasher = hashlib.sha256()
+    src    = tf.extractfile(member)
 
-        try:
-            idx = int(raw) - 1
-        except Exception:
-            log_warn("Invalid selection")
-            return "__SET_LATER__"
+    with open(tmp, "wb") as out:
+        while True:
+            chunk = src.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            hasher.update(chunk)
+            out.write(chunk)
 
-        if idx < 0 or idx >= len(local_tars):
+    digest = hasher.hexdigest()
 
-            log_warn("Invalid selection")
+    if store.place(digest, member, target, entry):
+        os.unlink(tmp)
+        return
 
-            return "__SET_LATER__"
+    os.replace(tmp, target)
+    store.add(target, digest)
 
-        chosen = local_tars[idx]
 
-        openchai_version = strip_tar_ext(
-            chosen.name
-        )
+def _write_member(
+    target: str,
+    data: bytes,
+    budget: _ByteBudget,
+    store: Optional[_DedupStore] = None,
+    member: Optional[tarfile.TarInfo] = None,
+    entry: Optional[list] = None,
+):
+    """
+    Write one regular file; an existing symlink at *target* is replaced,
+    not followed.  With a *store*, content it already holds is linked
+    instead of written, and new content is added to it.
+    """
 
-        extracted_dir = (
-            version_dir / openchai_version
-        )
+    flags  = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_NOFOLLOW", 0)
+    digest = None
 
-        # Already extracted
-        if extracted_dir.exists() and any(extracted_dir.iterdir()):
+    try:
 
-            log_notice(
-                f"Already complete, skipping: "
-                f"{openchai_version}"
-            )
+        if store is not None:
 
-            return openchai_version
+            if len(data) >= EXTRACT_DEDUP_MIN:
+                digest = hashlib.sha256(data).hexdigest()
+                if store.place(digest, member, target, entry):
+                    return
 
-        log_info(
-            f"Extracting {chosen.name}"
-        )
+            # never truncate in place: the old file may be a stored blob
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(target)
 
-        if _extract_tar(
-            str(chosen),
-            version_dir
-        ):
+        try:
+            fd = os.open(target, flags, 0o600)
+        except OSError:
+            os.unlink(target)
+            fd = os.open(target, flags, 0o600)
 
-            log_notice(
-                f"Registry extracted successfully: "
-                f"{openchai_version}"
-            )
+        with open(fd, "wb") as out:
+            out.write(data)
 
-            return openchai_version
+        if digest is not None:
+            store.add(target, digest)
 
-        log_warn(
-            "Extraction failed."
-        )
+    finally:
+        budget.release(len(data))
 
-        return "__SET_LATER__"
 
-    # ─────────────────────────────────────────
-    # NO LOCAL TARS
-    # ─────────────────────────────────────────
-    log_warn(
-        f"No tar files found in {version_dir}"
-    )
+def _safe_extract_tar(
+    tf: tarfile.TarFile,
+    path: Path,
+    workers: int = EXTRACT_WORKERS,
+    manifest: Optional[Dict[str, list]] = None,
+    repair: bool = False,
+    store: Optional[_DedupStore] = None,
+) -> int:
+    """
+    Secure single-pass tar extraction.
+
+    Each member is validated against path traversal and symlink /
+    hardlink escapes as it is read, then written immediately, so the
+    archive is decompressed once and a stream (r|*) works as well as a
+    file.  Device nodes are skipped.  Returns the number of bytes of
+    member data extracted.
+
+    With *workers* > 1 the archive is still read in order, but file
+    creation — which dominates on NFS / Lustre — is spread over a thread
+    pool:
+      • directories are created in archive order by the reader, so a
+        writer never races its parent
+      • files up to CHUNK_MAX are buffered (at most EXTRACT_BUFFER bytes
+        in flight) and written by the pool; larger ones are streamed by
+        the reader itself
+      • a hardlink waits for its target's write; a repeated name waits
+        for the earlier copy
+      • ownership, mode and mtime are applied to each file, link or
+        symlink as soon as it exists (so a later member of the same name
+        replaces it cleanly), and to directories in one sweep at the end,
+        deepest-first so their mtimes and read-only modes stick; only
+        directories are remembered, so memory stays flat
+
+    Every member is recorded in *manifest* (see _manifest_entry), keyed
+    by its normalised name, when one is given; a repeated name replaces
+    the earlier record, just as its file replaces the earlier copy.  With *repair* the archive is still read in full, but files
+    already on disk that match their header are left alone.  With a
+    *store* (see _DedupStore) regular files are deduplicated against
+    earlier releases; this always takes the threaded path.
+    """
 
-    console.print("\n  [bold]Options:[/bold]")
-    console.print("  [cyan]1[/cyan]  Download from network")
-    console.print("  [cyan]2[/cyan]  Install manually later")
-    console.print("  [cyan]3[/cyan]  Skip")
+    root  = os.path.realpath(path)
+    total = 0
+    kwargs = {"filter": _TAR_FILTER} if _TAR_FILTER else {}
 
-    choice = Prompt.ask(
-        "Select option",
-        choices=["1", "2", "3"],
-        default="3"
-    )
+    if workers <= 1 and store is None:
 
-    if choice == "2":
+        for member in tf:
 
-        log_warn(
-            f"Place registry tar later in:\n"
-            f"  → {version_dir}"
-        )
+            if member.isdev():
+                log_warn(f"Skipping device node in archive: {member.name}")
+                continue
 
-        return "__SET_MANUALLY__"
+            _check_member(member, root)
 
-    if choice == "3":
+            entry = _manifest_entry(member)
+            if manifest is not None:
+                manifest[os.path.normpath(member.name)] = entry
 
-        return "__SET_LATER__"
+            if repair and not member.isdir() and _entry_intact(entry, root):
+                tf.members.clear()
+                continue
 
-    # ─────────────────────────────────────────
-    # FETCH REMOTE FILES
-    # ─────────────────────────────────────────
-    log_info(
-        f"Fetching tar list from {network_url} …"
-    )
+            tf.extract(member, path, **kwargs)
 
-    remote_files = _list_remote_archives(
-        network_url,
-        no_cert,
-        creds
-    )
+            total += member.size
 
-    if not remote_files:
+            # tarfile keeps every TarInfo it reads; a stream can never seek
+            # back to them, so drop them to keep memory flat on huge archives
+            tf.members.clear()
 
-        log_warn(
-            "No archives found on network."
-        )
+        return total
 
-        return "__SET_LATER__"
+    budget  = _ByteBudget(EXTRACT_BUFFER)
+    pending: Dict[str, Future] = {}
+    dirs:    Dict[str, tarfile.TarInfo] = {}
+    made:    Set[str] = {root}
+    as_root = hasattr(os, "geteuid") and os.geteuid() == 0
+    linked  = store.linked if store is not None else set()
 
-    # ─────────────────────────────────────────
-    # REMOTE TABLE
-    # ─────────────────────────────────────────
-    table = Table(
-        title="Available OpenCHAI Packages",
-        box=box.ROUNDED,
-        header_style="bold cyan"
-    )
+    def _set_attrs(member: tarfile.TarInfo, target: str):
 
-    table.add_column("#", justify="center")
-    table.add_column("Package")
-    table.add_column("Version")
-    table.add_column("Tarball")
+        # a stored blob's attributes belong to the release that added it
+        if target in linked or (
+            member.islnk() and os.path.join(root, member.linkname) in linked
+        ):
+            return
 
-    for idx, file in enumerate(remote_files, 1):
+        if as_root:
+            tf.chown(member, target, numeric_owner=False)
 
-        version = strip_tar_ext(file)
+        if not member.issym():
+            tf.chmod(member, target)
+            tf.utime(member, target)
 
-        table.add_row(
-            str(idx),
-            "openchai",
-            version,
-            file
-        )
+    def _write_file(target: str, data: bytes, member: tarfile.TarInfo, entry: list):
+        _write_member(target, data, budget, store, member, entry)
+        _set_attrs(member, target)
 
-    console.print(table)
+    def _mkdirs(directory: str):
+        if directory not in made:
+            os.makedirs(directory, exist_ok=True)
+            made.add(directory)
 
-    raw = Prompt.ask(
-        "Select file to download",
-        default="1"
-    )
+    def _settle(target: str):
+        fut = pending.pop(target, None)
+        if fut is not None:
+            fut.result()
 
-    try:
-        idx = int(raw) - 1
-    except Exception:
-        log_warn("Invalid selection")
-        return "__SET_LATER__"
+    with ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="openchai-untar") as pool:
 
-    if idx < 0 or idx >= len(remote_files):
+        for member in tf:
 
-        log_warn("Invalid selection")
+            if member.isdev():
+                log_warn(f"Skipping device node in archive: {member.name}")
+                continue
 
-        return "__SET_LATER__"
+            _check_member(member, root)
 
-    selected = remote_files[idx]
+            if _TAR_FILTER:
+                member = tarfile.tar_filter(member, root)
 
-    openchai_version = strip_tar_ext(
-        Path(selected).name
-    )
+            target = os.path.join(root, member.name)
+            _settle(target)
 
-    extracted_dir = (
-        version_dir / openchai_version
-    )
+            entry = _manifest_entry(member)
+            if manifest is not None:
+                manifest[os.path.normpath(member.name)] = entry
 
-    # ─────────────────────────────────────────
-    # DOWNLOAD TASK
-    # ─────────────────────────────────────────
-    task = DownloadTask(
-        tool="openchai",
-        version=openchai_version,
-        filename=selected,
-        size="Unknown",
-        url=network_url + selected,
-        destination=extracted_dir,
-    )
+            if repair and not member.isdir() and _entry_intact(entry, root):
+                tf.members.clear()
+                continue
 
-    # ─────────────────────────────────────────
-    # SHOW QUEUE
-    # ─────────────────────────────────────────
-    _show_download_queue([task])
+            if member.isdir():
 
-    if not Confirm.ask(
-        f"Proceed to download 1 package(s)?",
-        default=True
-    ):
+                _mkdirs(target)
 
-        return "__SET_LATER__"
+            elif member.isreg():
 
-    # ─────────────────────────────────────────
-    # ALREADY EXISTS
-    # ─────────────────────────────────────────
-    if extracted_dir.exists() and any(extracted_dir.iterdir()):
+                _mkdirs(os.path.dirname(target))
 
-        task.status = "SKIP"
-        task.detail = "Already downloaded"
+                if member.size <= CHUNK_MAX:
+                    budget.acquire(member.size)
+                    data = tf.extractfile(member).read()
+                    pending[target] = pool.submit(_write_file, target, data, member, entry)
+                elif store is not None:
+                    _stream_member(tf, member, target, store, entry)
+                else:
+                    tf.makefile(member, target)
 
-        log_notice(
-            f"Already complete, skipping: "
-            f"{openchai_version}"
-        )
+            elif member.issym() or member.islnk():
 
-        _show_download_report([task])
+                _mkdirs(os.path.dirname(target))
 
-        return openchai_version
+                if member.islnk():
+                    _settle(os.path.join(root, member.linkname))
 
-    # ─────────────────────────────────────────
-    # DOWNLOAD & EXTRACT
-    # ─────────────────────────────────────────
-    console.print(
-        Rule("[bold]Downloading[/bold]")
-    )
+                if os.path.lexists(target):
+                    os.unlink(target)
 
-    if _download_and_extract(
-        task,
-        no_cert,
-        creds
-    ):
+                if member.issym():
+                    os.symlink(member.linkname, target)
+                else:
+                    os.link(os.path.join(root, member.linkname), target)
 
-        log_notice(
-            f"Registry extracted: "
-            f"{openchai_version}"
-        )
+            else:
 
-    else:
+                # FIFOs and other rarities: tarfile knows best
+                tf.extract(member, path, set_attrs=False, **kwargs)
 
-        log_warn(
-            f"Failed downloading: "
-            f"{openchai_version}"
-        )
+            if member.isdir():
+                dirs[target] = member
+            else:
+                dirs.pop(target, None)
+                if target not in pending:     # pooled writes set their own
+                    _set_attrs(member, target)
 
-        return "__SET_LATER__"
+            total += member.size
+            tf.members.clear()
 
-    # ─────────────────────────────────────────
-    # REPORT
-    # ─────────────────────────────────────────
-    _show_download_report([task])
+        for fut in pending.values():
+            fut.result()
 
-    return openchai_version
+    for target, member in sorted(dirs.items(), key=lambda d: -d[0].count(os.sep)):
+        if as_root:
+            tf.chown(member, target, numeric_owner=False)
+        tf.chmod(member, target)
+        tf.utime(member, target)
 
-# ─────────────────────────────────────────────
-# Section 6 – Registry version validation
-# ─────────────────────────────────────────────
-def validate_registry(
-    base_dir: Path,
-    arch: str,
-    os_version: str,
-    openchai_version: str
-):
+    return total
 
-    console.print(
-        Rule("[bold]Registry Validation[/bold]")
-    )
 
-    registry_path = (
-        base_dir
-        / "hpcsuite_registry"
-        / "hostmachine_reg"
-        / arch
-        / os_version
-        / openchai_version
-    )
+def _extract_tar(
+    src,
+    dest_dir: Path,
+    is_stream: bool = False,
+    show_spinner: bool = True,
+    manifest: Optional[Path] = None,
+    repair: bool = False,
+    dedup: bool = EXTRACT_DEDUP,
+    failures: Optional[List[Exception]] = None,
+) -> bool:
+    """
+    Extract tar from file path or file-like stream into dest_dir.
+    show_spinner=False when the caller already renders its own progress.
+    On failure the exception is appended to *failures* when given (see
+    _is_archive_error).
+
+    With *manifest* the member list is written there once extraction
+    succeeds (see _extraction_state); *repair* only rewrites members that
+    are missing or differ from their header.  *dedup* shares identical
+    files with releases already extracted into dest_dir (_DedupStore);
+    once dest_dir has a store it is always used, so a blob is never
+    overwritten in place.
+
+    Compressed archives go through a parallel decompressor subprocess
+    (_DECOMPRESSORS) when one is installed, otherwise tarfile's own
+    codecs.  Throughput is logged when extraction finishes.
+    """
 
-    if registry_path.exists() and any(registry_path.iterdir()):
+    dest_dir.mkdir(parents=True, exist_ok=True)
 
-        log_notice(
-            f"Version '{openchai_version}' found at: "
-            f"{registry_path}"
-        )
+    result  = {"bytes": 0, "backend": "tarfile"}
+    entries: Optional[Dict[str, list]] = {} if manifest is not None else None
+    store   = (
+        _DedupStore(dest_dir)
+        if dedup or (dest_dir / STORE_DIRNAME).is_dir()
+        else None
+    )
 
-    else:
+    def _do_extract():
 
-        log_warn(
-            f"Version directory not found: {registry_path}\n"
-            "Update 'openchai_version' later in group_vars/all.yml"
-        )
+        if manifest is not None:
+            manifest.with_name(manifest.name + ".partial").touch()
+            manifest.unlink(missing_ok=True)
 
+        if is_stream:
+            head   = src.read(CHUNK_SIZE)
+            fmt    = _sniff_compression(head)
+            source = _PrefixedReader(head, src)
+        else:
+            with open(src, "rb") as fh:
+                fmt = _sniff_compression(fh.read(8))
+            source = src
 
-# ─────────────────────────────────────────────
-# Section 7 – Inventory confirmation & copy
-# ─────────────────────────────────────────────
-def handle_inventory(base_dir: Path):
-    console.print(Rule("[bold]Inventory File[/bold]"))
-    inventory_def    = base_dir / "chai_setup" / "inventory_def.txt"
-    inventory_target = base_dir / "automation" / "ansible" / "inventory" / "inventory_def.txt"
+        cmd = _decompressor_for(fmt)
 
-    confirmed = Confirm.ask(
-        f"Have you updated the inventory file [cyan]{inventory_def}[/cyan] for your environment?",
-        default=False,
-    )
-    if not confirmed:
-        error_exit("Please update the inventory file before continuing.")
+        if cmd is not None:
 
-    if not inventory_def.exists():
-        error_exit(f"Inventory definition file not found: {inventory_def}")
+            result["backend"] = " ".join(cmd)
+
+            with _DecompressPipe(cmd, source) as raw, tarfile.open(
+                fileobj=raw,
+                mode="r|",
+                bufsize=CHUNK_SIZE,
+            ) as tf:
+
+                result["bytes"] = _safe_extract_tar(
+                    tf, dest_dir, manifest=entries, repair=repair, store=store
+                )
+
+        elif fmt == "zst":
+
+            # tarfile has no zstd codec before Python 3.14
+            try:
+                import zstandard
+            except ImportError:
+                raise RuntimeError(
+                    "zstd-compressed archive: install the 'zstd' package "
+                    "(or the python 'zstandard' module)"
+                )
+
+            result["backend"] = "python-zstandard"
+
+            with contextlib.ExitStack() as stack:
+                fh = source if is_stream else stack.enter_context(open(src, "rb"))
+                raw = stack.enter_context(zstandard.ZstdDecompressor().stream_reader(fh))
+                tf = stack.enter_context(
+                    tarfile.open(fileobj=raw, mode="r|", bufsize=CHUNK_SIZE)
+                )
+                result["bytes"] = _safe_extract_tar(
+                    tf, dest_dir, manifest=entries, repair=repair, store=store
+                )
+
+        elif is_stream:
+
+            # tarfile's stream default is 10 KiB reads; use CHUNK_SIZE
+            with tarfile.open(
+                fileobj=source,
+                mode="r|*",
+                bufsize=CHUNK_SIZE,
+            ) as tf:
+
+                result["bytes"] = _safe_extract_tar(
+                    tf, dest_dir, manifest=entries, repair=repair, store=store
+                )
+
+        else:
+
+            with tarfile.open(
+                src,
+                mode="r|*",
+                bufsize=CHUNK_SIZE,
+            ) as tf:
+
+                result["bytes"] = _safe_extract_tar(
+                    tf, dest_dir, manifest=entries, repair=repair, store=store
+                )
+
+        if manifest is not None:
+            members = list(entries.values())
+            _write_manifest(manifest, members, sum(entry[2] for entry in members))
+            manifest.with_name(manifest.name + ".partial").unlink()
+
+    def _report(elapsed: float):
+
+        rate = result["bytes"] / elapsed if elapsed > 0 else 0.0
+
+        log_info(
+            f"Extracted {result['bytes'] / 1024**2:,.1f} MiB in {elapsed:.1f} s "
+            f"({rate / 1024**2:,.1f} MiB/s, {result['backend']})"
+        )
+
+        if store is None:
+            return
+
+        if store.files:
+            log_notice(
+                f"Deduplicated {store.files:,} file(s) against earlier releases "
+                f"({'/'.join(sorted(store.methods))}): "
+                f"{store.saved / 1024**2:,.1f} MiB not stored again"
+            )
+
+        freed = store.prune()
+        if freed:
+            log_info(f"Pruned {freed / 1024**2:,.1f} MiB of blobs no release uses any more")
+
+    started = time.monotonic()
+
+    try:
+
+        if not show_spinner:
+
+            _do_extract()
+
+            _report(time.monotonic() - started)
+
+            return True
+
+        with Progress(
+            SpinnerColumn(),
+            TextColumn(
+                "[progress.description]{task.description}"
+            ),
+            console=console,
+        ) as progress:
+
+            task = progress.add_task(
+                "Extracting archive…",
+                total=None
+            )
+
+            _do_extract()
+
+            progress.update(task, completed=True)
+
+        _report(time.monotonic() - started)
+
+        return True
+
+    except Exception as exc:
+
+        log_warn(f"Extraction failed: {exc}")
+
+        if failures is not None:
+            failures.append(exc)
+
+        return False
+
+def _show_download_queue(tasks: List[DownloadTask]):
+
+    console.print(
+        Rule("[bold]Download Queue[/bold]")
+    )
+
+    table = Table(
+        box=box.ROUNDED,
+        header_style="bold cyan"
+    )
+
+    table.add_column("#", justify="center")
+    table.add_column("Tool")
+    table.add_column("Version")
+    table.add_column("Image")
+    table.add_column("Size", justify="right")
+    table.add_column("Destination")
+
+    for idx, task in enumerate(tasks, 1):
+
+        table.add_row(
+            str(idx),
+            task.tool,
+            task.version,
+            task.filename,
+            task.size,
+            str(task.destination)
+        )
+
+    console.print(table)
+
+    console.print(
+        f"\n[bold]{len(tasks)}[/bold] image(s) queued"
+    )
+
+def _show_download_report(tasks: List[DownloadTask]):
+
+    console.print(
+        Rule("[bold]Download Report[/bold]")
+    )
+
+    table = Table(
+        box=box.SIMPLE_HEAVY
+    )
+
+    table.add_column("Status")
+    table.add_column("Tool")
+    table.add_column("Image")
+    table.add_column("Detail")
+
+    for task in tasks:
+
+        status_icon = {
+            "DONE": "✔",
+            "SKIP": "⏭",
+            "FAILED": "❌"
+        }.get(task.status, "?")
+
+        table.add_row(
+            status_icon,
+            task.tool,
+            task.filename,
+            task.detail
+        )
+
+    console.print(table)
+
+def _content_range_total(value: Optional[str]) -> Optional[int]:
+    """Total size from a Content-Range header ('bytes a-b/N' or 'bytes */N')."""
+    if value and "/" in value:
+        total = value.rsplit("/", 1)[1].strip()
+        if total.isdigit():
+            return int(total)
+    return None
+
+
+def _download_resumable(
+    url: str,
+    tmp_path: Path,
+    no_cert: bool,
+    creds: Optional[VaultCredentials],
+    label: str,
+) -> None:
+    """
+    Download *url* into *tmp_path*, resuming whatever an earlier run left there.
+
+    • Range: bytes=N- with If-Range, so a tarball replaced on the vault
+      comes back as a full 200 body instead of being spliced
+    • 206 appends, 200 restarts from zero, 416 means the partial file is
+      already complete (or stale, in which case it is discarded)
+    • Up to MAX_RETRIES attempts with capped exponential back-off
+    • The validator is kept in a <tmp_path>.json sidecar across runs
+
+    The partial file is never deleted on failure.  Raises RuntimeError
+    when every attempt fails.
+    """
+    meta_path = tmp_path.with_name(tmp_path.name + ".json")
+    validator = ""
+    try:
+        validator = json.loads(meta_path.read_text()).get("validator", "")
+    except (OSError, ValueError):
+        pass
+
+    last_error = "unknown error"
+
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        DownloadColumn(),
+        TransferSpeedColumn(),
+        TimeRemainingColumn(),
+        console=console,
+    ) as progress:
+
+        dl_task = progress.add_task(f"Downloading {label}", total=None)
+
+        for attempt in range(1, MAX_RETRIES + 1):
+
+            resumed_at = tmp_path.stat().st_size if tmp_path.exists() else 0
+            extra: Dict[str, str] = {}
+
+            if resumed_at > 0:
+                extra["Range"] = f"bytes={resumed_at}-"
+                if validator:
+                    extra["If-Range"] = validator
+                log_info(
+                    f"Resuming {label} from byte {resumed_at:,} "
+                    f"(attempt {attempt}/{MAX_RETRIES})"
+                )
+            elif attempt > 1:
+                log_info(f"Retrying {label} (attempt {attempt}/{MAX_RETRIES})")
+
+            try:
+                with _POOL.urlopen(
+                    _build_request(url, creds, extra),
+                    no_cert,
+                    timeout=DOWNLOAD_TIMEOUT_S,
+                ) as resp:
+
+                    length = resp.headers.get("Content-Length")
+                    length = int(length) if length and length.isdigit() else None
+
+                    if resp.status == 206:
+                        mode  = "ab"
+                        total = _content_range_total(resp.headers.get("Content-Range"))
+                        if total is None and length is not None:
+                            total = resumed_at + length
+                    else:
+                        # Full body: first attempt, Range ignored, or If-Range
+                        # mismatch (vault file replaced) — start from zero
+                        mode, resumed_at, total = "wb", 0, length
+
+                    validator = resp.headers.get("ETag") or resp.headers.get("Last-Modified") or ""
+                    meta_path.write_text(json.dumps({"url": url, "validator": validator}))
+
+                    progress.update(dl_task, total=total, completed=resumed_at)
+
+                    buf    = RecvBuffer()
+                    ticker = ProgressTicker(progress, dl_task)
+
+                    with open(tmp_path, mode) as out:
+                        preallocate(out.fileno(), resumed_at, length)
+                        try:
+                            while True:
+                                chunk = buf.fill(resp)
+                                if not chunk:
+                                    break
+                                out.write(chunk)
+                                ticker.advance(len(chunk))
+                                _THROTTLE.consume(len(chunk))
+                        finally:
+                            ticker.flush()
+
+                size = tmp_path.stat().st_size
+                if total is not None and size != total:
+                    raise OSError(f"short transfer: {size:,} of {total:,} bytes")
+
+                meta_path.unlink(missing_ok=True)
+                return
+
+            except urllib.error.HTTPError as exc:
+
+                if exc.code == 416 and resumed_at > 0:
+                    total = _content_range_total(exc.headers.get("Content-Range"))
+                    if total == resumed_at:
+                        # Partial file already holds every byte
+                        progress.update(dl_task, total=total, completed=total)
+                        meta_path.unlink(missing_ok=True)
+                        return
+                    log_warn(f"Partial {label} no longer matches the vault copy — restarting.")
+                    tmp_path.unlink(missing_ok=True)
+                    meta_path.unlink(missing_ok=True)
+                    validator = ""
+                    continue
+
+                if exc.code in (401, 403, 404):
+                    raise RuntimeError(f"HTTP {exc.code} {exc.reason}") from exc
+
+                last_error = f"HTTP {exc.code} {exc.reason}"
+
+            except (urllib.error.URLError, OSError) as exc:
+                last_error = str(getattr(exc, "reason", exc))
+
+            log_warn(
+                f"Transient error on attempt {attempt}/{MAX_RETRIES} "
+                f"for {label}: {last_error}"
+            )
+            if attempt < MAX_RETRIES:
+                wait = min(2 ** attempt, RETRY_BACKOFF_MAX)
+                log_info(f"Waiting {wait} s before retry …")
+                time.sleep(wait)
+
+    raise RuntimeError(
+        f"{last_error} (failed after {MAX_RETRIES} attempts; "
+        f"partial file kept for resume: {tmp_path})"
+    )
+
+
+class _TeeReader:
+    """
+    Read-only file object over an HTTP response for tarfile's r|* mode.
+    Every block read is optionally copied to *tee* and reported to the
+    progress bar; network errors are remembered so the caller can tell
+    a dropped connection from a corrupt archive.
+    """
+
+    def __init__(self, resp, tee, progress: Progress, task_id):
+        self._resp     = resp
+        self._tee      = tee
+        self._ticker   = ProgressTicker(progress, task_id)
+        self.net_error: Optional[BaseException] = None
+
+    def read(self, size: int = -1) -> bytes:
+        try:
+            data = self._resp.read(None if size is None or size < 0 else size)
+        except (OSError, http.client.HTTPException) as exc:
+            self.net_error = exc
+            raise
+        if data:
+            if self._tee is not None:
+                self._tee.write(data)
+            self._ticker.advance(len(data))
+            _THROTTLE.consume(len(data))
+        else:
+            self._ticker.flush()
+        return data
+
+
+def _stream_extract(
+    task: DownloadTask,
+    tmp_tar: Path,
+    no_cert: bool,
+    creds: Optional[VaultCredentials],
+    keep_copy: bool,
+    repair: bool = False,
+    dedup: bool = EXTRACT_DEDUP,
+) -> Optional[bool]:
+    """
+    Pipe the HTTP response straight into tarfile's r|* reader so extraction
+    overlaps the transfer and the archive never has to sit on disk.
+    With keep_copy the bytes are also teed into *tmp_tar*.
+
+    Returns True on success, False if the archive itself is bad, or None
+    if the network dropped — the caller then falls back to the resumable
+    download (which continues from the teed partial when keep_copy is set).
+    """
+    dest_dir = task.destination.parent
+
+    try:
+        with _POOL.urlopen(
+            _build_request(task.url, creds),
+            no_cert,
+            timeout=DOWNLOAD_TIMEOUT_S,
+        ) as resp:
+
+            length = resp.headers.get("Content-Length")
+
+            with Progress(
+                SpinnerColumn(),
+                TextColumn("[progress.description]{task.description}"),
+                BarColumn(),
+                DownloadColumn(),
+                TransferSpeedColumn(),
+                TimeRemainingColumn(),
+                console=console,
+            ) as progress, (
+                open(tmp_tar, "wb") if keep_copy else contextlib.nullcontext()
+            ) as tee:
+
+                total = int(length) if length and length.isdigit() else None
+                dl_task = progress.add_task(
+                    f"Downloading & extracting {task.filename}",
+                    total=total,
+                )
+                if tee is not None:
+                    preallocate(tee.fileno(), 0, total)
+                reader = _TeeReader(resp, tee, progress, dl_task)
+
+                ok = _extract_tar(
+                    reader,
+                    dest_dir,
+                    is_stream=True,
+                    show_spinner=False,
+                    manifest=_manifest_path(dest_dir, task.version),
+                    repair=repair,
+                    dedup=dedup,
+                )
+
+                if ok and tee is not None:
+                    # tarfile stops at the end-of-archive marker; keep the
+                    # padding too so the cached copy is byte-identical
+                    while reader.read(CHUNK_SIZE):
+                        pass
+
+    except urllib.error.HTTPError as exc:
+        log_warn(f"Streaming download failed: HTTP {exc.code} {exc.reason}")
+        return None
+    except (urllib.error.URLError, OSError, http.client.HTTPException) as exc:
+        log_warn(f"Streaming download interrupted: {exc}")
+        return None
+
+    if not ok:
+        return None if reader.net_error is not None else False
+
+    return True
+
+
+def _download_and_extract(
+    task: DownloadTask,
+    no_cert: bool,
+    creds: Optional[VaultCredentials] = None,
+    stream: bool = STREAM_EXTRACT,
+    keep_copy: bool = STREAM_KEEP_COPY,
+    repair: bool = False,
+    dedup: bool = EXTRACT_DEDUP,
+) -> bool:
+    """
+    Fetch and extract task.url next to task.destination, recording the
+    extraction manifest for task.version.  *repair* leaves members that
+    an earlier run already wrote correctly untouched; *dedup* as for
+    _extract_tar.
+    """
+
+    # Kept across runs so an interrupted multi-GB transfer resumes
+    tmp_tar = (
+        task.destination.parent /
+        f"{task.filename}.download"
+    )
+    cached_tar = task.destination.parent / task.filename
+
+    # ─────────────────────────────────────────
+    # STREAM-THROUGH (no partial from an earlier run to resume)
+    # ─────────────────────────────────────────
+    if stream and not tmp_tar.exists():
+
+        streamed = _stream_extract(
+            task,
+            tmp_tar,
+            no_cert,
+            creds,
+            keep_copy,
+            repair,
+            dedup,
+        )
+
+        if streamed:
+
+            if keep_copy:
+                tmp_tar.rename(cached_tar)
+                log_notice(f"Archive cached at {cached_tar}")
+
+            task.status = "DONE"
+            task.detail = "Downloaded & extracted (streamed)"
+
+            return True
+
+        if streamed is False:
+
+            tmp_tar.unlink(missing_ok=True)
+
+            task.status = "FAILED"
+            task.detail = "Extraction failed"
+
+            return False
+
+        if not keep_copy:
+            tmp_tar.unlink(missing_ok=True)
+
+        log_warn(
+            "Falling back to a resumable download followed by extraction."
+        )
+
+        # Keep whatever the interrupted stream already wrote
+        repair = True
+
+    try:
+
+        _download_resumable(
+            task.url,
+            tmp_tar,
+            no_cert,
+            creds,
+            task.filename,
+        )
+
+    except Exception as exc:
+
+        task.status = "FAILED"
+        task.detail = str(exc)
+
+        log_warn(
+            f"Download failed: {exc}"
+        )
+
+        return False
+
+    log_notice(
+        f"Download completed: "
+        f"{task.filename}"
+    )
+
+    failures: List[Exception] = []
+
+    if not _extract_tar(
+        str(tmp_tar),
+        task.destination.parent,
+        manifest=_manifest_path(task.destination.parent, task.version),
+        repair=repair,
+        dedup=dedup,
+        failures=failures,
+    ):
+
+        # A complete but unreadable archive will not heal by resuming; one
+        # that failed for want of space or permissions is kept for a retry
+        if failures and _is_archive_error(failures[0]):
+            tmp_tar.unlink(missing_ok=True)
+        else:
+            log_info(f"Keeping the downloaded {tmp_tar.name} for the next attempt.")
+
+        task.status = "FAILED"
+        task.detail = "Extraction failed"
+
+        return False
+
+    if keep_copy:
+        tmp_tar.rename(cached_tar)
+    else:
+        tmp_tar.unlink(missing_ok=True)
+
+    task.status = "DONE"
+    task.detail = "Downloaded & extracted"
+
+    return True
+
+# ─────────────────────────────────────────────
+# Main Registry Handler
+# ─────────────────────────────────────────────
+def handle_registry_tar(
+    base_dir: Path,
+    arch: str,
+    os_version: str,
+    no_cert: bool,
+    creds: Optional[VaultCredentials] = None,
+    verify_sample: int = EXTRACT_VERIFY_SAMPLE,
+    dedup: bool = EXTRACT_DEDUP,
+) -> str:
+
+    console.print(
+        Rule("[bold]Host Machine Registry (Tar)[/bold]")
+    )
+
+    registry_dir = (
+        base_dir /
+        "hpcsuite_registry" /
+        "hostmachine_reg" /
+        arch
+    )
+
+    version_dir = registry_dir / os_version
+
+    version_dir.mkdir(
+        parents=True,
+        exist_ok=True
+    )
+
+    network_url = (
+        f"{OPENCHAI_VAULT_URL}"
+        f"hostmachine_reg/"
+        f"{arch}/"
+        f"{os_version}/"
+    )
+
+    local_tars = _find_local_tars(version_dir)
+
+    # ─────────────────────────────────────────
+    # LOCAL TAR FILES
+    # ─────────────────────────────────────────
+    if local_tars:
+
+        log_info(
+            f"Found {len(local_tars)} local tar file(s)"
+        )
+
+        table = Table(
+            box=box.ROUNDED,
+            header_style="bold cyan"
+        )
+
+        table.add_column("#", justify="center")
+        table.add_column("Tarball")
+        table.add_column("Location")
+
+        for idx, tar in enumerate(local_tars, 1):
+
+            table.add_row(
+                str(idx),
+                tar.name,
+                str(tar.parent)
+            )
+
+        console.print(table)
+
+        raw = Prompt.ask(
+            "Select local tarball",
+            default="1"
+        )
+
+        try:
+            idx = int(raw) - 1
+        except Exception:
+            log_warn("Invalid selection")
+            return "__SET_LATER__"
+
+        if idx < 0 or idx >= len(local_tars):
+
+            log_warn("Invalid selection")
+
+            return "__SET_LATER__"
+
+        chosen = local_tars[idx]
+
+        openchai_version = strip_tar_ext(
+            chosen.name
+        )
+
+        state, damaged = _extraction_state(
+            version_dir,
+            openchai_version,
+            verify_sample,
+        )
+
+        # Already extracted
+        if state == "complete":
+
+            log_notice(
+                f"Already complete, skipping: "
+                f"{openchai_version}"
+            )
+
+            return openchai_version
+
+        _report_extraction_state(state, damaged, openchai_version)
+
+        log_info(
+            f"Extracting {chosen.name}"
+        )
+
+        if _extract_tar(
+            str(chosen),
+            version_dir,
+            manifest=_manifest_path(version_dir, openchai_version),
+            repair=state != "missing",
+            dedup=dedup,
+        ):
+
+            log_notice(
+                f"Registry extracted successfully: "
+                f"{openchai_version}"
+            )
+
+            return openchai_version
+
+        log_warn(
+            "Extraction failed."
+        )
+
+        return "__SET_LATER__"
+
+    # ─────────────────────────────────────────
+    # NO LOCAL TARS
+    # ─────────────────────────────────────────
+    log_warn(
+        f"No tar files found in {version_dir}"
+    )
+
+    console.print("\n  [bold]Options:[/bold]")
+    console.print("  [cyan]1[/cyan]  Download from network")
+    console.print("  [cyan]2[/cyan]  Install manually later")
+    console.print("  [cyan]3[/cyan]  Skip")
+
+    choice = Prompt.ask(
+        "Select option",
+        choices=["1", "2", "3"],
+        default="3"
+    )
+
+    if choice == "2":
+
+        log_warn(
+            f"Place registry tar later in:\n"
+            f"  → {version_dir}"
+        )
+
+        return "__SET_MANUALLY__"
+
+    if choice == "3":
+
+        return "__SET_LATER__"
+
+    # ─────────────────────────────────────────
+    # FETCH REMOTE FILES
+    # ─────────────────────────────────────────
+    log_info(
+        f"Fetching tar list from {network_url} …"
+    )
+
+    remote_files = _list_remote_archives(
+        network_url,
+        no_cert,
+        creds
+    )
+
+    if not remote_files:
+
+        log_warn(
+            "No archives found on network."
+        )
+
+        return "__SET_LATER__"
+
+    # ─────────────────────────────────────────
+    # REMOTE TABLE
+    # ─────────────────────────────────────────
+    table = Table(
+        title="Available OpenCHAI Packages",
+        box=box.ROUNDED,
+        header_style="bold cyan"
+    )
+
+    table.add_column("#", justify="center")
+    table.add_column("Package")
+    table.add_column("Version")
+    table.add_column("Tarball")
+
+    for idx, file in enumerate(remote_files, 1):
+
+        version = strip_tar_ext(file)
+
+        table.add_row(
+            str(idx),
+            "openchai",
+            version,
+            file
+        )
+
+    console.print(table)
+
+    raw = Prompt.ask(
+        "Select file to download",
+        default="1"
+    )
+
+    try:
+        idx = int(raw) - 1
+    except Exception:
+        log_warn("Invalid selection")
+        return "__SET_LATER__"
+
+    if idx < 0 or idx >= len(remote_files):
+
+        log_warn("Invalid selection")
+
+        return "__SET_LATER__"
+
+    selected = remote_files[idx]
+
+    openchai_version = strip_tar_ext(
+        Path(selected).name
+    )
+
+    extracted_dir = (
+        version_dir / openchai_version
+    )
+
+    # ─────────────────────────────────────────
+    # DOWNLOAD TASK
+    # ─────────────────────────────────────────
+    listed = _catalog_dir(network_url, no_cert, creds) or {}
+    size   = listed.get(selected, {}).get("size")
+
+    task = DownloadTask(
+        tool="openchai",
+        version=openchai_version,
+        filename=selected,
+        size=f"{size / 1024**2:,.1f} MiB" if isinstance(size, int) else "Unknown",
+        url=network_url + selected,
+        destination=extracted_dir,
+    )
+
+    # ─────────────────────────────────────────
+    # SHOW QUEUE
+    # ─────────────────────────────────────────
+    _show_download_queue([task])
+
+    if not Confirm.ask(
+        f"Proceed to download 1 package(s)?",
+        default=True
+    ):
+
+        return "__SET_LATER__"
+
+    # ─────────────────────────────────────────
+    # ALREADY EXISTS
+    # ─────────────────────────────────────────
+    state, damaged = _extraction_state(
+        version_dir,
+        openchai_version,
+        verify_sample,
+    )
+
+    if state == "complete":
+
+        task.status = "SKIP"
+        task.detail = "Already downloaded"
+
+        log_notice(
+            f"Already complete, skipping: "
+            f"{openchai_version}"
+        )
+
+        _show_download_report([task])
+
+        return openchai_version
+
+    # ─────────────────────────────────────────
+    # DOWNLOAD & EXTRACT
+    # ─────────────────────────────────────────
+    _report_extraction_state(state, damaged, openchai_version)
+
+    console.print(
+        Rule("[bold]Downloading[/bold]")
+    )
+
+    if _download_and_extract(
+        task,
+        no_cert,
+        creds,
+        repair=state != "missing",
+        dedup=dedup,
+    ):
+
+        log_notice(
+            f"Registry extracted: "
+            f"{openchai_version}"
+        )
+
+    else:
+
+        log_warn(
+            f"Failed downloading: "
+            f"{openchai_version}"
+        )
+
+        return "__SET_LATER__"
+
+    # ─────────────────────────────────────────
+    # REPORT
+    # ─────────────────────────────────────────
+    _show_download_report([task])
+
+    return openchai_version
+
+# ─────────────────────────────────────────────
+# Section 6 – Registry version validation
+# ─────────────────────────────────────────────
+def validate_registry(
+    base_dir: Path,
+    arch: str,
+    os_version: str,
+    openchai_version: str,
+    verify_sample: int = EXTRACT_VERIFY_SAMPLE,
+):
+
+    console.print(
+        Rule("[bold]Registry Validation[/bold]")
+    )
+
+    version_dir = (
+        base_dir
+        / "hpcsuite_registry"
+        / "hostmachine_reg"
+        / arch
+        / os_version
+    )
+
+    registry_path = version_dir / openchai_version
+
+    state, damaged = _extraction_state(
+        version_dir,
+        openchai_version,
+        verify_sample,
+    )
+
+    if state == "complete":
+
+        log_notice(
+            f"Version '{openchai_version}' found and verified at: "
+            f"{registry_path}"
+        )
+
+    elif state == "unverified":
+
+        log_notice(
+            f"Version '{openchai_version}' found at: "
+            f"{registry_path} (no extraction manifest, not verified)"
+        )
+
+    elif state in ("damaged", "partial"):
+
+        log_warn(
+            f"Version '{openchai_version}' at {registry_path} is incomplete"
+            + (f" ({len(damaged)} file(s) missing or altered)" if damaged else "")
+            + ".\nRe-run the manager to repair it from the registry tarball."
+        )
+
+    else:
+
+        log_warn(
+            f"Version directory not found: {registry_path}\n"
+            "Update 'openchai_version' later in group_vars/all.yml"
+        )
+
+
+# ─────────────────────────────────────────────
+# Section 7 – Inventory confirmation & copy
+# ─────────────────────────────────────────────
+def handle_inventory(base_dir: Path):
+    console.print(Rule("[bold]Inventory File[/bold]"))
+    inventory_def    = base_dir / "chai_setup" / "inventory_def.txt"
+    inventory_target = base_dir / "automation" / "ansible" / "inventory" / "inventory_def.txt"
+
+    confirmed = Confirm.ask(
+        f"Have you updated the inventory file [cyan]{inventory_def}[/cyan] for your environment?",
+        default=False,
+    )
+    if not confirmed:
+        error_exit("Please update the inventory file before continuing.")
+
+    if not inventory_def.exists():
+        error_exit(f"Inventory definition file not found: {inventory_def}")
 
     inventory_target.parent.mkdir(parents=True, exist_ok=True)
     shutil.copy2(inventory_def, inventory_target)
@@ -1139,322 +2502,2255 @@ def handle_inventory(base_dir: Path):
 
 
 # ─────────────────────────────────────────────
-# Section 8 – Print summary table
+# Section 8 – Print summary table
+# ─────────────────────────────────────────────
+def print_summary(
+    params: dict,
+    base_dir: Path,
+    openchai_version: str,
+    creds: Optional[VaultCredentials] = None,
+):
+    console.print()
+    console.print(Rule("[bold]Configuration Summary[/bold]"))
+    table = Table(box=box.ROUNDED, show_header=False, padding=(0, 2))
+    table.add_column("Variable", style="bold cyan", no_wrap=True)
+    table.add_column("Value", style="white")
+
+    rows = [
+        ("OS Architecture",      params["os_arch"]),
+        ("OS Version",           params["os_version"]),
+        ("RHEL Label",           params["rhel_label"]),
+        ("Enterprise EL Label",  params["el_label"]),
+        ("Kernel Version",       params["kernel"]),
+        ("Base Directory",       str(base_dir)),
+        ("OpenCHAI Version",     openchai_version),
+        ("Vault Host",           VAULT_HOST),
+        ("Vault Port",           str(VAULT_PORT)),
+        ("Vault URL",            OPENCHAI_VAULT_URL),
+        ("Vault User",           creds.username if creds else "[dim]anonymous[/dim]"),
+    ]
+    for k, v in rows:
+        table.add_row(k, v)
+
+    console.print(table)
+    console.print()
+
+
+# ─────────────────────────────────────────────
+# Section 9 – Update config files
+# ─────────────────────────────────────────────
+def _sed_replace(filepath: Path, pattern: str, replacement: str):
+    """In-place regex substitution on a single line."""
+    if not filepath.exists():
+        return
+    text = filepath.read_text()
+    new_text = re.sub(pattern, replacement, text, flags=re.MULTILINE)
+    filepath.write_text(new_text)
+
+
+def update_all_yml(base_dir: Path, params: dict, openchai_version: str):
+    all_yml = base_dir / "automation" / "ansible" / "group_vars" / "all.yml"
+    if not all_yml.exists():
+        log_warn(f"group_vars/all.yml not found at: {all_yml} (skipping)")
+        return
+
+    replacements = {
+        r"^openchai_version:.*":        f"openchai_version: {openchai_version}",
+        r"^base_dir:.*":                f"base_dir: {base_dir}",
+        r"^os_version:.*":              f"os_version: {params['os_version']}",
+        r"^os_arch:.*":                 f"os_arch: {params['os_arch']}",
+        r"^rhel_linux_label:.*":        f"rhel_linux_label: {params['rhel_label']}",
+        r"^enterprise_linux_label:.*":  f"enterprise_linux_label: {params['el_label']}",
+        r"^default_kernel_version:.*":  f'default_kernel_version: "{params["kernel"]}"',
+    }
+    for pat, repl in replacements.items():
+        _sed_replace(all_yml, pat, repl)
+
+    log_notice(f"Updated: {all_yml}")
+
+
+def update_script_base_dirs(base_dir: Path):
+    candidates = []
+    for glob_pat in [
+        "chai_setup/update_group_var_all.sh",
+        "chai_setup/update_inventory_def.sh",
+        "chai_setup/modules/*.sh",
+        "servicenodes/*.sh",
+    ]:
+        candidates.extend(base_dir.glob(glob_pat))
+
+    for f in candidates:
+        if f.is_file():
+            _sed_replace(f, r"^base_dir\s*=\s*.*", f'base_dir="{base_dir}"')
+            log.debug("Updated base_dir in %s", f)
+
+
+def update_ansible_cfg(base_dir: Path):
+    ansible_cfg     = base_dir / "automation" / "ansible" / "ansible.cfg"
+    system_cfg      = Path("/etc/ansible/ansible.cfg")
+    inventory_sh    = base_dir / "automation" / "ansible" / "inventory" / "inventory.sh"
+    inventory_line  = f"inventory = {inventory_sh}"
+    all_yml         = base_dir / "automation" / "ansible" / "group_vars" / "all.yml"
+
+    # Local ansible.cfg
+    if ansible_cfg.exists():
+        _sed_replace(ansible_cfg, r"inventory\s*=\s*.*inventory\.sh", inventory_line)
+        log_notice(f"Updated: {ansible_cfg}")
+    else:
+        log_warn(f"Not found: {ansible_cfg}")
+
+    # inventory.sh
+    if inventory_sh.exists():
+        _sed_replace(inventory_sh, r"^base_dir=.*", f'base_dir="{base_dir}"')
+        inventory_sh.chmod(inventory_sh.stat().st_mode | 0o111)
+        log_notice(f"Updated: {inventory_sh}")
+    else:
+        log_warn(f"Not found: {inventory_sh}")
+
+    # System /etc/ansible/ansible.cfg
+    if system_cfg.exists():
+        text = system_cfg.read_text()
+        if re.search(r"^\s*inventory\s*=", text, re.MULTILINE):
+            text = re.sub(r"^\s*inventory\s*=.*", inventory_line, text, flags=re.MULTILINE)
+        elif "[defaults]" in text:
+            text = text.replace("[defaults]", f"[defaults]\n{inventory_line}", 1)
+        else:
+            text = f"[defaults]\n{inventory_line}\n" + text
+
+        if "host_key_checking = False" not in text:
+            text += "\nhost_key_checking = False\n"
+
+        try:
+            system_cfg.write_text(text)
+            log_notice(f"Updated system Ansible config: {system_cfg}")
+        except PermissionError:
+            log_warn(f"No write permission to {system_cfg}. Run as root to update it.")
+
+        # Make inventory.sh executable
+        try:
+            if inventory_sh.exists():
+                inventory_sh.chmod(inventory_sh.stat().st_mode | 0o111)
+        except Exception:
+            pass
+
+        # Copy group_vars to /etc/ansible/
+        gv_src = base_dir / "automation" / "ansible" / "group_vars"
+        gv_dst = Path("/etc/ansible/group_vars")
+        try:
+            if gv_src.exists():
+                shutil.copytree(str(gv_src), str(gv_dst), dirs_exist_ok=True)
+                log_notice(f"Copied group_vars → {gv_dst}")
+        except Exception as exc:
+            log_warn(f"Could not copy group_vars: {exc}")
+    else:
+        log_warn(f"System Ansible config not found at {system_cfg} (skipping)")
+
+
+# ─────────────────────────────────────────────
+# Section 10 – Container Image Registry
+# ─────────────────────────────────────────────
+# Checksum manifest published by the vault and the local content-addressed
+# store (<container_img_reg>/.store/sha256/…) — mirrors container_img_selector.py
+MANIFEST_NAME = "SHA256SUMS"
+STORE_DIRNAME = ".store"
+
+_SHA256_RE = re.compile(r"^([0-9a-fA-F]{64})\s+\*?(.+?)\s*$")
+
+
+def _fetch_manifest(
+    dir_url: str,
+    no_cert: bool,
+    creds: Optional[VaultCredentials] = None,
+) -> Dict[str, str]:
+    """
+    Return {relative path: sha256} for the files in *dir_url* — from the
+    vault catalog when it carries digests, else <dir_url>/SHA256SUMS.
+    {} if neither is available.
+    """
+    listed = _catalog_dir(dir_url, no_cert, creds)
+    if listed:
+        digests = {name: str(meta["sha256"]).lower() for name, meta in listed.items() if meta.get("sha256")}
+        if digests:
+            return digests
+    try:
+        text = _fetch_url(dir_url + MANIFEST_NAME, no_cert, creds).decode("utf-8", errors="replace")
+    except urllib.error.HTTPError as exc:
+        if exc.code != 404:
+            log_warn(f"Could not read {MANIFEST_NAME}: HTTP {exc.code}")
+        return {}
+    except Exception as exc:
+        log_warn(f"Could not read {MANIFEST_NAME}: {exc}")
+        return {}
+
+    digests: Dict[str, str] = {}
+    for line in text.splitlines():
+        m = _SHA256_RE.match(line)
+        if not m:
+            continue
+        name = m.group(2).removeprefix("./")
+        if name.startswith("/") or ".." in name.split("/"):
+            log.warning("Ignoring %s entry outside its directory: %s", MANIFEST_NAME, name)
+            continue
+        digests[name] = m.group(1).lower()
+    return digests
+
+
+def _store_path(container_reg_path: Path, digest: str) -> Path:
+    return container_reg_path / STORE_DIRNAME / "sha256" / digest[:2] / digest
+
+
+def _link_into_place(blob: Path, dest: Path):
+    """Atomically hard-link *blob* at *dest* (copy if links are unsupported)."""
+    staging = dest.with_name(f".{dest.name}.link")
+    staging.unlink(missing_ok=True)
+    try:
+        os.link(blob, staging)
+    except OSError:
+        shutil.copy2(blob, staging)
+    os.replace(staging, dest)
+
+
+def _collect_local_images(
+    catalog: LocalCatalog,
+    app_dirs: List[Path],
+) -> Tuple[Dict[int, Path], Dict[str, List[Path]]]:
+    img_map: Dict[int, Path] = {}
+    local_names: Dict[str, List[Path]] = {}
+    idx = 1
+
+    for app_dir in app_dirs:
+        imgs = [
+            catalog.root / rel for rel, _, _ in catalog.walk(app_dir.name)
+            if any(rel.endswith(e) for e in IMG_EXTS)
+        ]
+        if not imgs:
+            log_warn(f"No images found in {app_dir.name}")
+            continue
+        console.print(f"\n[bold cyan]🧩 [{app_dir.name}][/bold cyan] {len(imgs)} image(s):")
+        for img in imgs:
+            console.print(f"   [dim][{idx}][/dim] {img.name}")
+            img_map[idx] = img
+            local_names.setdefault(img.name, []).append(img)
+            idx += 1
+
+    return img_map, local_names
+
+
+def _selector_args() -> List[str]:
+    """Forward this session's bandwidth limit to the selector subprocess."""
+    args = ["--max-rate", str(_THROTTLE.rate)]
+    if _THROTTLE.window:
+        (h1, m1), (h2, m2) = divmod(_THROTTLE.window[0], 60), divmod(_THROTTLE.window[1], 60)
+        args += ["--rate-window", f"{h1:02d}:{m1:02d}-{h2:02d}:{m2:02d}"]
+    return args
+
+
+def _run_python_selector(selector: Path):
+    if not selector.exists():
+        log_warn(f"Python selector not found: {selector}")
+        return
+    if not shutil.which("python3"):
+        log_warn("python3 not available; cannot run image selector.")
+        return
+    try:
+        subprocess.run([sys.executable, str(selector), *_selector_args()], check=False)
+    except Exception as exc:
+        log_warn(f"Python selector failed: {exc}")
+
+
+def _download_image(
+    url: str,
+    dest: Path,
+    container_reg_path: Path,
+    digest: Optional[str],
+    no_cert: bool,
+    creds: Optional[VaultCredentials] = None,
+) -> bool:
+    """
+    Fetch *url* to *dest* through a .part file.  With a vault *digest* the
+    bytes are verified and kept in the local store, and a blob already in
+    the store is re-hashed and linked instead of downloaded.  Returns True
+    on success.
+    """
+    base = dest.name
+    blob = _store_path(container_reg_path, digest) if digest else None
+
+    if blob is not None and blob.exists():
+        # The blob is the inode of every image linked to it, so a damaged
+        # image means a damaged blob: hash it before linking it anywhere
+        if _has_digest(blob, digest):
+            _link_into_place(blob, dest)
+            log_notice(f"🔗 Linked {base} from local store (identical image)")
+            return True
+        log_warn(f"Stored copy of {base} does not match its digest — dropping it.")
+        blob.unlink(missing_ok=True)
+
+    tmp = dest.with_name(dest.name + ".part")
+    log_info(f"⬇  Downloading {base} …")
+
+    try:
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            DownloadColumn(),
+            TransferSpeedColumn(),
+            console=console,
+        ) as progress:
+            task = progress.add_task(f"Downloading {base}", total=None)
+            req = _build_request(url, creds)
+            hasher = hashlib.sha256()
+            buf    = RecvBuffer()
+            ticker = ProgressTicker(progress, task)
+            with _POOL.urlopen(req, no_cert, timeout=300) as resp, open(tmp, "wb") as out:
+                length = resp.headers.get("Content-Length")
+                if length and length.isdigit():
+                    progress.update(task, total=int(length))
+                    preallocate(out.fileno(), 0, int(length))
+                while True:
+                    chunk = buf.fill(resp)
+                    if not chunk:
+                        break
+                    out.write(chunk)
+                    hasher.update(chunk)
+                    ticker.advance(len(chunk))
+                    _THROTTLE.consume(len(chunk))
+            ticker.flush()
+
+        if blob is None:
+            tmp.rename(dest)
+        elif hasher.hexdigest() != digest:
+            raise RuntimeError(
+                f"SHA-256 mismatch (expected {digest[:12]}…, got {hasher.hexdigest()[:12]}…)"
+            )
+        else:
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(tmp, blob)
+            _link_into_place(blob, dest)
+        log_notice(f"✅ Downloaded: {base}" + (" (verified)" if blob is not None else ""))
+        return True
+    except Exception as exc:
+        log_warn(f"Failed to download {base}: {exc}")
+        tmp.unlink(missing_ok=True)
+        return False
+
+
+def _has_digest(path: Path, digest: str) -> bool:
+    """
+    True if *path* holds the bytes of *digest*.  Always hashed: a link to
+    the store blob proves nothing once either name has been written to.
+    """
+    try:
+        return _sha256_path(path) == digest
+    except OSError:
+        return False
+
+
+def _fetch_network_images(
+    container_reg_path: Path,
+    container_url: str,
+    local_names: Dict[str, List[Path]],
+    no_cert: bool,
+    creds: Optional[VaultCredentials] = None,
+):
+    log_info(f"Fetching image list from {container_url} …")
+    net_imgs = _list_remote_archives(container_url, no_cert, creds)
+
+    if not net_imgs:
+        log_warn("No images found on network.")
+        return
+
+    log_info(f"Found {len(net_imgs)} image(s) on network.")
+    digests = _fetch_manifest(container_url, no_cert, creds)
+    if not digests:
+        log_warn(f"No {MANIFEST_NAME} on the vault — downloads will not be verified.")
+
+    for net_img in net_imgs:
+        base   = Path(net_img).name
+        digest = digests.get(net_img) or digests.get(base)
+
+        local = local_names.get(base, [])
+        if local and digest is None:
+            log_notice(f"⏭  Skipping {base} (already local, unverified)")
+            continue
+        if any(_has_digest(path, digest) for path in local):
+            log_notice(f"⏭  Skipping {base} (already local)")
+            continue
+        if local:
+            log_warn(f"{base} is present locally but does not match its vault digest — re-downloading.")
+        _download_image(
+            container_url + net_img, container_reg_path / base,
+            container_reg_path, digest, no_cert, creds,
+        )
+
+    log_notice("Network image synchronisation complete.")
+    log.info("HTTP pool: %s", _POOL.stats())
+
+
+def handle_container_images(
+    base_dir: Path,
+    os_version: str,
+    no_cert: bool,
+    creds: Optional[VaultCredentials] = None,
+):
+    console.print(Rule("[bold]Container Image Registry[/bold]"))
+
+    container_reg_path = base_dir / "hpcsuite_registry" / "container_img_reg"
+    container_reg_path.mkdir(parents=True, exist_ok=True)
+
+    python_selector = base_dir / "automation" / "python" / "container_img_selector.py"
+    container_url   = f"{OPENCHAI_VAULT_URL}container_img_reg/{os_version}/"
+
+    # Patch Python selector path if present
+    if python_selector.exists():
+        _sed_replace(
+            python_selector,
+            r'^LOCAL_DIR\s*=.*',
+            f'LOCAL_DIR = "{container_reg_path}"',
+        )
+
+    log_info(f"Scanning container image registry: {container_reg_path}")
+    catalog  = LocalCatalog(container_reg_path).refresh()
+    app_dirs = [container_reg_path / name for name in catalog.subdirs()]
+
+    if not app_dirs:
+        log_warn(f"No application directories found in {container_reg_path}")
+        if Confirm.ask("Fetch container images from network?", default=False):
+            log_info("Launching Python container image selector…")
+            _run_python_selector(python_selector)
+        else:
+            log_notice(f"Skipping. Add images later under:\n  {container_reg_path}")
+        return
+
+    img_map, local_names = _collect_local_images(catalog, app_dirs)
+
+    if not img_map:
+        log_warn("No local container images found.")
+        if Confirm.ask("Fetch missing images from the network?", default=False):
+            if shutil.which("python3"):
+                _run_python_selector(python_selector)
+            else:
+                _fetch_network_images(container_reg_path, container_url, local_names, no_cert, creds)
+        return
+
+    if Confirm.ask("Fetch any missing images from the network?", default=False):
+        if not shutil.which("curl") and not shutil.which("python3"):
+            log_warn("Neither curl nor python3 available. Cannot fetch network images.")
+        else:
+            _fetch_network_images(container_reg_path, container_url, local_names, no_cert, creds)
+    else:
+        log_notice("Network image fetch skipped.")
+
+
+# ─────────────────────────────────────────────
+# Section 11 – Caching vault mirror
+# ─────────────────────────────────────────────
+MIRROR_CACHE_DIR = "/var/cache/openchai-mirror"
+MIRROR_PORT      = 8080
+MIRROR_AUTH_TTL_S = 60          # how long an upstream "this client may read it" answer is reused
+MIRROR_QUOTA     = "100G"
+
+# Only archives and images are cached.  Listings and checksum manifests
+# are always passed through so the mirror never serves a stale catalogue.
+MIRROR_CACHE_EXTS = (".tar", ".tgz", ".gz", ".xz", ".bz2", ".zst", ".img")
+
+# Upstream response headers relayed to mirror clients
+_MIRROR_RELAY_HEADERS = (
+    "Content-Type", "Content-Length", "Content-Range", "Accept-Ranges",
+    "Last-Modified", "ETag", "WWW-Authenticate",
+)
+
+
+def _parse_byte_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single "bytes=" Range header into an inclusive (start, end).
+    Returns None for forms the mirror ignores (multi-range, other units);
+    raises ValueError when the range cannot be satisfied.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip() != "bytes" or "," in spec:
+        return None
+    first, _, last = spec.strip().partition("-")
+    try:
+        if first:
+            start = int(first)
+            end   = min(int(last), size - 1) if last else size - 1
+        else:
+            start = max(size - int(last), 0)
+            end   = size - 1
+    except ValueError:
+        return None
+    if start > end or start >= size:
+        raise ValueError(header)
+    return start, end
+
+
+class _MirrorFetch:
+    """
+    One upstream transfer into <cache>/<path>.part.  Any number of clients
+    read the part file while it grows; only the first request goes upstream.
+    """
+
+    def __init__(self, path: Path):
+        self.path          = path
+        self.part          = path.with_name(path.name + ".part")
+        self.cond          = threading.Condition()
+        self.started       = False
+        self.done          = False
+        self.size:         Optional[int] = None
+        self.last_modified = ""
+        self.written       = 0
+        self.error:        Optional[urllib.error.HTTPError] = None
+
+    def wait_started(self) -> bool:
+        """Block until upstream answered; False if it answered with an error."""
+        with self.cond:
+            while not self.started and self.error is None:
+                self.cond.wait()
+            return self.error is None
+
+    def wait_for(self, offset: int) -> int:
+        """Block until bytes past *offset* have landed; return bytes available."""
+        with self.cond:
+            while self.written <= offset and not self.done and self.error is None:
+                self.cond.wait()
+            if self.error is not None:
+                raise OSError(f"upstream transfer failed: {self.error.reason}")
+            return self.written
+
+    def open(self):
+        with self.cond:
+            return open(self.path if self.done else self.part, "rb")
+
+
+class _MirrorCache:
+    """
+    On-disk LRU cache laid out exactly like the vault (<root>/<url path>).
+    Recency survives restarts through file atimes; mtimes carry the
+    upstream Last-Modified so clients can resume with If-Range.
+    """
+
+    def __init__(self, root: Path, upstream: str, quota: int, no_cert: bool):
+        self.root     = root.resolve()
+        self.upstream = upstream.rstrip("/")
+        self.quota    = quota
+        self.no_cert  = no_cert
+        self.used     = 0
+        self.hits = self.misses = self.coalesced = self.evicted = 0
+        self._lock     = threading.Lock()
+        self._lru:      "OrderedDict[Path, int]" = OrderedDict()
+        self._inflight: Dict[Path, _MirrorFetch] = {}
+        self._granted:  Dict[Tuple[str, str], float] = {}
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        entries = []
+        for p in self.root.rglob("*"):
+            if not p.is_file():
+                continue
+            if p.name.endswith(".part"):
+                p.unlink(missing_ok=True)      # interrupted fill from a previous run
+                continue
+            st = p.stat()
+            entries.append((st.st_atime, p, st.st_size))
+        for _, p, size in sorted(entries):
+            self._lru[p] = size
+            self.used   += size
+
+    def local_path(self, url_path: str) -> Optional[Path]:
+        """Map a request path into the cache, refusing anything outside it."""
+        p = (self.root / urllib.parse.unquote(url_path).lstrip("/")).resolve()
+        return p if str(p).startswith(str(self.root) + os.sep) else None
+
+    def cached(self, path: Path) -> bool:
+        with self._lock:
+            return path in self._lru
+
+    def stats(self) -> str:
+        return (
+            f"{self.hits} hit(s), {self.misses} miss(es), {self.coalesced} coalesced, "
+            f"{self.evicted} evicted, {self.used / 1024**3:.2f} of "
+            f"{self.quota / 1024**3:.2f} GiB used"
+        )
+
+    def _evict(self, incoming: int):
+        # Caller holds self._lock
+        while self._lru and self.used + incoming > self.quota:
+            victim, size = self._lru.popitem(last=False)
+            victim.unlink(missing_ok=True)
+            self.used    -= size
+            self.evicted += 1
+            log.info("Mirror evicted %s (%d bytes)", victim, size)
+
+    def authorize(self, url_path: str, auth: Optional[str]) -> Optional[urllib.error.HTTPError]:
+        """
+        Ask upstream (HEAD with this client's own Authorization) whether the
+        client may read *url_path*; None if it may, else the error to relay.
+        Cached and in-flight objects were fetched with someone else's
+        credentials, so every client is checked before it is served.
+        Grants are remembered per credential for MIRROR_AUTH_TTL_S.
+        """
+        key = (hashlib.sha256((auth or "").encode()).hexdigest(), url_path)
+        now = time.monotonic()
+        with self._lock:
+            if self._granted.get(key, 0.0) > now:
+                return None
+
+        req = _build_request(
+            self.upstream + url_path,
+            extra_headers={"Authorization": auth} if auth else None,
+        )
+        req.method = "HEAD"
+        try:
+            with _POOL.urlopen(req, self.no_cert, timeout=DOWNLOAD_TIMEOUT_S):
+                pass
+        except urllib.error.HTTPError as exc:
+            return exc
+        except (urllib.error.URLError, OSError, http.client.HTTPException) as exc:
+            log_warn(f"Mirror could not check access to {url_path}: {exc}")
+            return urllib.error.HTTPError(url_path, 502, "Upstream vault unavailable", None, None)
+
+        with self._lock:
+            self._granted = {k: t for k, t in self._granted.items() if t > now}
+            self._granted[key] = now + MIRROR_AUTH_TTL_S
+        return None
+
+    def open(self, url_path: str, path: Path, auth: Optional[str]):
+        """
+        Return the cached file for *path*, or the in-flight fetch to read
+        from — starting one on a miss, joining an existing one otherwise.
+        """
+        with self._lock:
+            if path in self._lru:
+                self._lru.move_to_end(path)
+                self.hits += 1
+                st = path.stat()
+                os.utime(path, (time.time(), st.st_mtime))
+                return path
+            fetch = self._inflight.get(path)
+            if fetch is not None:
+                self.coalesced += 1
+                return fetch
+            fetch = self._inflight[path] = _MirrorFetch(path)
+            self.misses += 1
+
+        threading.Thread(
+            target=self._fill, args=(url_path, fetch, auth),
+            name="openchai-mirror-fill", daemon=True,
+        ).start()
+        return fetch
+
+    def _fill(self, url_path: str, fetch: _MirrorFetch, auth: Optional[str]):
+        log.info("Mirror miss, fetching %s", url_path)
+        req = _build_request(
+            self.upstream + url_path,
+            extra_headers={"Authorization": auth} if auth else None,
+        )
+        reserved = 0
+        try:
+            with _POOL.urlopen(req, self.no_cert, timeout=DOWNLOAD_TIMEOUT_S) as resp:
+                length = resp.headers.get("Content-Length")
+                size   = int(length) if length and length.isdigit() else None
+                # Count the incoming object as used while it downloads, so
+                # concurrent misses evict for each other instead of all
+                # fitting into the same free space
+                with self._lock:
+                    reserved = size or 0
+                    self._evict(reserved)
+                    self.used += reserved
+
+                fetch.part.parent.mkdir(parents=True, exist_ok=True)
+                buf = RecvBuffer()
+                with open(fetch.part, "wb") as out:
+                    preallocate(out.fileno(), 0, size)
+                    with fetch.cond:
+                        fetch.size          = size
+                        fetch.last_modified = resp.headers.get("Last-Modified") or ""
+                        fetch.started       = True
+                        fetch.cond.notify_all()
+                    while True:
+                        chunk = buf.fill(resp)
+                        if not chunk:
+                            break
+                        out.write(chunk)
+                        out.flush()           # readers use their own descriptors
+                        _THROTTLE.consume(len(chunk))
+                        with fetch.cond:
+                            fetch.written += len(chunk)
+                            fetch.cond.notify_all()
+
+            if size is not None and fetch.written != size:
+                raise OSError(f"short transfer: {fetch.written:,} of {size:,} bytes")
+            if fetch.last_modified:
+                mtime = email.utils.parsedate_to_datetime(fetch.last_modified).timestamp()
+                os.utime(fetch.part, (time.time(), mtime))
+
+        except urllib.error.HTTPError as exc:
+            failure = exc
+        except (urllib.error.URLError, OSError, http.client.HTTPException, ValueError) as exc:
+            log_warn(f"Mirror fetch of {url_path} failed: {exc}")
+            failure = urllib.error.HTTPError(
+                url_path, 502, "Upstream vault unavailable", None, None
+            )
+        else:
+            failure = None
+
+        # Publish under the cache lock, so a concurrent _evict() never sees
+        # the entry in the LRU before the file is in place (or vice versa)
+        with self._lock, fetch.cond:
+            self._inflight.pop(fetch.path, None)
+            self.used -= reserved
+            if failure is None:
+                try:
+                    os.replace(fetch.part, fetch.path)
+                except OSError as exc:
+                    log_warn(f"Mirror could not store {url_path}: {exc}")
+                    failure = urllib.error.HTTPError(
+                        url_path, 502, "Mirror cache unavailable", None, None
+                    )
+            if failure is None:
+                self._evict(fetch.written)
+                self._lru[fetch.path] = fetch.written
+                self.used += fetch.written
+                fetch.done = True
+            else:
+                fetch.part.unlink(missing_ok=True)
+                fetch.error = failure
+            fetch.cond.notify_all()
+
+
+class _MirrorHandler(BaseHTTPRequestHandler):
+    """Serve the vault layout from _MirrorCache; see run_mirror()."""
+
+    protocol_version = "HTTP/1.1"
+    server_version   = "openchai-mirror/1.0"
+
+    def log_message(self, fmt, *args):
+        log.info("mirror %s %s", self.address_string(), fmt % args)
+
+    def do_HEAD(self):
+        self._handle(head=True)
+
+    def do_GET(self):
+        self._handle(head=False)
+
+    def _handle(self, head: bool):
+        cache: _MirrorCache = self.server.cache
+        url_path = urllib.parse.urlsplit(self.path).path
+        path     = cache.local_path(url_path)
+
+        if path is None:
+            self._send_status(400, "Bad Request")
+        elif not url_path.endswith(MIRROR_CACHE_EXTS) or (head and not cache.cached(path)):
+            # Listings, manifests and size probes of uncached objects go
+            # straight upstream — a HEAD must not trigger a multi-GB fill
+            self._proxy(cache, url_path, head)
+        else:
+            auth   = self.headers.get("Authorization")
+            denied = cache.authorize(url_path, auth)
+            if denied is not None:
+                self._send_status(denied.code, denied.reason, denied.headers)
+            else:
+                self._serve(cache.open(url_path, path, auth), head)
+
+    def _send_status(self, code: int, reason: str, headers=None):
+        self.send_response(code, reason)
+        for name in ("WWW-Authenticate", "Content-Range"):
+            if headers is not None and headers.get(name):
+                self.send_header(name, headers[name])
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _proxy(self, cache: _MirrorCache, url_path: str, head: bool):
+        forward = {
+            name: self.headers[name]
+            for name in ("Authorization", "Range", "If-Range", "If-Modified-Since", "If-None-Match")
+            if self.headers.get(name)
+        }
+        req = _build_request(cache.upstream + self.path, extra_headers=forward)
+        if head:
+            req.method = "HEAD"
+        try:
+            with _POOL.urlopen(req, cache.no_cert, timeout=DOWNLOAD_TIMEOUT_S) as resp:
+                final = urllib.parse.urlsplit(resp.url).path
+                if final != url_path:
+                    # Upstream redirected (e.g. dir → dir/); let the client
+                    # follow it so relative links in listings resolve here
+                    self.send_response(301)
+                    self.send_header("Location", final)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(resp.status, resp.reason)
+                for name in _MIRROR_RELAY_HEADERS:
+                    if resp.headers.get(name):
+                        self.send_header(name, resp.headers[name])
+                if not resp.headers.get("Content-Length"):
+                    self.send_header("Connection", "close")
+                    self.close_connection = True
+                self.end_headers()
+                if head:
+                    return
+                buf = RecvBuffer()
+                while True:
+                    chunk = buf.fill(resp)
+                    if not chunk:
+                        break
+                    self.wfile.write(chunk)
+        except urllib.error.HTTPError as exc:
+            self._send_status(exc.code, exc.reason, exc.headers)
+        except (urllib.error.URLError, http.client.HTTPException) as exc:
+            log_warn(f"Mirror pass-through of {url_path} failed: {exc}")
+            self._send_status(502, "Upstream vault unavailable")
+
+    def _serve(self, entry, head: bool):
+        if isinstance(entry, _MirrorFetch):
+            if not entry.wait_started():
+                self._send_status(entry.error.code, entry.error.reason, entry.error.headers)
+                return
+            size, modified = entry.size, entry.last_modified
+        else:
+            st       = entry.stat()
+            size     = st.st_size
+            modified = email.utils.formatdate(st.st_mtime, usegmt=True)
+
+        status, start, end = 200, 0, (size - 1 if size is not None else None)
+        rng      = self.headers.get("Range")
+        if_range = self.headers.get("If-Range")
+        if rng and size is not None and (not if_range or if_range == modified):
+            try:
+                parsed = _parse_byte_range(rng, size)
+            except ValueError:
+                self._send_status(416, "Range Not Satisfiable", {"Content-Range": f"bytes */{size}"})
+                return
+            if parsed is not None:
+                status, (start, end) = 206, parsed
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Accept-Ranges", "bytes")
+        if modified:
+            self.send_header("Last-Modified", modified)
+        if size is None:
+            self.send_header("Connection", "close")
+            self.close_connection = True
+        else:
+            self.send_header("Content-Length", str(end - start + 1))
+        if status == 206:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.end_headers()
+        if head:
+            return
+
+        # The headers are already out, so a file evicted in the meantime
+        # can only end the response early, like any other failure here
+        pos = start
+        try:
+            with (entry.open() if isinstance(entry, _MirrorFetch) else open(entry, "rb")) as fh:
+                while end is None or pos <= end:
+                    if isinstance(entry, _MirrorFetch):
+                        avail = entry.wait_for(pos)
+                        if avail <= pos:
+                            break                  # unknown-length body finished
+                    else:
+                        avail = size
+                    count = (avail if end is None else min(avail, end + 1)) - pos
+                    sent  = self.connection.sendfile(fh, offset=pos, count=count)
+                    if not sent:
+                        raise OSError(f"{fh.name} ended at byte {pos:,}")
+                    pos  += sent
+        except OSError as exc:
+            log.info("Mirror client transfer ended early: %s", exc)
+            self.close_connection = True
+
+
+def run_mirror(args: argparse.Namespace):
+    """
+    Serve a caching mirror of the vault.  Headnodes point VAULT_HOST /
+    VAULT_PORT at this host; archives are fetched from --upstream on the
+    first request, shared by concurrent requesters while they download,
+    and evicted least-recently-used once --quota is exceeded.
+    """
+    cache = _MirrorCache(
+        Path(args.cache_dir), args.upstream, parse_rate(args.quota), args.no_cert,
+    )
+    server = ThreadingHTTPServer((args.bind, args.port), _MirrorHandler)
+    server.daemon_threads = True
+    server.cache = cache
+
+    log_notice(
+        f"Vault mirror listening on http://{args.bind}:{args.port}{VAULT_PATH} "
+        f"(upstream {cache.upstream}, cache {cache.root})"
+    )
+    log_info(f"Cache: {cache.stats()}")
+    log_info(f"On each headnode set VAULT_HOST to this host and VAULT_PORT = {args.port}.")
+
+    def _on_term(signum, frame):
+        raise KeyboardInterrupt      # systemd stop → same clean shutdown as Ctrl-C
+
+    signal.signal(signal.SIGTERM, _on_term)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        _POOL.close_all()
+        log_notice(f"Vault mirror stopped — {cache.stats()}")
+
+
+# ─────────────────────────────────────────────
+# Section 12 – Vault catalog generator
 # ─────────────────────────────────────────────
-def print_summary(
-    params: dict,
-    base_dir: Path,
-    openchai_version: str,
-    creds: Optional[VaultCredentials] = None,
-):
-    console.print()
-    console.print(Rule("[bold]Configuration Summary[/bold]"))
-    table = Table(box=box.ROUNDED, show_header=False, padding=(0, 2))
-    table.add_column("Variable", style="bold cyan", no_wrap=True)
-    table.add_column("Value", style="white")
+def _catalog_skip(name: str) -> bool:
+    return (
+        name.startswith(".")
+        or name in (CATALOG_NAME, MANIFEST_NAME)
+        or name.endswith((".part", ".download", ".link"))
+    )
 
-    rows = [
-        ("OS Architecture",      params["os_arch"]),
-        ("OS Version",           params["os_version"]),
-        ("RHEL Label",           params["rhel_label"]),
-        ("Enterprise EL Label",  params["el_label"]),
-        ("Kernel Version",       params["kernel"]),
-        ("Base Directory",       str(base_dir)),
-        ("OpenCHAI Version",     openchai_version),
-        ("Vault Host",           VAULT_HOST),
-        ("Vault Port",           str(VAULT_PORT)),
-        ("Vault URL",            OPENCHAI_VAULT_URL),
-        ("Vault User",           creds.username if creds else "[dim]anonymous[/dim]"),
-    ]
-    for k, v in rows:
-        table.add_row(k, v)
 
-    console.print(table)
-    console.print()
+def build_catalog(root: Path, digests: bool = True, workers: int = 0) -> Dict[str, dict]:
+    """
+    Walk a local hpcsuite_registry tree and return its catalog records,
+    {relative path: {"size", "mtime"[, "sha256"]}}.
+
+    Digests from an existing <root>/index.json are reused for files whose
+    size and mtime are unchanged, so regenerating after adding a version
+    only hashes the new archives.  Hashing runs on *workers* threads
+    (hashlib releases the GIL; 0 = one per CPU).
+    """
+    previous: Dict[str, dict] = {}
+    try:
+        previous = json.loads((root / CATALOG_NAME).read_text())["files"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    files: Dict[str, dict] = {}
+    to_hash: List[str] = []
+
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+        for name in sorted(filenames):
+            if _catalog_skip(name):
+                continue
+            full = Path(dirpath) / name
+            st   = full.stat()
+            rel  = full.relative_to(root).as_posix()
+            rec  = {"size": st.st_size, "mtime": int(st.st_mtime)}
+            if digests:
+                old = previous.get(rel) or {}
+                if old.get("sha256") and old.get("size") == rec["size"] and old.get("mtime") == rec["mtime"]:
+                    rec["sha256"] = old["sha256"]
+                else:
+                    to_hash.append(rel)
+            files[rel] = rec
+
+    def _hash(rel: str) -> Tuple[str, str]:
+        h = hashlib.sha256()
+        with open(root / rel, "rb") as fh:
+            for block in iter(lambda: fh.read(CHUNK_SIZE), b""):
+                h.update(block)
+        return rel, h.hexdigest()
+
+    if to_hash:
+        log_info(f"Hashing {len(to_hash)} new or changed file(s) …")
+        with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 4) as pool:
+            for rel, digest in pool.map(_hash, to_hash):
+                files[rel]["sha256"] = digest
+
+    return files
+
+
+def _write_catalog(path: Path, files: Dict[str, dict]):
+    doc = {
+        "format":    CATALOG_FORMAT,
+        "generated": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "files":     files,
+    }
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(doc, indent=1, sort_keys=True) + "\n")
+    os.replace(tmp, path)
+
+
+def run_catalog(args: argparse.Namespace):
+    """
+    Generate <root>/index.json for a vault (or a local mirror of one), and
+    <root>/container_img_reg/index.json with paths relative to that
+    directory, which is where container_img_selector.py looks for it.
+    """
+    root = Path(args.root).resolve()
+    if not root.is_dir():
+        error_exit(f"Not a directory: {root}")
+
+    started = time.monotonic()
+    files   = build_catalog(root, digests=not args.no_digest, workers=args.workers)
+
+    _write_catalog(root / CATALOG_NAME, files)
+    log_notice(f"Wrote {root / CATALOG_NAME} ({len(files)} file(s))")
+
+    container_root = root / "container_img_reg"
+    if container_root.is_dir():
+        prefix = "container_img_reg/"
+        subset = {rel[len(prefix):]: rec for rel, rec in files.items() if rel.startswith(prefix)}
+        _write_catalog(container_root / CATALOG_NAME, subset)
+        log_notice(f"Wrote {container_root / CATALOG_NAME} ({len(subset)} file(s))")
+
+    total = sum(rec["size"] for rec in files.values())
+    log_info(f"Catalogued {total / 1024**3:,.2f} GiB in {time.monotonic() - started:.1f} s")
 
 
 # ─────────────────────────────────────────────
-# Section 9 – Update config files
+# Section 13 – Registry sync
+# Brings <base>/hpcsuite_registry/container_img_reg/<tool>/<image> in line
+# with the vault's container_img_reg/<os>/<tool>/<version>/… tree: an
+# rsync-style quick check (size, then digest or mtime) sorts every image
+# into new / changed / unchanged / orphaned, and only the delta moves.
 # ─────────────────────────────────────────────
-def _sed_replace(filepath: Path, pattern: str, replacement: str):
-    """In-place regex substitution on a single line."""
-    if not filepath.exists():
-        return
-    text = filepath.read_text()
-    new_text = re.sub(pattern, replacement, text, flags=re.MULTILINE)
-    filepath.write_text(new_text)
+SYNC_ACTIONS = ("new", "changed", "unchanged", "orphaned")
+SYNC_DEPTH   = 8      # directory levels crawled below <os>/ when the vault has no catalog
+SYNC_CRAWL_WORKERS = 8  # listings streamed concurrently by that crawl, and HEAD probes after it
 
 
-def update_all_yml(base_dir: Path, params: dict, openchai_version: str):
-    all_yml = base_dir / "automation" / "ansible" / "group_vars" / "all.yml"
-    if not all_yml.exists():
-        log_warn(f"group_vars/all.yml not found at: {all_yml} (skipping)")
+@dataclass
+class SyncItem:
+    rel: str                        # <tool>/<image> under container_img_reg
+    action: str                     # one of SYNC_ACTIONS
+    url: str = ""
+    size: Optional[int] = None      # remote size (local size for orphans)
+    mtime: Optional[int] = None     # remote mtime, applied after download
+    sha256: Optional[str] = None
+    version: str = ""
+    reason: str = ""
+
+
+def _head(
+    url: str,
+    no_cert: bool,
+    creds: Optional[VaultCredentials] = None,
+) -> Tuple[Optional[int], Optional[int]]:
+    """HEAD *url* → (Content-Length, Last-Modified as epoch seconds), None when absent."""
+    req = _build_request(url, creds)
+    req.get_method = lambda: "HEAD"   # type: ignore[method-assign]
+    with _POOL.urlopen(req, no_cert, timeout=30) as resp:
+        length   = resp.headers.get("Content-Length")
+        modified = resp.headers.get("Last-Modified")
+    mtime = None
+    if modified:
+        try:
+            mtime = int(email.utils.parsedate_to_datetime(modified).timestamp())
+        except (TypeError, ValueError):
+            pass
+    return (int(length) if length and length.isdigit() else None), mtime
+
+
+def _walk_remote(
+    url: str,
+    no_cert: bool,
+    creds: Optional[VaultCredentials] = None,
+    depth: int = SYNC_DEPTH,
+    start: Optional[List[str]] = None,
+) -> List[str]:
+    """
+    Archive paths below the directory listing at *url*, relative to it.
+    Listings stream in on SYNC_CRAWL_WORKERS threads and each subdirectory
+    is queued as soon as its parent's listing names it.  *start* limits
+    the crawl to those subdirectories of *url* (e.g. ["xCAT_reg/"]).
+    Raises RuntimeError naming the listing that could not be read — a
+    partial crawl must not pass for the vault's full contents.
+    """
+    def _list(rel: str) -> Tuple[str, List[str], List[str]]:
+        dirs: List[str] = []
+        try:
+            links = list(_iter_listing(url + rel, no_cert, creds, max_entries=0, dirs=dirs))
+        except urllib.error.HTTPError as exc:
+            raise RuntimeError(f"Could not list {url + rel}: HTTP {exc.code} {exc.reason}") from exc
+        except (urllib.error.URLError, OSError) as exc:
+            raise RuntimeError(f"Could not list {url + rel}: {getattr(exc, 'reason', exc)}") from exc
+        return rel, [href for href in links if "/" not in href], dirs
+
+    found: List[str] = []
+    with ThreadPoolExecutor(max_workers=SYNC_CRAWL_WORKERS) as pool:
+        level   = 0 if start is None else 1
+        pending = {pool.submit(_list, rel): level for rel in (start if start is not None else [""])}
+        try:
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    level = pending.pop(fut)
+                    rel, links, dirs = fut.result()
+                    found += [rel + href for href in links]
+                    if level < depth:
+                        for d in dirs:
+                            pending[pool.submit(_list, rel + d)] = level + 1
+        except BaseException:
+            for fut in pending:
+                fut.cancel()
+            raise
+    return sorted(found)
+
+
+def _remote_image_versions(
+    os_version: str,
+    tools: List[str],
+    no_cert: bool,
+    creds: Optional[VaultCredentials] = None,
+) -> List[SyncItem]:
+    """
+    Every image the vault publishes for *os_version* (limited to *tools*
+    when given), one SyncItem per version, from the catalog when there is
+    one, otherwise by crawling the tools' listings and reading each
+    version's SHA256SUMS.  Crawled items carry no size or mtime; see
+    _remote_images.
+    """
+    prefix = f"container_img_reg/{os_version}/"
+    files  = _vault_catalog(no_cert, creds)
+    found: List[SyncItem] = []
+
+    if files is not None:
+        for path, meta in files.items():
+            if not path.startswith(prefix):
+                continue
+            parts = path[len(prefix):].split("/")
+            if len(parts) < 3 or not any(path.endswith(e) for e in _HrefParser.ARCHIVE_EXT):
+                continue
+            found.append(SyncItem(
+                rel=f"{parts[0]}/{parts[-1]}",
+                action="",
+                url=OPENCHAI_VAULT_URL + urllib.parse.quote(path),
+                size=meta.get("size"),
+                mtime=meta.get("mtime"),
+                sha256=meta.get("sha256"),
+                version=parts[1],
+            ))
+    else:
+        root = OPENCHAI_VAULT_URL + prefix
+        start = [urllib.parse.quote(tool) + "/" for tool in tools] if tools else None
+        log_info(f"No vault catalog — crawling {root} …")
+        for path in _walk_remote(root, no_cert, creds, start=start):
+            parts = path.split("/")
+            if len(parts) < 3:
+                continue
+            found.append(SyncItem(
+                rel=f"{parts[0]}/{urllib.parse.unquote(parts[-1])}",
+                action="",
+                url=root + path,
+                version=parts[1],
+            ))
+        manifests: Dict[str, Dict[str, str]] = {}
+        for item in found:
+            tool    = item.rel.split("/", 1)[0]
+            ver_url = f"{root}{tool}/{item.version}/"
+            if ver_url not in manifests:
+                manifests[ver_url] = _fetch_manifest(ver_url, no_cert, creds)
+            item.sha256 = manifests[ver_url].get(urllib.parse.unquote(item.url[len(ver_url):]))
+
+    return [item for item in found if not tools or item.rel.split("/", 1)[0] in tools]
+
+
+def _remote_images(
+    os_version: str,
+    tools: List[str],
+    no_cert: bool,
+    creds: Optional[VaultCredentials] = None,
+) -> Dict[str, SyncItem]:
+    """
+    Return {<tool>/<image>: SyncItem} for the images the vault publishes
+    for *os_version* (see _remote_image_versions).  When several versions
+    publish the same image name, the highest version wins.  Winners with
+    no recorded size get a HEAD request for size and mtime; one that
+    fails leaves them unknown, which plan_sync treats as changed unless a
+    digest settles it.
+    """
+    images: Dict[str, SyncItem] = {}
+    for item in _remote_image_versions(os_version, tools, no_cert, creds):
+        current = images.get(item.rel)
+        if current is None or version_key(item.version) > version_key(current.version):
+            images[item.rel] = item
+
+    def _probe(item: SyncItem) -> bool:
+        try:
+            item.size, item.mtime = _head(item.url, no_cert, creds)
+            return True
+        except Exception as exc:
+            log.info("HEAD %s failed: %s", item.url, exc)
+            return False
+
+    unsized = [item for item in images.values() if item.size is None]
+    if unsized:
+        with ThreadPoolExecutor(max_workers=SYNC_CRAWL_WORKERS) as pool:
+            failed = sum(not ok for ok in pool.map(_probe, unsized))
+        if failed:
+            log_warn(f"Could not read the size of {failed} vault image(s) — see {LOG_PATH}.")
+    return images
+
+
+def _sha256_path(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(CHUNK_SIZE), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def plan_sync(
+    container_reg_path: Path,
+    remote: Dict[str, SyncItem],
+    tools: List[str],
+    checksum: bool = False,
+    catalog: Optional[LocalCatalog] = None,
+) -> List[SyncItem]:
+    """
+    Classify every remote and local image (rsync quick check):
+
+      new        not present locally
+      changed    size differs; or the digest differs (hashed when mtimes
+                 disagree, or always with *checksum*); or, with no vault
+                 digest, the vault copy is newer than the local one or
+                 its size and mtime are unknown
+      unchanged  everything else
+      orphaned   local image the vault no longer publishes
+
+    Local images are listed from *catalog* (refreshed here if not given).
+    """
+    catalog = catalog or LocalCatalog(container_reg_path).refresh()
+    plan: List[SyncItem] = []
+    for rel, item in sorted(remote.items()):
+        local = container_reg_path / rel
+        try:
+            st = local.stat()
+        except FileNotFoundError:
+            item.action = "new"
+            plan.append(item)
+            continue
+        if item.size is not None and item.size != st.st_size:
+            item.action, item.reason = "changed", "size differs"
+        elif item.sha256 and (checksum or item.mtime != int(st.st_mtime)):
+            same = _sha256_path(local) == item.sha256.lower()
+            item.action, item.reason = (
+                ("unchanged", "mtime differs") if same else ("changed", "digest differs")
+            )
+        elif not item.sha256 and item.mtime is not None and item.mtime > int(st.st_mtime):
+            item.action, item.reason = "changed", "newer on vault"
+        elif not item.sha256 and item.size is None and item.mtime is None:
+            item.action, item.reason = "changed", "size unknown"
+        else:
+            item.action = "unchanged"
+        plan.append(item)
+
+    for tool in catalog.subdirs():
+        if tools and tool not in tools:
+            continue
+        for name, (size, _) in sorted(catalog.files(tool).items()):
+            rel = f"{tool}/{name}"
+            if rel in remote:
+                continue
+            if any(name.endswith(e) for e in _HrefParser.ARCHIVE_EXT):
+                plan.append(SyncItem(rel=rel, action="orphaned", size=size))
+    return plan
+
+
+def _reusable_blob(container_reg_path: Path, item: SyncItem) -> Optional[Path]:
+    """
+    The store blob for *item*'s digest if it can be linked instead of
+    downloaded.  A blob that is the very inode of the changed local file
+    was modified through its hard link, so it is not reusable.
+    """
+    if not item.sha256:
+        return None
+    blob = _store_path(container_reg_path, item.sha256.lower())
+    try:
+        if os.path.samefile(blob, container_reg_path / item.rel):
+            return None
+    except FileNotFoundError:
+        pass
+    return blob if blob.exists() else None
+
+
+def _print_sync_plan(plan: List[SyncItem], container_reg_path: Path, delete: bool) -> int:
+    """Print the plan and its totals; returns the bytes still to transfer."""
+    styles = {"new": "green", "changed": "yellow", "unchanged": "dim", "orphaned": "red"}
+    table = Table(box=box.ROUNDED, header_style="bold magenta")
+    table.add_column("Action")
+    table.add_column("Image", style="white")
+    table.add_column("Version", style="cyan")
+    table.add_column("Size", justify="right")
+    table.add_column("Note", style="dim")
+
+    transfer = 0
+    for item in plan:
+        if item.action == "unchanged":
+            continue
+        note = item.reason
+        if item.action in ("new", "changed"):
+            if _reusable_blob(container_reg_path, item) is not None:
+                note = "link from local store"
+            else:
+                transfer += item.size or 0
+        if item.action == "orphaned":
+            note = "will be deleted" if delete else "kept (use --delete)"
+        table.add_row(
+            f"[{styles[item.action]}]{item.action}[/{styles[item.action]}]",
+            item.rel,
+            item.version,
+            f"{item.size / 1024**2:,.1f} MiB" if item.size is not None else "?",
+            note,
+        )
+
+    counts = {a: sum(1 for i in plan if i.action == a) for a in SYNC_ACTIONS}
+    if table.row_count:
+        console.print(table)
+    console.print(
+        "  " + "  |  ".join(f"{counts[a]} {a}" for a in SYNC_ACTIONS)
+    )
+    unknown = sum(1 for i in plan if i.action in ("new", "changed") and i.size is None)
+    console.print(
+        f"  To transfer: [bold]{transfer / 1024**2:,.1f} MiB[/bold]"
+        + (f" + {unknown} image(s) of unknown size" if unknown else "")
+    )
+    if delete and counts["orphaned"]:
+        freed = sum(i.size or 0 for i in plan if i.action == "orphaned")
+        console.print(f"  To delete:   [bold]{freed / 1024**2:,.1f} MiB[/bold]")
+    return transfer
+
+
+def run_sync(args: argparse.Namespace):
+    """
+    Plan, report and (unless --dry-run) apply the delta between the vault
+    and the local container registry.
+    """
+    base_dir   = Path(args.base_dir).resolve()
+    os_version = args.os_version or detect_os()[2]
+    container_reg_path = base_dir / "hpcsuite_registry" / "container_img_reg"
+    container_reg_path.mkdir(parents=True, exist_ok=True)
+
+    creds = None
+    if args.username:
+        creds = VaultCredentials(args.username, getpass.getpass(f"Vault password for {args.username}: "))
+
+    console.print(Rule(f"[bold]Registry sync – {os_version}[/bold]"))
+    try:
+        remote = _remote_images(os_version, args.tool, args.no_cert, creds)
+    except RuntimeError as exc:
+        error_exit(str(exc))
+    if not remote:
+        # Never plan against an empty vault: with --delete every local image would be an orphan
+        error_exit(f"The vault publishes no container images for {os_version} — nothing to sync against.")
+    plan     = plan_sync(container_reg_path, remote, args.tool, args.checksum)
+    transfer = _print_sync_plan(plan, container_reg_path, args.delete)
+
+    todo    = [i for i in plan if i.action in ("new", "changed")]
+    orphans = [i for i in plan if i.action == "orphaned"] if args.delete else []
+    if args.dry_run:
+        log_notice("Dry run — nothing transferred or deleted.")
+        return
+    for item in plan:
+        # Same bytes, stale mtime: adopt the vault's so the next run skips hashing
+        if item.reason == "mtime differs" and item.mtime is not None:
+            os.utime(container_reg_path / item.rel, (item.mtime, item.mtime))
+    if not todo and not orphans:
+        log_notice("Local registry is up to date.")
         return
 
-    replacements = {
-        r"^openchai_version:.*":        f"openchai_version: {openchai_version}",
-        r"^base_dir:.*":                f"base_dir: {base_dir}",
-        r"^os_version:.*":              f"os_version: {params['os_version']}",
-        r"^os_arch:.*":                 f"os_arch: {params['os_arch']}",
-        r"^rhel_linux_label:.*":        f"rhel_linux_label: {params['rhel_label']}",
-        r"^enterprise_linux_label:.*":  f"enterprise_linux_label: {params['el_label']}",
-        r"^default_kernel_version:.*":  f'default_kernel_version: "{params["kernel"]}"',
-    }
-    for pat, repl in replacements.items():
-        _sed_replace(all_yml, pat, repl)
+    avail = shutil.disk_usage(container_reg_path).free
+    if transfer > avail:
+        log_warn(
+            f"Only {avail / 1024**2:,.1f} MiB free in {container_reg_path} "
+            f"for {transfer / 1024**2:,.1f} MiB of images."
+        )
+    if not args.yes and not Confirm.ask("Apply this plan?", default=True):
+        log_warn("Sync cancelled.")
+        return
 
-    log_notice(f"Updated: {all_yml}")
+    failed = 0
+    for item in todo:
+        dest = container_reg_path / item.rel
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        digest = item.sha256.lower() if item.sha256 else None
+        if digest and _reusable_blob(container_reg_path, item) is None:
+            _store_path(container_reg_path, digest).unlink(missing_ok=True)
+        if not _download_image(item.url, dest, container_reg_path, digest, args.no_cert, creds):
+            failed += 1
+            continue
+        if item.mtime is not None:
+            os.utime(dest, (item.mtime, item.mtime))
+    for item in orphans:
+        (container_reg_path / item.rel).unlink(missing_ok=True)
+        log_notice(f"🗑  Removed {item.rel} (withdrawn from the vault)")
+
+    if failed:
+        log_warn(f"Sync finished with {failed} failed transfer(s); re-run to retry.")
+    else:
+        log_notice("Registry sync complete.")
+    log.info("HTTP pool: %s", _POOL.stats())
 
 
-def update_script_base_dirs(base_dir: Path):
-    candidates = []
-    for glob_pat in [
-        "chai_setup/update_group_var_all.sh",
-        "chai_setup/update_inventory_def.sh",
-        "chai_setup/modules/*.sh",
-        "servicenodes/*.sh",
-    ]:
-        candidates.extend(base_dir.glob(glob_pat))
+# ─────────────────────────────────────────────
+# Section 14 – Registry tarballs served in place
+# ─────────────────────────────────────────────
+TARSERVE_PORT    = 8090
+TAR_SEEK_SPACING = 32 << 20    # uncompressed bytes between gzip seek points
 
-    for f in candidates:
-        if f.is_file():
-            _sed_replace(f, r"^base_dir\s*=\s*.*", f'base_dir="{base_dir}"')
-            log.debug("Updated base_dir in %s", f)
 
+def _tar_index_path(archive: Path) -> Path:
+    return archive.with_name(f".{archive.name}.index")
+
+
+class _GzipSeekReader:
+    """
+    File-like decompressor for (multi-member) gzip that can start from a
+    seek point and records one every *spacing* output bytes.
+
+    A seek point is (output offset, input offset, decompressobj copy).
+    zlib does not expose its window, so seek points cannot be written
+    to disk and only live as long as the process.
+    """
+
+    def __init__(self, fh, spacing: int = 0, start: Optional[tuple] = None):
+        self._fh      = fh
+        self._spacing = spacing
+        self.points: List[tuple] = []
+
+        if start is None:
+            self.pos, self._in_pos = 0, 0
+            self._d, self._fresh   = zlib.decompressobj(31), True
+        else:
+            self.pos, self._in_pos, snapshot = start
+            self._d, self._fresh = snapshot.copy(), False
+
+        fh.seek(self._in_pos)
+        self._pending = b""
+        self._last    = self.pos
+        self._eof     = False
+
+    def read(self, size: int = -1) -> bytes:
+
+        if size is None or size < 0:
+            return b"".join(iter(lambda: self.read(CHUNK_SIZE), b""))
+
+        while not self._eof:
+
+            if not self._pending:
+                self._pending = self._fh.read(CHUNK_SIZE)
+
+            if not self._pending or (self._fresh and not self._pending.startswith(b"\x1f\x8b")):
+                if not self._fresh:
+                    raise EOFError("gzip stream ends before its end-of-stream marker")
+                # end of file, or zero padding after the last member
+                self._eof = True
+                break
+
+            data = self._d.decompress(self._pending, size)
+            self._fresh = False
+
+            tail = self._d.unused_data if self._d.eof else self._d.unconsumed_tail
+            self._in_pos += len(self._pending) - len(tail)
+            self._pending = tail
+
+            if self._d.eof:
+                self._d, self._fresh = zlib.decompressobj(31), True
+
+            if data:
+                self.pos += len(data)
+                if self._spacing and not self._fresh and self.pos - self._last >= self._spacing:
+                    self.points.append((self.pos, self._in_pos, self._d.copy()))
+                    self._last = self.pos
+                return data
+
+        return b""
+
+
+@contextlib.contextmanager
+def _raw_tar(archive: Path, fmt: str, start: Optional[tuple] = None, spacing: int = 0):
+    """
+    Yield the uncompressed tar stream of *archive*.  Plain tars are
+    seekable; gzip resumes from *start* (a _GzipSeekReader seek point);
+    bz2 / xz / zstd always decompress from the beginning.
+    """
+
+    with open(archive, "rb") as fh:
+
+        if fmt == "":
+            yield fh
+
+        elif fmt == "gz":
+            yield _GzipSeekReader(fh, spacing, start)
+
+        elif fmt == "bz2":
+            import bz2
+            with bz2.BZ2File(fh) as raw:
+                yield raw
+
+        elif fmt == "xz":
+            import lzma
+            with lzma.LZMAFile(fh) as raw:
+                yield raw
+
+        else:
+            try:
+                import zstandard
+            except ImportError:
+                raise RuntimeError(
+                    f"{archive.name}: zstd archives need the python 'zstandard' module"
+                )
+            with zstandard.ZstdDecompressor().stream_reader(fh) as raw:
+                yield raw
+
+
+class _TarIndex:
+    """
+    Member table of one registry tarball.
+
+    members maps a normalised member name to [kind, size, mtime, link,
+    offset] (kind as in _manifest_entry; offset is the start of the
+    member's data in the uncompressed tar).  The table is kept in
+    .<tarball>.index next to the archive and reused while the archive's
+    size and mtime are unchanged.  Gzip archives are always re-read once
+    on load, because their seek points cannot be cached on disk.
+    """
+
+    def __init__(self, archive: Path):
+
+        self.archive = archive
+        self.points: List[tuple] = []
+        self.members: Dict[str, list] = {}
+
+        with open(archive, "rb") as fh:
+            self.fmt = _sniff_compression(fh.read(8))
+
+        st  = archive.stat()
+        key = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+        cached = None
+        if self.fmt != "gz":
+            try:
+                cached = json.loads(_tar_index_path(archive).read_text())
+            except (OSError, ValueError):
+                pass
+
+        if isinstance(cached, dict) and cached.get("key") == key:
+            self.members = cached["members"]
+        else:
+            self._build(key)
+
+        self._point_offsets = [point[0] for point in self.points]
+
+        # every directory a member path passes through, listed in the archive or not
+        self._dirs: Set[str] = set()
+        for name in self.members:
+            parent = posixpath.dirname(name)
+            while parent and parent not in self._dirs:
+                self._dirs.add(parent)
+                parent = posixpath.dirname(parent)
+
+    def _build(self, key: dict):
+
+        with _raw_tar(self.archive, self.fmt, spacing=TAR_SEEK_SPACING) as src, tarfile.open(
+            fileobj=src,
+            mode="r|",
+            bufsize=CHUNK_SIZE,
+        ) as tf:
+
+            for member in tf:
+
+                name = posixpath.normpath(member.name)
+                tf.members.clear()
+
+                if name == "." or name.startswith(("/", "../")) or name == "..":
+                    log_warn(f"{self.archive.name}: ignoring unsafe member {member.name}")
+                    continue
+
+                if member.isdev():
+                    continue
+
+                self.members[name] = _manifest_entry(member)[1:] + [member.offset_data]
+
+            self.points = getattr(src, "points", [])
+
+        try:
+            tmp = _tar_index_path(self.archive).with_suffix(".tmp")
+            tmp.write_text(json.dumps(
+                {"archive": self.archive.name, "key": key, "members": self.members},
+                separators=(",", ":"),
+            ))
+            os.replace(tmp, _tar_index_path(self.archive))
+        except OSError as exc:
+            log_warn(f"Could not write the index of {self.archive.name}: {exc}")
+
+    def resolve(self, name: str) -> Optional[Tuple[str, list]]:
+        """
+        Follow symlinks and hardlinks inside the archive, in every path
+        component (v1/latest/p1.rpm with latest -> rpm is v1/rpm/p1.rpm);
+        None if *name* is absent, loops, or leaves the archive.  A
+        directory with no entry of its own resolves to a bare "d" entry.
+        """
+
+        parts = name.split("/")
+        done  = ""
+        hops  = 0
+
+        while parts:
+
+            part  = parts.pop(0)
+            path  = posixpath.join(done, part) if done else part
+            entry = self.members.get(path)
+
+            if entry is None or entry[0] not in ("l", "h"):
+                done = path
+                continue
+
+            hops += 1
+            if hops > 16:
+                return None
+
+            base   = done if entry[0] == "l" else ""
+            target = posixpath.normpath(posixpath.join(base, entry[3]))
+
+            if target.startswith(("/", "../")) or target == "..":
+                return None
+
+            parts = ([] if target == "." else target.split("/")) + parts
+            done  = ""
+
+        entry = self.members.get(done)
+        if entry is None and done in self._dirs:
+            entry = ["d", 0, 0, "", 0]
+        return (done, entry) if entry is not None else None
+
+    def iter_data(self, entry: list) -> Iterator[bytes]:
+        """Yield the data of a regular-file entry, starting from the nearest seek point."""
+
+        size, offset = entry[1], entry[4]
+        start = None
+
+        if self.points:
+            i = bisect.bisect_right(self._point_offsets, offset) - 1
+            if i >= 0:
+                start = self.points[i]
+
+        with _raw_tar(self.archive, self.fmt, start=start) as src:
+
+            if self.fmt == "":
+                src.seek(offset)
+                pos = offset
+            else:
+                pos = start[0] if start is not None else 0
+
+            while pos < offset or size:
+                want  = min(CHUNK_SIZE, offset - pos) if pos < offset else min(CHUNK_SIZE, size)
+                chunk = src.read(want)
+                if not chunk:
+                    raise EOFError(f"{self.archive.name} ends inside a member")
+                if pos < offset:
+                    pos += len(chunk)
+                else:
+                    size -= len(chunk)
+                    yield chunk
+
+
+class _TarView:
+    """Merged, read-only namespace over several indexed tarballs (first one wins)."""
+
+    def __init__(self, indexes: List[_TarIndex]):
+
+        self.indexes = indexes
+        self.children: Dict[str, Set[str]] = {"": set()}
+
+        for index in indexes:
+            for name, entry in index.members.items():
+                parts = name.split("/")
+                for depth in range(len(parts)):
+                    parent = "/".join(parts[:depth])
+                    last   = depth == len(parts) - 1
+                    child  = parts[depth] + ("/" if not last or entry[0] == "d" else "")
+                    self.children.setdefault(parent, set()).add(child)
+
+    def lookup(self, name: str) -> Optional[Tuple[_TarIndex, str, list]]:
+        for index in self.indexes:
+            found = index.resolve(name)
+            if found is not None:
+                return (index,) + found
+        return None
+
+
+class _TarServeHandler(BaseHTTPRequestHandler):
+    """Serve files and directory listings out of a _TarView; see run_serve()."""
+
+    protocol_version = "HTTP/1.1"
+    server_version   = "openchai-tarserve/1.0"
+
+    def log_message(self, fmt, *args):
+        log.info("serve %s %s", self.address_string(), fmt % args)
 
-def update_ansible_cfg(base_dir: Path):
-    ansible_cfg     = base_dir / "automation" / "ansible" / "ansible.cfg"
-    system_cfg      = Path("/etc/ansible/ansible.cfg")
-    inventory_sh    = base_dir / "automation" / "ansible" / "inventory" / "inventory.sh"
-    inventory_line  = f"inventory = {inventory_sh}"
-    all_yml         = base_dir / "automation" / "ansible" / "group_vars" / "all.yml"
+    def do_HEAD(self):
+        self._handle(head=True)
 
-    # Local ansible.cfg
-    if ansible_cfg.exists():
-        _sed_replace(ansible_cfg, r"inventory\s*=\s*.*inventory\.sh", inventory_line)
-        log_notice(f"Updated: {ansible_cfg}")
-    else:
-        log_warn(f"Not found: {ansible_cfg}")
+    def do_GET(self):
+        self._handle(head=False)
 
-    # inventory.sh
-    if inventory_sh.exists():
-        _sed_replace(inventory_sh, r"^base_dir=.*", f'base_dir="{base_dir}"')
-        inventory_sh.chmod(inventory_sh.stat().st_mode | 0o111)
-        log_notice(f"Updated: {inventory_sh}")
-    else:
-        log_warn(f"Not found: {inventory_sh}")
+    def _send_empty(self, code: int, location: str = ""):
+        self.send_response(code)
+        if location:
+            self.send_header("Location", location)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
 
-    # System /etc/ansible/ansible.cfg
-    if system_cfg.exists():
-        text = system_cfg.read_text()
-        if re.search(r"^\s*inventory\s*=", text, re.MULTILINE):
-            text = re.sub(r"^\s*inventory\s*=.*", inventory_line, text, flags=re.MULTILINE)
-        elif "[defaults]" in text:
-            text = text.replace("[defaults]", f"[defaults]\n{inventory_line}", 1)
-        else:
-            text = f"[defaults]\n{inventory_line}\n" + text
+    def _handle(self, head: bool):
+        view: _TarView = self.server.view
+        url_path = urllib.parse.urlsplit(self.path).path
+        name     = posixpath.normpath(urllib.parse.unquote(url_path).strip("/") or ".")
+        name     = "" if name == "." else name
 
-        if "host_key_checking = False" not in text:
-            text += "\nhost_key_checking = False\n"
+        found = view.lookup(name) if name else None
 
-        try:
-            system_cfg.write_text(text)
-            log_notice(f"Updated system Ansible config: {system_cfg}")
-        except PermissionError:
-            log_warn(f"No write permission to {system_cfg}. Run as root to update it.")
+        if name in view.children or (found is not None and found[2][0] == "d"):
+            real = found[1] if found is not None else name
+            if not url_path.endswith("/"):
+                self._send_empty(301, url_path + "/")
+            else:
+                self._listing(url_path, sorted(view.children.get(real, ())), head)
+        elif found is None or found[2][0] != "f":
+            self._send_empty(404)
+        else:
+            self._file(*found, head=head)
 
-        # Make inventory.sh executable
+    def _listing(self, url_path: str, names: List[str], head: bool):
+        rows = "".join(
+            f'<a href="{urllib.parse.quote(n)}">{html.escape(n)}</a>\n' for n in names
+        )
+        title = html.escape(urllib.parse.unquote(url_path))
+        body  = f"<html><body><h1>Index of {title}</h1><pre>\n{rows}</pre></body></html>\n".encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+
+    def _file(self, index: _TarIndex, name: str, entry: list, head: bool):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(entry[1]))
+        self.send_header("Last-Modified", email.utils.formatdate(entry[2], usegmt=True))
+        self.end_headers()
+        if head:
+            return
         try:
-            if inventory_sh.exists():
-                inventory_sh.chmod(inventory_sh.stat().st_mode | 0o111)
-        except Exception:
-            pass
+            if index.fmt == "":
+                with open(index.archive, "rb") as fh:
+                    sent, size = 0, entry[1]
+                    while sent < size:
+                        n = self.connection.sendfile(fh, offset=entry[4] + sent, count=size - sent)
+                        if not n:
+                            raise EOFError(f"{index.archive.name} ends inside {name}")
+                        sent += n
+            else:
+                for chunk in index.iter_data(entry):
+                    self.wfile.write(chunk)
+        except (OSError, EOFError) as exc:
+            log.info("Serving %s from %s ended early: %s", name, index.archive.name, exc)
+            self.close_connection = True
 
-        # Copy group_vars to /etc/ansible/
-        gv_src = base_dir / "automation" / "ansible" / "group_vars"
-        gv_dst = Path("/etc/ansible/group_vars")
+
+def run_serve(args: argparse.Namespace):
+    """
+    Index registry tarballs and serve their contents read-only over HTTP,
+    so files can be consumed without extracting the archive.  URLs are
+    member paths, e.g. http://127.0.0.1:8090/<version>/rpm_stack/… for a
+    tarball that extracts to <version>/.
+    """
+    path = Path(args.path).resolve()
+    archives = [path] if path.is_file() else sorted(_find_local_tars(path))
+    if not archives:
+        error_exit(f"No registry tarballs found at {path}")
+
+    indexes: List[_TarIndex] = []
+    for archive in archives:
+        started = time.monotonic()
         try:
-            if gv_src.exists():
-                shutil.copytree(str(gv_src), str(gv_dst), dirs_exist_ok=True)
-                log_notice(f"Copied group_vars → {gv_dst}")
-        except Exception as exc:
-            log_warn(f"Could not copy group_vars: {exc}")
-    else:
-        log_warn(f"System Ansible config not found at {system_cfg} (skipping)")
+            index = _TarIndex(archive)
+        except (OSError, EOFError, RuntimeError, tarfile.TarError, zlib.error) as exc:
+            log_warn(f"Skipping {archive.name}: {exc}")
+            continue
+        files = sum(1 for entry in index.members.values() if entry[0] == "f")
+        access = {
+            "":   "direct",
+            "gz": f"{len(index.points)} seek point(s)",
+        }.get(index.fmt, "sequential")
+        log_info(
+            f"Indexed {archive.name}: {files:,} file(s), {access} "
+            f"({time.monotonic() - started:.1f} s)"
+        )
+        indexes.append(index)
+
+    if args.index_only or not indexes:
+        return
+
+    server = ThreadingHTTPServer((args.bind, args.port), _TarServeHandler)
+    server.daemon_threads = True
+    server.view = _TarView(indexes)
+
+    log_notice(f"Serving {len(indexes)} tarball(s) read-only on http://{args.bind}:{args.port}/")
+
+    def _on_term(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, _on_term)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        log_notice("Tarball server stopped.")
 
 
 # ─────────────────────────────────────────────
-# Section 10 – Container Image Registry
+# Section 15 – Local image verification
 # ─────────────────────────────────────────────
-IMG_EXTS = (".img", ".tar", ".tar.gz", ".tgz")
+VERIFY_JOBS      = 0          # hashing processes, 0 = one per CPU (--jobs)
+VERIFY_READ_SIZE = 8 << 20    # sequential read size per hashing process
+VERIFY_CACHE_NAME = "verified-hashes.json"   # <container_img_reg>/.cache/…
 
 
-def _find_app_dirs(container_reg_path: Path) -> List[Path]:
-    if not container_reg_path.exists():
-        return []
-    return [d for d in container_reg_path.iterdir() if d.is_dir()]
+def _hash_worker(path: str) -> Tuple[str, Optional[str], int, str]:
+    """
+    Process-pool worker: SHA-256 of *path* with large sequential reads
+    into one reused buffer.  Returns (path, digest, bytes read, error).
+    """
+    hasher = hashlib.sha256()
+    buf    = bytearray(VERIFY_READ_SIZE)
+    view   = memoryview(buf)
+    total  = 0
+    try:
+        with open(path, "rb", buffering=0) as fh:
+            with contextlib.suppress(AttributeError, OSError):
+                os.posix_fadvise(fh.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            while True:
+                n = fh.readinto(buf)
+                if not n:
+                    break
+                hasher.update(view[:n])
+                total += n
+    except OSError as exc:
+        return path, None, total, str(exc)
+    return path, hasher.hexdigest(), total, ""
+
+
+class _HashCache:
+    """
+    SHA-256 of local files in <root>/.cache/verified-hashes.json, keyed by
+    device and inode and trusted while size and mtime are unchanged, so
+    an untouched image is never read twice.  Digests are cached, not
+    verdicts: each run still compares them with the current vault.
+    """
 
+    def __init__(self, root: Path):
+        self.path = root / ".cache" / VERIFY_CACHE_NAME
+        self.entries: Dict[str, list] = {}
+        try:
+            data = json.loads(self.path.read_text())
+            if isinstance(data, dict):
+                self.entries = data
+        except (OSError, ValueError):
+            pass
 
-def _collect_local_images(app_dirs: List[Path]) -> Tuple[Dict[int, Path], Set[str]]:
-    img_map: Dict[int, Path] = {}
-    local_names: Set[str] = set()
-    idx = 1
+    @staticmethod
+    def key(st: os.stat_result) -> str:
+        return f"{st.st_dev}:{st.st_ino}"
 
-    for app_dir in app_dirs:
-        imgs = [
-            f for f in app_dir.rglob("*")
-            if f.is_file() and any(f.name.endswith(e) for e in IMG_EXTS)
-        ]
-        if not imgs:
-            log_warn(f"No images found in {app_dir.name}")
-            continue
-        console.print(f"\n[bold cyan]🧩 [{app_dir.name}][/bold cyan] {len(imgs)} image(s):")
-        for img in imgs:
-            console.print(f"   [dim][{idx}][/dim] {img.name}")
-            img_map[idx] = img
-            local_names.add(img.name)
-            idx += 1
+    def get(self, st: os.stat_result) -> Optional[str]:
+        entry = self.entries.get(self.key(st))
+        if entry and entry[0] == st.st_size and entry[1] == st.st_mtime_ns:
+            return entry[2]
+        return None
 
-    return img_map, local_names
+    def put(self, st: os.stat_result, digest: str):
+        self.entries[self.key(st)] = [st.st_size, st.st_mtime_ns, digest]
 
+    def save(self):
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(json.dumps(self.entries, separators=(",", ":")))
+            os.replace(tmp, self.path)
+        except OSError as exc:
+            log_warn(f"Could not save the hash cache: {exc}")
 
-def _run_python_selector(selector: Path):
-    if not selector.exists():
-        log_warn(f"Python selector not found: {selector}")
-        return
-    if not shutil.which("python3"):
-        log_warn("python3 not available; cannot run image selector.")
-        return
-    try:
-        subprocess.run([sys.executable, str(selector)], check=False)
-    except Exception as exc:
-        log_warn(f"Python selector failed: {exc}")
 
+def _store_inodes(container_reg_path: Path) -> Dict[Tuple[int, int], str]:
+    """{(device, inode): digest} for the blobs in the local store."""
+    inodes: Dict[Tuple[int, int], str] = {}
+    for blob in (container_reg_path / STORE_DIRNAME / "sha256").glob("*/*"):
+        try:
+            st = blob.stat()
+        except OSError:
+            continue
+        inodes[(st.st_dev, st.st_ino)] = blob.name.lower()
+    return inodes
 
-def _fetch_network_images(
-    container_reg_path: Path,
-    container_url: str,
-    local_names: Set[str],
-    no_cert: bool,
-    creds: Optional[VaultCredentials] = None,
-):
-    log_info(f"Fetching image list from {container_url} …")
-    net_imgs = _list_remote_archives(container_url, no_cert, creds)
 
-    if not net_imgs:
-        log_warn("No images found on network.")
+def run_verify(args: argparse.Namespace):
+    """
+    Hash the local container images across a process pool and compare
+    them with the vault's digests (and, offline or for images the vault
+    no longer lists, with the store blob an image is linked to).
+    Exits non-zero when an image is corrupt or unreadable.
+    """
+    base_dir   = Path(args.base_dir).resolve()
+    os_version = args.os_version or detect_os()[2]
+    container_reg_path = base_dir / "hpcsuite_registry" / "container_img_reg"
+    jobs = args.jobs or os.cpu_count() or 1
+
+    console.print(Rule(f"[bold]Image verification – {os_version}[/bold]"))
+
+    catalog = LocalCatalog(container_reg_path).refresh()
+    images  = [
+        rel
+        for tool in catalog.subdirs()
+        if not args.tool or tool in args.tool
+        for rel, _, _ in catalog.walk(tool)
+        if any(rel.endswith(e) for e in _HrefParser.ARCHIVE_EXT)
+    ]
+    if not images:
+        log_warn(f"No local images under {container_reg_path}")
         return
 
-    log_info(f"Found {len(net_imgs)} image(s) on network.")
-    for net_img in net_imgs:
-        base = Path(net_img).name
-        if base in local_names:
-            log_notice(f"⏭  Skipping {base} (already local)")
+    expected: Dict[str, Set[str]] = {}
+    if not args.offline:
+        creds = None
+        if args.username:
+            creds = VaultCredentials(args.username, getpass.getpass(f"Vault password for {args.username}: "))
+        try:
+            for item in _remote_image_versions(os_version, args.tool, args.no_cert, creds):
+                if item.sha256:
+                    expected.setdefault(item.rel, set()).add(item.sha256.lower())
+        except Exception as exc:
+            log_warn(f"Vault lookup failed ({exc}) — checking against the local store only.")
+            expected = {}
+        else:
+            if not expected:
+                log_warn("The vault published no digests — only store-linked images can be checked.")
+    stored = _store_inodes(container_reg_path)
+
+    # Hash each inode once: images hard-linked to the same blob share it
+    cache   = _HashCache(container_reg_path)
+    stats:  Dict[str, os.stat_result] = {}
+    digest: Dict[str, str] = {}
+    errors: Dict[str, str] = {}
+    todo:   Dict[str, List[str]] = {}
+    for rel in images:
+        try:
+            st = (container_reg_path / rel).stat()
+        except OSError as exc:
+            errors[rel] = str(exc)
             continue
+        stats[rel] = st
+        known = None if args.rehash else cache.get(st)
+        if known is not None:
+            digest[rel] = known
+        else:
+            todo.setdefault(_HashCache.key(st), []).append(rel)
 
-        dest = container_reg_path / base
-        url  = container_url + net_img
-        log_info(f"⬇  Downloading {base} …")
+    cached  = len(digest)
+    to_hash = sum(stats[rels[0]].st_size for rels in todo.values())
+    hashed  = 0
+    started = time.monotonic()
 
-        ctx = ssl.create_default_context()
-        if no_cert:
-            ctx.check_hostname = False
-            ctx.verify_mode = ssl.CERT_NONE
+    if todo:
+        log_info(
+            f"Hashing {len(todo):,} file(s), {to_hash / 1024**3:,.2f} GiB, "
+            f"with {min(jobs, len(todo))} process(es) …"
+        )
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            BarColumn(),
+            DownloadColumn(),
+            TransferSpeedColumn(),
+            TimeRemainingColumn(),
+            console=console,
+        ) as progress, ProcessPoolExecutor(max_workers=min(jobs, len(todo))) as pool:
+            task    = progress.add_task("Verifying", total=to_hash)
+            futures = {
+                pool.submit(_hash_worker, str(container_reg_path / rels[0])): rels
+                for rels in todo.values()
+            }
+            for fut in as_completed(futures):
+                rels = futures[fut]
+                _, found, nbytes, error = fut.result()
+                hashed += nbytes
+                progress.update(task, advance=stats[rels[0]].st_size)
+                for rel in rels:
+                    if error:
+                        errors[rel] = error
+                    else:
+                        digest[rel] = found
+                if not error:
+                    cache.put(stats[rels[0]], found)
+        cache.save()
+
+    elapsed = time.monotonic() - started
+
+    corrupt: List[Tuple[str, str]] = []
+    unknown: List[str] = []
+    intact  = 0
+    for rel in images:
+        if rel not in digest:
+            continue
+        st    = stats[rel]
+        wants = set(expected.get(rel, ()))
+        if (st.st_dev, st.st_ino) in stored:
+            wants.add(stored[(st.st_dev, st.st_ino)])
+        if not wants:
+            unknown.append(rel)
+        elif digest[rel] in wants:
+            intact += 1
+        else:
+            corrupt.append((rel, f"expected {sorted(wants)[0][:12]}…, got {digest[rel][:12]}…"))
+
+    if corrupt or unknown or errors:
+        table = Table(box=box.SIMPLE_HEAVY, header_style="bold cyan")
+        table.add_column("Status")
+        table.add_column("Image")
+        table.add_column("Size", justify="right")
+        table.add_column("Detail")
+        for rel, detail in corrupt:
+            table.add_row("[red]corrupt[/red]", rel, f"{stats[rel].st_size / 1024**2:,.1f} MiB", detail)
+        for rel, detail in errors.items():
+            table.add_row("[red]unreadable[/red]", rel, "", detail)
+        for rel in unknown:
+            table.add_row("[yellow]unknown[/yellow]", rel, f"{stats[rel].st_size / 1024**2:,.1f} MiB", "no digest on the vault or in the store")
+        console.print(table)
 
-        headers = {"User-Agent": "openchai-setup/1.0"}
-        if creds:
-            headers["Authorization"] = creds.auth_header()
+    rate = hashed / elapsed if elapsed > 0 else 0.0
+    console.print(
+        f"  {intact} intact  |  {len(corrupt)} corrupt  |  {len(unknown)} unknown  |  {len(errors)} unreadable"
+    )
+    console.print(
+        f"  Hashed [bold]{hashed / 1024**3:,.2f} GiB[/bold] in {elapsed:.1f} s "
+        f"({rate / 1024**2:,.1f} MiB/s); {cached} unchanged image(s) taken from the cache"
+    )
 
-        try:
-            with Progress(
-                SpinnerColumn(),
-                TextColumn("[progress.description]{task.description}"),
-                DownloadColumn(),
-                TransferSpeedColumn(),
-                console=console,
-            ) as progress:
-                task = progress.add_task(f"Downloading {base}", total=None)
-                req = urllib.request.Request(url, headers=headers)
-                with urllib.request.urlopen(req, context=ctx, timeout=300) as resp, open(dest, "wb") as out:
-                    while True:
-                            chunk = resp.read(1 << 20)
-                            if not chunk:
-                                break
-                            out.write(chunk)
-                progress.update(task, completed=True)
-            log_notice(f"✅ Downloaded: {base}")
-        except Exception as exc:
-            log_warn(f"Failed to download {base}: {exc}")
-            if dest.exists():
-                dest.unlink()
+    if corrupt or errors:
+        log_warn("Re-fetch the corrupt images with `sync --checksum` or the image selector.")
+        sys.exit(1)
+    log_notice("Local images verified.")
 
-    log_notice("Network image synchronisation complete.")
 
+# ─────────────────────────────────────────────
+# Command line
+# ─────────────────────────────────────────────
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="OpenCHAI Manager – cluster configuration wizard",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        "--max-rate", default=str(MAX_RATE), metavar="RATE",
+        help=(
+            "Global bandwidth cap for vault transfers, shared by all "
+            "concurrent downloads, e.g. 200M or 1.5G (bytes/s). 0 = unlimited."
+        ),
+    )
+    parser.add_argument(
+        "--rate-window", default=RATE_WINDOW, metavar="HH:MM-HH:MM",
+        help=(
+            "Apply --max-rate only inside this local-time window "
+            "(e.g. 08:00-20:00); full speed outside it. Empty = always."
+        ),
+    )
+    parser.add_argument(
+        "--verify-sample", type=int, default=EXTRACT_VERIFY_SAMPLE, metavar="N",
+        help=(
+            "Check only N randomly chosen files of an already extracted "
+            "registry against its manifest. 0 = check every file."
+        ),
+    )
+    parser.add_argument(
+        "--dedup", action="store_true", default=EXTRACT_DEDUP,
+        help=(
+            "Store files that are identical across OpenCHAI releases once "
+            "(reflink where supported, else hardlink) when extracting a "
+            "registry tarball."
+        ),
+    )
 
-def handle_container_images(
-    base_dir: Path,
-    os_version: str,
-    no_cert: bool,
-    creds: Optional[VaultCredentials] = None,
-):
-    console.print(Rule("[bold]Container Image Registry[/bold]"))
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND")
 
-    container_reg_path = base_dir / "hpcsuite_registry" / "container_img_reg"
-    container_reg_path.mkdir(parents=True, exist_ok=True)
+    mirror = commands.add_parser(
+        "mirror",
+        help="Run a caching HTTP mirror of the vault for other headnodes",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    mirror.add_argument(
+        "--upstream",
+        default=urllib.parse.urlsplit(OPENCHAI_VAULT_URL)._replace(path="").geturl(),
+        help="Vault origin to fetch cache misses from (scheme://host[:port]).",
+    )
+    mirror.add_argument("--cache-dir", default=MIRROR_CACHE_DIR, help="Cache directory.")
+    mirror.add_argument(
+        "--bind", default="127.0.0.1",
+        help="Address to listen on (0.0.0.0 to serve other headnodes).",
+    )
+    mirror.add_argument("--port", type=int, default=MIRROR_PORT, help="Port to listen on.")
+    mirror.add_argument(
+        "--quota", default=MIRROR_QUOTA,
+        help="Disk quota for cached archives, e.g. 500G; least recently used are evicted.",
+    )
+    mirror.add_argument(
+        "--no-cert", action="store_true",
+        help="Skip TLS certificate verification towards the upstream vault.",
+    )
 
-    python_selector = base_dir / "automation" / "python" / "container_img_selector.py"
-    container_url   = f"{OPENCHAI_VAULT_URL}container_img_reg/{os_version}/"
+    catalog = commands.add_parser(
+        "catalog",
+        help=f"Generate the vault's {CATALOG_NAME} catalog from a local hpcsuite_registry tree",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    catalog.add_argument("root", help="Path to the hpcsuite_registry directory served by the vault.")
+    catalog.add_argument(
+        "--no-digest", action="store_true",
+        help="Record only size and mtime (skip SHA-256 hashing).",
+    )
+    catalog.add_argument(
+        "--workers", type=int, default=0,
+        help="Hashing threads, 0 = one per CPU.",
+    )
 
-    # Patch Python selector path if present
-    if python_selector.exists():
-        _sed_replace(
-            python_selector,
-            r'^LOCAL_DIR\s*=.*',
-            f'LOCAL_DIR = "{container_reg_path}"',
-        )
+    sync = commands.add_parser(
+        "sync",
+        help="Bring the local container registry in line with the vault (only the delta moves)",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    sync.add_argument(
+        "--base-dir", default=str(SCRIPT_DIR),
+        help="OpenCHAI base directory holding hpcsuite_registry/.",
+    )
+    sync.add_argument(
+        "--os-version", default="",
+        help="Vault OS label, e.g. alma9. Empty = detect from /etc/os-release.",
+    )
+    sync.add_argument(
+        "--tool", action="append", default=[], metavar="NAME",
+        help="Only sync this tool directory (repeatable). Default: all tools.",
+    )
+    sync.add_argument("--dry-run", action="store_true", help="Report the plan and exit.")
+    sync.add_argument("--delete", action="store_true", help="Delete orphaned local images.")
+    sync.add_argument(
+        "--checksum", action="store_true",
+        help="Hash every local image with a vault digest, even when size and mtime match.",
+    )
+    sync.add_argument("--yes", action="store_true", help="Apply the plan without asking.")
+    sync.add_argument("--username", default="", help="Vault username (password is prompted).")
+    sync.add_argument(
+        "--no-cert", action="store_true",
+        help="Skip TLS certificate verification towards the vault.",
+    )
 
-    log_info(f"Scanning container image registry: {container_reg_path}")
-    app_dirs = _find_app_dirs(container_reg_path)
+    serve = commands.add_parser(
+        "serve",
+        help="Serve registry tarballs read-only over HTTP without extracting them",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    serve.add_argument(
+        "path",
+        help="A registry tarball, or a directory of them "
+             "(e.g. hpcsuite_registry/hostmachine_reg/<arch>/<os_version>).",
+    )
+    serve.add_argument("--bind", default="127.0.0.1", help="Address to listen on.")
+    serve.add_argument("--port", type=int, default=TARSERVE_PORT, help="Port to listen on.")
+    serve.add_argument(
+        "--index-only", action="store_true",
+        help="Build or refresh the .<tarball>.index files and exit.",
+    )
 
-    if not app_dirs:
-        log_warn(f"No application directories found in {container_reg_path}")
-        if Confirm.ask("Fetch container images from network?", default=False):
-            log_info("Launching Python container image selector…")
-            _run_python_selector(python_selector)
-        else:
-            log_notice(f"Skipping. Add images later under:\n  {container_reg_path}")
-        return
+    verify = commands.add_parser(
+        "verify",
+        help="Check local container images against the vault digests",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    verify.add_argument(
+        "--base-dir", default=str(SCRIPT_DIR),
+        help="OpenCHAI base directory holding hpcsuite_registry/.",
+    )
+    verify.add_argument(
+        "--os-version", default="",
+        help="Vault OS label, e.g. alma9. Empty = detect from /etc/os-release.",
+    )
+    verify.add_argument(
+        "--tool", action="append", default=[], metavar="NAME",
+        help="Only verify this tool directory (repeatable). Default: all tools.",
+    )
+    verify.add_argument(
+        "--jobs", type=int, default=VERIFY_JOBS,
+        help="Hashing processes. 0 = one per CPU.",
+    )
+    verify.add_argument(
+        "--rehash", action="store_true",
+        help="Ignore the verified-hash cache and read every image again.",
+    )
+    verify.add_argument(
+        "--offline", action="store_true",
+        help="Do not contact the vault; check images against their store blobs only.",
+    )
+    verify.add_argument("--username", default="", help="Vault username (password is prompted).")
+    verify.add_argument(
+        "--no-cert", action="store_true",
+        help="Skip TLS certificate verification towards the vault.",
+    )
 
-    img_map, local_names = _collect_local_images(app_dirs)
+    args = parser.parse_args(argv)
 
-    if not img_map:
-        log_warn("No local container images found.")
-        if Confirm.ask("Fetch missing images from the network?", default=False):
-            if shutil.which("python3"):
-                _run_python_selector(python_selector)
-            else:
-                _fetch_network_images(container_reg_path, container_url, local_names, no_cert, creds)
-        return
+    try:
+        _THROTTLE.configure(parse_rate(args.max_rate), parse_window(args.rate_window))
+    except ValueError as exc:
+        parser.error(str(exc))
 
-    if Confirm.ask("Fetch any missing images from the network?", default=False):
-        if not shutil.which("curl") and not shutil.which("python3"):
-            log_warn("Neither curl nor python3 available. Cannot fetch network images.")
-        else:
-            _fetch_network_images(container_reg_path, container_url, local_names, no_cert, creds)
-    else:
-        log_notice("Network image fetch skipped.")
+    if args.command == "mirror":
+        try:
+            quota = parse_rate(args.quota)
+        except ValueError:
+            quota = 0
+        if quota <= 0:
+            parser.error(f"invalid --quota '{args.quota}' (examples: 500G, 2T)")
+
+    if args.command == "verify" and args.jobs < 0:
+        parser.error(f"invalid --jobs {args.jobs} (0 = one per CPU)")
+
+    return args
 
 
-# ─────────────────────────────────────────────
-# Main
-# ─────────────────────────────────────────────
 # ─────────────────────────────────────────────
 # Main
 # ─────────────────────────────────────────────
 def main():
 
+    args = _parse_args()
+
+    if args.command == "mirror":
+        run_mirror(args)
+        return
+
+    if args.command == "catalog":
+        run_catalog(args)
+        return
+
+    if args.command == "sync":
+        run_sync(args)
+        return
+
+    if args.command == "serve":
+        run_serve(args)
+        return
+
+    if args.command == "verify":
+        run_verify(args)
+        return
+
     print_banner()
 
+    if _THROTTLE.rate:
+        log_info(f"Vault bandwidth limit: {_THROTTLE.describe()}")
+
     log.info(
         "Script started by user=%s",
         os.getenv("USER", "unknown")
@@ -1591,7 +4887,9 @@ def main():
         params["arch"],
         params["os_version"],
         no_cert,
-        creds
+        creds,
+        args.verify_sample,
+        args.dedup,
     )
 
     # ─────────────────────────────────────────
@@ -1606,7 +4904,8 @@ def main():
             base_dir,
             params["arch"],
             params["os_version"],
-            openchai_version
+            openchai_version,
+            args.verify_sample,
         )
 
     else:
@@ -1678,6 +4977,13 @@ def main():
         )
     )
 
+    log.info(
+        "HTTP pool: %s",
+        _POOL.stats()
+    )
+
+    _POOL.close_all()
+
     log.info(
         "Script finished successfully."
     )